@@ -0,0 +1,122 @@
+"""
+Benchmark du décodage du flux série : format historique (Base64/JSON) contre trames binaires.
+
+Exécution depuis le dossier Shout2Play :
+    python -m benchmarks.serial_decoding [nombre_de_messages]
+"""
+import sys
+import json
+import time
+import base64
+import random
+
+from communicate.protocol import StreamDecoder, encode_legacy, encode_telemetry
+
+
+class Target:
+    """
+    Cible des setattr du chemin historique (équivalent des attributs de SerialMonitor).
+    """
+    gain = 0
+    frequency = 0
+    button_pressed_shoot = False
+    button_pressed_pause = False
+    threshold = 70
+    divider = 1000
+
+
+def make_samples(count, seed=0):
+    """
+    Génère des mesures pseudo-aléatoires reproductibles.
+
+    :param count: le nombre de mesures
+    :param seed: la graine du générateur
+    :return: une liste de tuples (gain, fréquence, tir, pause, diviseur, seuil)
+    """
+    rng = random.Random(seed)
+    return [(rng.uniform(40, 110), rng.uniform(80, 2000), rng.random() < 0.1, rng.random() < 0.02,
+             rng.randint(800, 1200), rng.randint(30, 90)) for _ in range(count)]
+
+
+def legacy_readline_path(stream, target):
+    """
+    Reproduit le chemin historique de SerialMonitor.run : readline, b64decode, json.loads puis boucle de setattr.
+
+    :param stream: le flux complet au format historique
+    :param target: l'objet dont les attributs sont mis à jour
+    :return: le nombre de messages traités
+    """
+    count = 0
+    for line in stream.splitlines():
+        data = json.loads(base64.b64decode(line.decode("utf-8").strip()).decode("utf-8"))
+        for key in data.keys():
+            target.__setattr__(key, data[key])
+        count += 1
+    return count
+
+
+def decoder_path(stream, chunk=4096):
+    """
+    Décode un flux avec StreamDecoder, par blocs comme une lecture série en masse.
+
+    :param stream: le flux complet
+    :param chunk: la taille des blocs lus
+    :return: le nombre de messages décodés
+    """
+    decoder = StreamDecoder()
+    count = 0
+    for start in range(0, len(stream), chunk):
+        count += len(decoder.feed(stream[start:start + chunk]))
+    return count
+
+
+def measure(function, *args, repeat=5):
+    """
+    Mesure le meilleur temps d'exécution d'une fonction sur plusieurs essais.
+
+    :return: un tuple (meilleur temps en secondes, valeur renvoyée)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(count=20000):
+    """
+    Compare les deux formats et renvoie les résultats.
+
+    :param count: le nombre de messages
+    :return: un dictionnaire de résultats par scénario
+    """
+    samples = make_samples(count)
+    legacy = b"".join(encode_legacy(*sample) for sample in samples)
+    binary = b"".join(encode_telemetry(i, i * 0.01, *sample) for i, sample in enumerate(samples))
+
+    results = {}
+    for name, function, args, stream in [
+        ("legacy_readline", legacy_readline_path, (legacy, Target()), legacy),
+        ("legacy_decoder", decoder_path, (legacy,), legacy),
+        ("binary_decoder", decoder_path, (binary,), binary),
+    ]:
+        elapsed, decoded = measure(function, *args)
+        assert decoded == count, f"{name}: {decoded} messages décodés sur {count}"
+        results[name] = {
+            "messages_per_s": count / elapsed,
+            "us_per_message": elapsed / count * 1e6,
+            "bytes_per_message": len(stream) / count
+        }
+    return results
+
+
+if __name__ == "__main__":
+    results = run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
+    for name, result in results.items():
+        print(f"{name:16} {result['messages_per_s']:>12,.0f} msg/s  "
+              f"{result['us_per_message']:6.2f} µs/msg  {result['bytes_per_message']:6.1f} octets/msg")
+    legacy, binary = results["legacy_readline"], results["binary_decoder"]
+    print(f"Octets : x{legacy['bytes_per_message'] / binary['bytes_per_message']:.1f} de moins, "
+          f"CPU : x{binary['messages_per_s'] / legacy['messages_per_s']:.1f} plus rapide")
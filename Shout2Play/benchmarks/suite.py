@@ -0,0 +1,413 @@
+"""
+Suite de benchmarks du jeu : rendu, collisions, génération du monde, texte de l'interface et décodage série.
+
+Chaque scénario est reproductible (graines fixes, nombre d'itérations fixe) et s'exécute avec les pilotes SDL
+factices : aucune fenêtre n'est ouverte. Les résultats sont enregistrés en JSON et peuvent être comparés
+à une référence pour détecter les régressions.
+
+Exécution depuis le dossier Shout2Play :
+    python -m benchmarks.suite run --output benchmarks/baselines/avant.json
+    python -m benchmarks.suite run -k platform --output apres.json
+    python -m benchmarks.suite compare benchmarks/baselines/avant.json apres.json --tolerance 0.1
+"""
+import os
+import math
+import sys
+import json
+import time
+import random
+import argparse
+import platform as host
+import statistics
+
+# Pilotes SDL factices, avant l'initialisation de pygame par config
+os.environ.setdefault("SHOUT2PLAY_HEADLESS", "1")
+
+import numpy as np
+import pygame
+
+from config import *
+from objects.platforms import Platform, load_tiles, platform_strips
+from objects.generator import WorldGenerator
+from objects.enemies import EnemyPool
+from objects.bullets import BulletPool
+from core.collisions import find_collisions
+from visual.background import Background
+from visual.ui import UI
+from visual.display import fit
+from communicate.protocol import encode_legacy, encode_telemetry
+from communicate.pitch import PitchTracker, settings_from_config
+from communicate.filters import build_chain
+from core.notes import nearest
+from benchmarks.serial_decoding import Target, make_samples, legacy_readline_path, decoder_path
+
+
+FORMAT_VERSION = 1
+
+# Scénarios enregistrés : nom -> (préparation, itérations par mesure, unité, éléments par itération)
+SCENARIOS = {}
+
+
+def scenario(name, number, unit="op", items=1):
+    """
+    Enregistre un scénario. La fonction décorée prépare l'état et renvoie la fonction mesurée.
+
+    :param name: le nom du scénario
+    :param number: le nombre d'appels de la fonction mesurée par mesure
+    :param unit: l'unité d'un élément (image, plateforme, message...)
+    :param items: le nombre d'éléments traités par appel
+    """
+    def register(setup):
+        SCENARIOS[name] = (setup, number, unit, items)
+        return setup
+    return register
+
+
+def screen():
+    """
+    Renvoie la surface d'affichage (fenêtre factice à la taille du jeu).
+    """
+    return pygame.display.get_surface() or pygame.display.set_mode((WIDTH, HEIGHT))
+
+
+# --- Rendu ---
+
+@scenario("background.update", number=200, unit="image")
+def background_update():
+    background = Background()
+    surface = screen()
+    return lambda: background.update(surface, 20)
+
+
+for tiles in (1, 3, 5, 10):
+    @scenario(f"platform.draw[{tiles}]", number=5000, unit="plateforme")
+    def platform_draw(tiles=tiles):
+        platform = Platform(0, HEIGHT - 200, tiles)
+        surface = screen()
+        platform_strips.get(tiles, load_tiles())  # La bande est construite hors mesure, comme en jeu
+        return lambda: platform.draw(surface, 0.5)
+
+
+# --- Collisions ---
+
+def snapshot(pool):
+    """
+    Copie toutes les colonnes d'une réserve d'entités (pour rejouer exactement le même pas).
+    """
+    return pool.count, {name: column.copy() for name, column in pool.columns.items()}
+
+
+def restore(pool, saved):
+    """
+    Restaure une réserve d'entités copiée par snapshot.
+    """
+    pool.count, columns = saved
+    for name, column in columns.items():
+        pool.columns[name][:] = column
+
+
+for entities in (8, 64, 256, 1024):
+    @scenario(f"enemies.collisions[{entities}]", number=300, unit="pas")
+    def enemies_collisions(entities=entities):
+        """
+        Un pas de Game.update_enemies avec autant d'ennemis que d'oeufs, répartis aléatoirement sur l'écran :
+        recherche des collisions, oeufs cassés, ennemis touchés, puis déplacement et balayage des ennemis.
+        L'état initial est restauré avant chaque pas.
+        """
+        rng = random.Random(entities)
+        enemies, bullets = EnemyPool(capacity=entities), BulletPool(capacity=entities)
+        for _ in range(entities):
+            enemies.spawn(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+            bullets.spawn(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+        saved = snapshot(enemies), snapshot(bullets)
+
+        def step():
+            restore(enemies, saved[0])
+            restore(bullets, saved[1])
+            eggs = bullets.eggs()
+            hits = find_collisions(enemies.centers(enemies.width, enemies.height),
+                                   bullets.centers(bullets.width, bullets.height, eggs))
+            for enemy, egg in hits:
+                enemies.active[enemy] = False
+                bullets.break_egg(eggs[egg])
+            enemies.update(20)
+        return step
+
+
+# --- Génération du monde ---
+
+@scenario("world.generate", number=50, unit="plateforme", items=WORLD_CHUNK_SIZE)
+def world_generate():
+    """
+    Génère un tronçon du monde (graine fixe, sans cache ni thread), repris de zéro à chaque appel.
+    """
+    generator = WorldGenerator(seed=1234, cache=None)
+
+    def build():
+        generator.chunks.clear()
+        generator.build(0, 0)
+    return build
+
+
+# --- Interface ---
+
+@scenario("ui.score", number=2000, unit="image")
+def ui_score():
+    ui, surface = UI(), screen()
+    scores = iter(range(10 ** 9))
+    return lambda: ui.draw_score(surface, next(scores) // 30)
+
+
+@scenario("ui.text", number=500, unit="image")
+def ui_text():
+    ui, surface = UI(), screen()
+    scores = iter(range(10 ** 9))
+    return lambda: ui.draw_game_over(surface, next(scores) % 200)
+
+
+@scenario("ui.note", number=500, unit="image")
+def ui_note():
+    ui, surface = UI(), screen()
+    rng = random.Random(0)
+    frequencies = [rng.uniform(60, 2000) for _ in range(256)]
+    index = iter(range(10 ** 9))
+    return lambda: ui.freq_to_note(surface, frequencies[next(index) % len(frequencies)], True)
+
+
+@scenario("ui.note_held", number=500, unit="image")
+def ui_note_held():
+    """
+    Note tenue (légère oscillation autour de 440 Hz) : seul le curseur bouge d'une image à l'autre.
+    """
+    ui, surface = UI(), screen()
+    frequencies = [440.1 + 0.35 * math.sin(i / 8) for i in range(256)]
+    index = iter(range(10 ** 9))
+    return lambda: ui.freq_to_note(surface, frequencies[next(index) % len(frequencies)], True)
+
+
+# --- Décodage série ---
+
+SERIAL_MESSAGES = 2000
+
+
+@scenario("serial.legacy_readline", number=5, unit="message", items=SERIAL_MESSAGES)
+def serial_legacy_readline():
+    """
+    Chemin historique ligne par ligne (Base64 puis JSON) sur des mesures enregistrées d'avance.
+    """
+    stream = b"".join(encode_legacy(*sample) for sample in make_samples(SERIAL_MESSAGES))
+    return lambda: legacy_readline_path(stream, Target())
+
+
+@scenario("serial.legacy_decoder", number=5, unit="message", items=SERIAL_MESSAGES)
+def serial_legacy_decoder():
+    """
+    Lignes Base64/JSON décodées par StreamDecoder, comme dans SerialMonitor.
+    """
+    stream = b"".join(encode_legacy(*sample) for sample in make_samples(SERIAL_MESSAGES))
+    return lambda: decoder_path(stream)
+
+
+@scenario("serial.binary_decoder", number=5, unit="message", items=SERIAL_MESSAGES)
+def serial_binary_decoder():
+    """
+    Trames binaires décodées par StreamDecoder, comme dans SerialMonitor.
+    """
+    stream = b"".join(encode_telemetry(i, i * 0.01, *sample) for i, sample in enumerate(make_samples(SERIAL_MESSAGES)))
+    return lambda: decoder_path(stream)
+
+
+# --- Analyse de la voix ---
+
+@scenario("pitch.track", number=20, unit="bloc", items=32)
+def pitch_track():
+    """
+    Analyse YIN et niveau de 32 blocs d'audio reçus ensemble (voix synthétique à hauteur glissante).
+    """
+    settings = settings_from_config()
+    rate, size = settings["sample_rate"], settings["block"]
+    t = np.arange(32 * size) / rate
+    audio = (8000 * np.sin(2 * np.pi * np.cumsum(np.linspace(180, 420, len(t))) / rate)).astype("i2")
+    blocks = [(i * size / rate, 0.0, rate, audio[i * size:(i + 1) * size]) for i in range(32)]
+    tracker = PitchTracker(**dict(settings, budget=float("inf")))
+    return lambda: tracker.feed(blocks, now=0.0)
+
+
+for target in ((1280, 720), (1920, 1080)):
+    @scenario(f"display.scale[{target[0]}x{target[1]}]", number=200, unit="image")
+    def display_scale(target=target):
+        """
+        Présentation du canevas logique dans une fenêtre plus grande : une copie lissée mise à l'échelle
+        (dans une surface hors écran du même format, pour ne pas changer le mode vidéo des autres scénarios).
+        """
+        canvas = screen().copy()
+        window = pygame.Surface(target, 0, canvas)
+        viewport = window.subsurface(fit(target, canvas.get_size()))
+        return lambda: pygame.transform.smoothscale(canvas, viewport.get_size(), viewport)
+
+
+@scenario("notes.nearest", number=50, unit="mesure", items=10000)
+def notes_nearest():
+    """
+    Note la plus proche et écart en cents pour une piste de 10 000 fréquences, en un appel.
+    """
+    frequencies = np.exp(np.random.default_rng(0).uniform(np.log(60), np.log(1500), 10000))
+    return lambda: nearest(frequencies)
+
+
+# --- Conditionnement des mesures ---
+
+@scenario("filters.chain", number=500, unit="mesure", items=4)
+def filters_chain():
+    """
+    Filtrage du gain (chaîne configurée) pour un bloc de 4 mesures, le cas d'une image à 100 mesures/s.
+    """
+    chain = build_chain(GAIN_FILTERS, SIGNAL_RATE)
+    block = np.random.default_rng(0).normal(60.0, 5.0, 4)
+    return lambda: chain.process(block)
+
+
+def measure(setup, number, items, repeat):
+    """
+    Mesure un scénario : un appel d'échauffement, puis `repeat` mesures de `number` appels.
+
+    :return: le dictionnaire des temps par élément (µs)
+    """
+    function = setup()
+    function()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / (number * items) * 1e6)
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "max_us": max(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run(selection=None, repeat=7, verbose=True):
+    """
+    Exécute les scénarios sélectionnés.
+
+    :param selection: les motifs de noms à exécuter (par défaut, tous les scénarios)
+    :param repeat: le nombre de mesures par scénario
+    :param verbose: affiche chaque résultat au fil de l'exécution
+    :return: le document de résultats (sérialisable en JSON)
+    """
+    random.seed(0)
+    np.random.seed(0)
+    results = {}
+    for name, (setup, number, unit, items) in SCENARIOS.items():
+        if selection and not any(pattern in name for pattern in selection):
+            continue
+        result = measure(setup, number, items, repeat)
+        result["unit"] = unit
+        results[name] = result
+        if verbose:
+            print(f"{name:28} {result['median_us']:12.3f} µs/{unit}  (min {result['min_us']:.3f}, "
+                  f"écart-type {result['stdev_us']:.3f})")
+    return {
+        "version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "platform": host.platform(),
+            "processor": host.processor(),
+            "python": host.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "video_driver": pygame.display.get_driver(),
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=0.1):
+    """
+    Compare deux documents de résultats, scénario par scénario (sur la médiane).
+
+    :param baseline: les résultats de référence
+    :param current: les nouveaux résultats
+    :param tolerance: le ralentissement relatif toléré (0.1 : 10 %)
+    :return: la liste des lignes (nom, référence, courant, rapport, verdict)
+    """
+    rows = []
+    for name, reference in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            rows.append((name, reference["median_us"], None, None, "absent"))
+            continue
+        ratio = result["median_us"] / reference["median_us"]
+        if ratio > 1 + tolerance:
+            verdict = "RÉGRESSION"
+        elif ratio < 1 / (1 + tolerance):
+            verdict = "amélioration"
+        else:
+            verdict = "stable"
+        rows.append((name, reference["median_us"], result["median_us"], ratio, verdict))
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            rows.append((name, None, result["median_us"], None, "nouveau"))
+    return rows
+
+
+def load(path):
+    """
+    Charge un fichier de résultats.
+    """
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    if document.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} : format de résultats inconnu (version {document.get('version')})")
+    return document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Shout 2 Play")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="exécute les scénarios")
+    run_parser.add_argument("-k", dest="selection", action="append", help="ne garde que les scénarios dont le nom contient ce motif")
+    run_parser.add_argument("--repeat", type=int, default=7, help="nombre de mesures par scénario")
+    run_parser.add_argument("--output", help="fichier JSON où enregistrer les résultats")
+    run_parser.add_argument("--list", action="store_true", help="affiche les scénarios sans les exécuter")
+
+    compare_parser = commands.add_parser("compare", help="compare des résultats à une référence")
+    compare_parser.add_argument("baseline", help="résultats de référence (JSON)")
+    compare_parser.add_argument("current", help="nouveaux résultats (JSON)")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1, help="ralentissement relatif toléré (0.1 : 10 %%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.list:
+            for name, (_, number, unit, items) in SCENARIOS.items():
+                print(f"{name:28} {number * items:>8} {unit}(s) par mesure")
+            return 0
+        document = run(args.selection, args.repeat)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(document, file, indent=2)
+            print(f"Résultats enregistrés dans {args.output}")
+        return 0
+
+    rows = compare(load(args.baseline), load(args.current), args.tolerance)
+    for name, reference, result, ratio, verdict in rows:
+        reference = f"{reference:12.3f}" if reference is not None else f"{'-':>12}"
+        result = f"{result:12.3f}" if result is not None else f"{'-':>12}"
+        ratio = f"x{ratio:5.2f}" if ratio is not None else f"{'':6}"
+        print(f"{name:28} {reference} {result} µs  {ratio}  {verdict}")
+    regressions = [row for row in rows if row[4] == "RÉGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
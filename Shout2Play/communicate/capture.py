@@ -0,0 +1,454 @@
+"""
+Capture des mesures de Teensy dans un fichier binaire en colonnes, écrit au fil de l'eau.
+
+Format (.s2c) : un en-tête (magique, version, colonnes et décalage de l'horloge), puis une suite de
+tronçons ajoutés en fin de fichier. Chaque tronçon contient, pour chaque colonne, les valeurs contiguës
+de ses mesures (alignées sur 8 octets) et un CRC-32 : un arrêt brutal ne perd que le tronçon en cours
+d'écriture, écarté à la relecture. Le fichier se lit par projection en mémoire : les colonnes d'un tronçon
+sont des vues NumPy, sans copie.
+
+Utilisation :
+    python -m communicate.capture record session.s2c [--duration 60] [--plot]
+    python -m communicate.capture info session.s2c
+    python -m communicate.capture import data.json session.s2c
+    python -m communicate.capture compact session.s2c
+    python -m communicate.capture plot session.s2c
+
+Une capture peut aussi être rejouée comme un enregistrement data.json (--input session.s2c, Teensy virtuel).
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import CAPTURE_CHUNK, CAPTURE_FLUSH, CAPTURE_POLL
+from communicate.ringbuffer import RECORD
+
+
+MAGIC = b"S2PC"
+VERSION = 1
+
+# En-tête : magique, version, nombre de colonnes, réservé, écart entre time.time et time.monotonic à la capture
+HEADER = struct.Struct("<4sBBHd")
+COLUMN = struct.Struct("<16s8s")  # Nom, type NumPy (ex. "<f8")
+# Tronçon : magique, nombre de mesures, taille des colonnes (octets), CRC-32 des colonnes
+CHUNK = struct.Struct("<4sIII")
+CHUNK_MAGIC = b"CHNK"
+ALIGN = 8
+
+
+def padded(size: int) -> int:
+    """
+    Arrondit une taille au multiple de ALIGN supérieur.
+    """
+    return -(-size // ALIGN) * ALIGN
+
+
+def encode_header(dtype: np.dtype, clock_offset: float) -> bytes:
+    """
+    Encode l'en-tête d'un fichier de capture.
+
+    :param dtype: le type structuré des mesures (une colonne par champ)
+    :param clock_offset: l'écart time.time() - time.monotonic() au moment de la capture
+    :return: l'en-tête, complété jusqu'à un multiple de ALIGN
+    """
+    names = dtype.names
+    header = HEADER.pack(MAGIC, VERSION, len(names), 0, clock_offset)
+    header += b"".join(COLUMN.pack(name.encode(), dtype[name].str.encode()) for name in names)
+    return header.ljust(padded(len(header)), b"\0")
+
+
+def decode_header(buffer) -> Tuple[np.dtype, float, int]:
+    """
+    Décode l'en-tête d'un fichier de capture.
+
+    :param buffer: le début du fichier
+    :return: le type des mesures, l'écart d'horloge et la taille de l'en-tête
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Fichier de capture tronqué")
+    magic, version, count, _, clock_offset = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Ce fichier n'est pas une capture Shout2Play")
+    if version != VERSION:
+        raise ValueError(f"Version de capture non supportée : {version}")
+    size = HEADER.size + count * COLUMN.size
+    if len(buffer) < size:
+        raise ValueError("Fichier de capture tronqué")
+    fields = []
+    for i in range(count):
+        name, kind = COLUMN.unpack_from(buffer, HEADER.size + i * COLUMN.size)
+        fields.append((name.rstrip(b"\0").decode(), kind.rstrip(b"\0").decode()))
+    return np.dtype(fields), clock_offset, padded(size)
+
+
+def column_sizes(dtype: np.dtype, rows: int) -> List[int]:
+    """
+    Renvoie la place (alignée) occupée par chaque colonne d'un tronçon de `rows` mesures.
+    """
+    return [padded(rows * dtype[name].itemsize) for name in dtype.names]
+
+
+class CaptureWriter:
+    """
+    Écrit des mesures dans un fichier de capture, par tronçons ajoutés en fin de fichier.
+    Un fichier existant est complété (après avoir écarté un éventuel tronçon incomplet).
+    """
+    def __init__(self, path: str, dtype: np.dtype = RECORD, chunk: int = CAPTURE_CHUNK,
+                 clock_offset: Optional[float] = None):
+        """
+        :param path: le fichier de capture
+        :param dtype: le type structuré des mesures
+        :param chunk: le nombre maximal de mesures par tronçon
+        :param clock_offset: l'écart à ajouter à host_time pour obtenir l'heure (nouveau fichier seulement ;
+                             par défaut, time.time() - time.monotonic() au moment de la création)
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.zeros(chunk, dtype=self.dtype)
+        self.pending = 0
+        self.rows = 0
+        self.chunks = 0
+
+        if os.path.exists(path) and os.path.getsize(path):
+            reader = CaptureReader(path)
+            if reader.dtype != self.dtype:
+                raise ValueError(f"Colonnes de {path} différentes de celles de la capture")
+            self.clock_offset, end = reader.clock_offset, reader.end
+            self.rows, self.chunks = len(reader), len(reader.offsets)
+            reader.close()
+            self.file = open(path, "r+b")
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.clock_offset = time.time() - time.monotonic() if clock_offset is None else clock_offset
+            self.file = open(path, "wb")
+            self.file.write(encode_header(self.dtype, self.clock_offset))
+            self.file.flush()
+
+    def append(self, records: np.ndarray):
+        """
+        Ajoute des mesures ; un tronçon est écrit dès que le tampon est plein.
+
+        :param records: un tableau de mesures (type structuré du fichier)
+        """
+        capacity = len(self.buffer)
+        while len(records):
+            count = min(capacity - self.pending, len(records))
+            self.buffer[self.pending:self.pending + count] = records[:count]
+            self.pending += count
+            records = records[count:]
+            if self.pending == capacity:
+                self.flush()
+
+    def flush(self):
+        """
+        Écrit les mesures en attente dans un nouveau tronçon.
+        """
+        if not self.pending:
+            return
+        rows = self.buffer[:self.pending]
+        payload = b"".join(np.ascontiguousarray(rows[name]).tobytes().ljust(size, b"\0")
+                           for name, size in zip(self.dtype.names, column_sizes(self.dtype, len(rows))))
+        self.file.write(CHUNK.pack(CHUNK_MAGIC, len(rows), len(payload), zlib.crc32(payload)) + payload)
+        self.file.flush()
+        self.rows += self.pending
+        self.chunks += 1
+        self.pending = 0
+
+    def close(self):
+        """
+        Écrit les dernières mesures et ferme le fichier.
+        """
+        if self.file.closed:
+            return
+        self.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class CaptureReader:
+    """
+    Lit un fichier de capture projeté en mémoire.
+    Seuls les en-têtes des tronçons sont parcourus à l'ouverture (le CRC du dernier est vérifié) ;
+    un tronçon final incomplet ou corrompu (arrêt pendant l'écriture) est ignoré.
+    """
+    def __init__(self, path: str):
+        """
+        :param path: le fichier de capture
+        """
+        self.path = path
+        self.map = np.memmap(path, dtype="u1", mode="r") if os.path.getsize(path) else np.zeros(0, dtype="u1")
+        self.dtype, self.clock_offset, position = decode_header(self.map)
+        self.offsets: List[Tuple[int, int]] = []  # (position des colonnes, nombre de mesures)
+        ends = [position]  # Fin de l'en-tête puis de chaque tronçon
+
+        size = len(self.map)
+        while position + CHUNK.size <= size:
+            magic, rows, length, crc = CHUNK.unpack_from(self.map, position)
+            start = position + CHUNK.size
+            if magic != CHUNK_MAGIC or length != sum(column_sizes(self.dtype, rows)) or start + length > size:
+                break
+            self.offsets.append((start, rows))
+            position = start + length
+            ends.append(position)
+        # Seul le dernier tronçon a pu être interrompu pendant l'écriture
+        if self.offsets and not self.check(len(self.offsets) - 1):
+            self.offsets.pop()
+            ends.pop()
+        self.end = ends[-1]  # Position à partir de laquelle la capture peut être complétée
+        self.torn = self.end != size
+
+    def __len__(self):
+        return sum(rows for _, rows in self.offsets)
+
+    def check(self, index: int) -> bool:
+        """
+        Vérifie le CRC d'un tronçon.
+
+        :param index: le numéro du tronçon
+        :return: True si le tronçon est intact
+        """
+        start, rows = self.offsets[index]
+        length = sum(column_sizes(self.dtype, rows))
+        crc = CHUNK.unpack_from(self.map, start - CHUNK.size)[3]
+        return zlib.crc32(self.map[start:start + length]) == crc
+
+    def verify(self) -> List[int]:
+        """
+        Vérifie le CRC de tous les tronçons.
+
+        :return: les numéros des tronçons corrompus
+        """
+        return [index for index in range(len(self.offsets)) if not self.check(index)]
+
+    def chunk(self, index: int) -> Dict[str, np.ndarray]:
+        """
+        Renvoie les colonnes d'un tronçon, sous forme de vues sur le fichier (sans copie, lecture seule).
+
+        :param index: le numéro du tronçon
+        :return: un dictionnaire nom de colonne -> tableau NumPy
+        """
+        position, rows = self.offsets[index]
+        columns = {}
+        for name, size in zip(self.dtype.names, column_sizes(self.dtype, rows)):
+            columns[name] = np.frombuffer(self.map, dtype=self.dtype[name], count=rows, offset=position)
+            position += size
+        return columns
+
+    def chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Parcourt les tronçons un à un (seules les pages lues sont chargées).
+        """
+        for index in range(len(self.offsets)):
+            yield self.chunk(index)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Renvoie une colonne entière : une vue sur le fichier s'il n'a qu'un tronçon (voir compact), une copie sinon.
+
+        :param name: le nom de la colonne
+        :return: le tableau des valeurs
+        """
+        if len(self.offsets) == 1:
+            return self.chunk(0)[name]
+        if not self.offsets:
+            return np.empty(0, dtype=self.dtype[name])
+        return np.concatenate([columns[name] for columns in self.chunks()])
+
+    def records(self) -> np.ndarray:
+        """
+        Renvoie toutes les mesures dans un tableau structuré (copie).
+        """
+        records = np.empty(len(self), dtype=self.dtype)
+        start = 0
+        for columns in self.chunks():
+            rows = len(columns[self.dtype.names[0]])
+            for name, values in columns.items():
+                records[name][start:start + rows] = values
+            start += rows
+        return records
+
+    def close(self):
+        """
+        Libère la projection en mémoire (les vues déjà renvoyées la gardent ouverte).
+        """
+        self.map = None
+
+
+def import_json(source: str, path: str) -> int:
+    """
+    Convertit un enregistrement data.json (clés "times", "freqs" et "gains") en fichier de capture.
+    Les temps (time.time) deviennent les heures d'arrivée, déjà dans l'horloge murale : l'écart d'horloge
+    du fichier est nul. Le temps de Teensy est inconnu (NaN).
+
+    :param source: l'enregistrement data.json
+    :param path: le fichier de capture à écrire
+    :return: le nombre de mesures converties
+    """
+    with open(source, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    times = np.asarray(data["times"], dtype="f8")
+    records = np.zeros(min(len(times), len(data["gains"]), len(data["freqs"])), dtype=RECORD)
+    records["device_time"] = np.nan
+    records["host_time"] = times[:len(records)]
+    records["gain"] = data["gains"][:len(records)]
+    records["frequency"] = data["freqs"][:len(records)]
+
+    if os.path.exists(path):
+        os.remove(path)
+    with CaptureWriter(path, clock_offset=0.0) as writer:
+        writer.append(records)
+    return len(records)
+
+
+def compact(path: str) -> int:
+    """
+    Réécrit une capture en un seul tronçon, pour charger chaque colonne sans copie.
+
+    :param path: le fichier de capture
+    :return: le nombre de mesures
+    """
+    reader = CaptureReader(path)
+    records, clock_offset = reader.records(), reader.clock_offset
+    reader.close()
+
+    temporary = path + ".tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    with CaptureWriter(temporary, records.dtype, chunk=max(len(records), 1), clock_offset=clock_offset) as writer:
+        writer.append(records)
+    os.replace(temporary, path)
+    return len(records)
+
+
+def record(monitor, path: str, duration: Optional[float] = None, flush: float = CAPTURE_FLUSH, poll: float = CAPTURE_POLL):
+    """
+    Enregistre toutes les mesures reçues par un moniteur série, en relevant son historique horodaté.
+    Chaque mesure est écrite une seule fois ; celles écrasées avant d'être relevées sont comptées comme perdues.
+
+    :param monitor: le moniteur série (démarré)
+    :param path: le fichier de capture
+    :param duration: la durée de la capture en secondes (par défaut, jusqu'à Ctrl+C)
+    :param flush: l'intervalle (s) entre deux écritures de tronçon
+    :param poll: l'intervalle (s) entre deux relèves de l'historique
+    :return: le nombre de mesures enregistrées et perdues
+    """
+    ring = monitor.ring
+    cursor, lost = ring.count, 0
+    start = last_flush = time.monotonic()
+    with CaptureWriter(path) as writer:
+        first = writer.rows
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                time.sleep(poll)
+                end = ring.count
+                samples = ring.read(cursor, end)
+                lost += end - cursor - len(samples)
+                cursor = end
+                writer.append(samples)
+
+                now = time.monotonic()
+                if now - last_flush >= flush:
+                    writer.flush()
+                    last_flush = now
+                    count = writer.rows + writer.pending - first
+                    print(f"\r{count} mesures ({count / (now - start):.0f}/s), {lost} perdues", end="", flush=True)
+        except KeyboardInterrupt:
+            pass
+        count = writer.rows + writer.pending - first
+    print(f"\nCapture terminée : {count} mesures enregistrées dans {path}, {lost} perdues")
+    return count, lost
+
+
+def plot(path: str):
+    """
+    Affiche le gain et la fréquence d'une capture en fonction du temps.
+
+    :param path: le fichier de capture
+    """
+    import matplotlib.pyplot as plt
+
+    reader = CaptureReader(path)
+    times = reader.column("host_time")
+    times = times - times[0] if len(times) else times
+    plt.plot(times, reader.column("frequency"), label="Fréquence")
+    plt.plot(times, reader.column("gain"), label="Gain")
+    plt.xlabel("Temps (s)")
+    plt.legend()
+    plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture des mesures de Teensy (fichier .s2c en colonnes)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("record", help="enregistre les mesures reçues de Teensy")
+    command.add_argument("path", nargs="?", default="capture.s2c", help="fichier de capture (complété s'il existe)")
+    command.add_argument("--duration", type=float, help="durée de la capture en secondes (par défaut, jusqu'à Ctrl+C)")
+    command.add_argument("--port", default="", help="port série (par défaut, recherche de Teensy)")
+    command.add_argument("--plot", action="store_true", help="affiche le graphique à la fin de la capture")
+
+    command = commands.add_parser("info", help="décrit une capture et vérifie ses tronçons")
+    command.add_argument("path")
+
+    command = commands.add_parser("import", help="convertit un enregistrement data.json")
+    command.add_argument("source")
+    command.add_argument("path")
+
+    command = commands.add_parser("compact", help="réécrit une capture en un seul tronçon")
+    command.add_argument("path")
+
+    command = commands.add_parser("plot", help="affiche le gain et la fréquence d'une capture")
+    command.add_argument("path")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from communicate.serialMonitor import open_serial
+
+        monitor = open_serial(args.port)
+        monitor.start()
+        try:
+            record(monitor, args.path, args.duration)
+        finally:
+            monitor.stop()
+        if args.plot:
+            plot(args.path)
+    elif args.command == "info":
+        reader = CaptureReader(args.path)
+        times = reader.column("host_time")
+        duration = float(times[-1] - times[0]) if len(times) > 1 else 0.0
+        print(f"{args.path} : {len(reader)} mesures en {len(reader.offsets)} tronçons, {duration:.1f} s"
+              + (f" ({len(reader) / duration:.0f} mesures/s)" if duration else ""))
+        print("Colonnes : " + ", ".join(f"{name} ({reader.dtype[name].str})" for name in reader.dtype.names))
+        corrupted = reader.verify()
+        if reader.torn:
+            print("Tronçon final incomplet ignoré (capture interrompue)")
+        if corrupted:
+            print(f"Tronçons corrompus : {corrupted}")
+            sys.exit(1)
+    elif args.command == "import":
+        print(f"{import_json(args.source, args.path)} mesures converties dans {args.path}")
+    elif args.command == "compact":
+        print(f"{compact(args.path)} mesures réécrites en un tronçon")
+    elif args.command == "plot":
+        plot(args.path)
+
+
+if __name__ == "__main__":
+    main()
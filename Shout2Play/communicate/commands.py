@@ -0,0 +1,130 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Dict
+
+from config import COMMAND_QUEUE_SIZE, SOUND_BURST, SERIAL_LOG
+
+
+# Commandes de bascule de la musique : une seule peut être en attente
+TOGGLE_COMMANDS = {"pause": "resume", "resume": "pause"}
+
+# Effets sonores : le nombre d'exemplaires en attente est limité
+SOUND_COMMANDS = {"shoot.wav", "die.wav"}
+
+
+class CommandWriter(threading.Thread):
+    """
+    Thread d'écriture des commandes envoyées à Teensy.
+    Le jeu dépose ses commandes dans une file bornée sans jamais attendre le port série ;
+    les commandes redondantes sont fusionnées avant l'envoi.
+    """
+    def __init__(self, ser, max_pending: int = COMMAND_QUEUE_SIZE, sound_burst: int = SOUND_BURST, log: bool = SERIAL_LOG):
+        """
+        Initialise le thread d'écriture.
+
+        :param ser: Le port série (déjà ouvert).
+        :param max_pending: Le nombre maximal de commandes en attente.
+        :param sound_burst: Le nombre maximal d'exemplaires d'un même effet sonore en attente.
+        :param log: Affiche chaque commande envoyée.
+        """
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.max_pending = max_pending
+        self.sound_burst = sound_burst
+        self.log = log
+
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.stopping = False
+
+        # Compteurs
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.write_latency = 0.0
+        self.avg_write_latency = 0.0
+        self.max_write_latency = 0.0
+
+    def submit(self, message: str) -> bool:
+        """
+        Ajoute une commande à la file d'envoi sans bloquer.
+
+        :param message: La commande à envoyer.
+        :return: True si la commande a été mise en file (ou fusionnée), False si elle a été abandonnée.
+        """
+        with self.condition:
+            if message in TOGGLE_COMMANDS:
+                # Seule la dernière bascule compte : une bascule opposée en attente s'annule avec celle-ci
+                for pending in list(self.pending):
+                    if pending in TOGGLE_COMMANDS:
+                        self.pending.remove(pending)
+                        self.coalesced += 1
+                        if pending == TOGGLE_COMMANDS[message]:
+                            return True
+            elif message in SOUND_COMMANDS and self.pending.count(message) >= self.sound_burst:
+                self.dropped += 1
+                return False
+
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+
+            self.pending.append(message)
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.condition.notify()
+            return True
+
+    def run(self):
+        """
+        Boucle d'envoi : écrit les commandes en attente sur le port série, dans l'ordre.
+        """
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                message = self.pending.popleft()
+
+            start = time.perf_counter()
+            try:
+                self.ser.write(f"{message}\n".encode("utf-8"))
+            except Exception as e:
+                print(f"Erreur lors de l'envoi du message à Teensy : {e}")
+                continue
+
+            self.write_latency = time.perf_counter() - start
+            self.avg_write_latency += (self.write_latency - self.avg_write_latency) * 0.1
+            self.max_write_latency = max(self.max_write_latency, self.write_latency)
+            self.sent += 1
+            if self.log:
+                print(f"Sending message to Teensy: {message}")
+
+    def stop(self):
+        """
+        Envoie les commandes restantes puis arrête le thread.
+        """
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        if self.is_alive():
+            self.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs du thread d'écriture.
+
+        :return: Dictionnaire avec la profondeur de file, les abandons, les fusions et les latences d'écriture (ms).
+        """
+        return {
+            "depth": len(self.pending),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "write_latency_ms": self.write_latency * 1000,
+            "avg_write_latency_ms": self.avg_write_latency * 1000,
+            "max_write_latency_ms": self.max_write_latency * 1000
+        }
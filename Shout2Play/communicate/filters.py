@@ -0,0 +1,394 @@
+"""
+Conditionnement des mesures de Teensy avant leur utilisation par le jeu.
+
+Le gain et la fréquence passent chacun par une chaîne d'étages (moyenne exponentielle, médiane glissante,
+suivi du bruit de fond, détecteur d'attaque, porte à hystérésis). Chaque étage traite d'un coup le bloc
+de mesures reçues pendant une image (NumPy, sans boucle par mesure) et garde son état d'un bloc à l'autre.
+Chaque étage annonce le retard qu'il ajoute (en mesures, converti en millisecondes par la chaîne).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import SIGNAL_FILTERS, SIGNAL_RATE, SIM_RATE, GAIN_FILTERS, FREQUENCY_FILTERS
+
+
+class Stage:
+    """
+    Étage d'une chaîne de filtres : transforme un bloc de mesures en un bloc de même taille.
+    """
+    name = "stage"
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Traite un bloc de mesures (dans l'ordre chronologique).
+
+        :param block: les mesures du bloc
+        :return: les mesures filtrées
+        """
+        return block
+
+    @property
+    def latency(self) -> float:
+        """
+        Retard ajouté par l'étage, en mesures (retard de groupe aux basses fréquences).
+        """
+        return 0.0
+
+    def reset(self):
+        """
+        Oublie l'état accumulé (nouvelle partie, changement de source).
+        """
+
+
+class EMA(Stage):
+    """
+    Moyenne exponentielle : y[n] = y[n-1] + alpha * (x[n] - y[n-1]).
+    Le bloc est traité par la forme fermée de la récurrence (somme cumulée pondérée), par tronçons
+    assez courts pour que les poids restent dans la précision des flottants.
+    """
+    name = "ema"
+
+    def __init__(self, time_constant: float, rate: float):
+        """
+        :param time_constant: la constante de temps (s)
+        :param rate: le nombre de mesures par seconde
+        """
+        self.alpha = 1.0 - np.exp(-1.0 / (time_constant * rate)) if time_constant > 0 else 1.0
+        decay = 1.0 - self.alpha
+        # Tronçons tels que decay ** longueur reste au-dessus de 1e-12
+        self.chunk = max(1, min(4096, int(np.log(1e-12) / np.log(decay)))) if 0 < decay < 1 else 4096
+        self.value = None
+
+    def process(self, block):
+        if self.alpha >= 1.0 or not len(block):
+            if len(block):
+                self.value = float(block[-1])
+            return block
+        decay = 1.0 - self.alpha
+        out = np.empty(len(block))
+        value = float(block[0]) if self.value is None else self.value
+        for start in range(0, len(block), self.chunk):
+            x = block[start:start + self.chunk]
+            powers = decay ** np.arange(len(x))
+            # y[n] = decay^(n+1) * y[-1] + alpha * decay^n * somme des x[j] / decay^j
+            y = decay * powers * value + self.alpha * powers * np.cumsum(x / powers)
+            out[start:start + len(x)] = y
+            value = float(y[-1])
+        self.value = value
+        return out
+
+    @property
+    def latency(self):
+        return float((1.0 - self.alpha) / self.alpha)
+
+    def reset(self):
+        self.value = None
+
+
+class Median(Stage):
+    """
+    Médiane glissante sur les `width` dernières mesures : écarte les mesures aberrantes isolées.
+    """
+    name = "median"
+
+    def __init__(self, width: int):
+        """
+        :param width: le nombre de mesures de la fenêtre (impair de préférence)
+        """
+        self.width = max(1, int(width))
+        self.history = None
+
+    def process(self, block):
+        if self.width == 1 or not len(block):
+            return block
+        if self.history is None:
+            self.history = np.full(self.width - 1, block[0], dtype="f8")
+        data = np.concatenate((self.history, block))
+        self.history = data[-(self.width - 1):]
+        return np.median(sliding_window_view(data, self.width), axis=1)
+
+    @property
+    def latency(self):
+        return (self.width - 1) / 2
+
+    def reset(self):
+        self.history = None
+
+
+class NoiseFloor(Stage):
+    """
+    Suivi du bruit de fond : minimum glissant des mesures sur une fenêtre de quelques secondes.
+    Les mesures passent inchangées ; le niveau suivi sert de référence aux étages suivants (porte).
+    """
+    name = "noise_floor"
+
+    def __init__(self, window: float, rate: float):
+        """
+        :param window: la durée de la fenêtre (s)
+        :param rate: le nombre de mesures par seconde
+        """
+        self.width = max(1, int(window * rate))
+        self.history = None
+        self.levels = np.empty(0)  # Bruit de fond pour chaque mesure du dernier bloc
+        self.floor = 0.0
+
+    def process(self, block):
+        if not len(block):
+            return block
+        if self.history is None:
+            self.history = np.full(self.width - 1, block[0], dtype="f8")
+        data = np.concatenate((self.history, block))
+        self.history = data[len(data) - (self.width - 1):]
+        self.levels = sliding_window_view(data, self.width).min(axis=1)
+        self.floor = float(self.levels[-1])
+        return block
+
+    def reset(self):
+        self.history = None
+        self.levels = np.empty(0)
+        self.floor = 0.0
+
+
+class Onset(Stage):
+    """
+    Détecteur d'attaque : repère les mesures qui dépassent de `rise` le minimum des `span` mesures précédentes
+    (début d'un cri). Les mesures passent inchangées ; les attaques du dernier bloc sont dans `onsets`.
+    """
+    name = "onset"
+
+    def __init__(self, rise: float, span: float, rate: float):
+        """
+        :param rise: la montée minimale (unité des mesures, dB pour le gain)
+        :param span: la durée sur laquelle la montée est mesurée (s)
+        :param rate: le nombre de mesures par seconde
+        """
+        self.rise = rise
+        self.span = max(1, int(span * rate))
+        self.history = None
+        self.rising = False  # Condition d'attaque vraie à la dernière mesure (une attaque par front)
+        self.onsets = np.zeros(0, dtype=bool)
+        self.count = 0
+
+    def process(self, block):
+        if not len(block):
+            self.onsets = np.zeros(0, dtype=bool)
+            return block
+        if self.history is None:
+            self.history = np.full(self.span, block[0], dtype="f8")
+        data = np.concatenate((self.history, block))
+        self.history = data[-self.span:]
+        previous = sliding_window_view(data[:-1], self.span).min(axis=1)
+        rising = block - previous >= self.rise
+        self.onsets = rising & ~np.concatenate(([self.rising], rising[:-1]))
+        self.rising = bool(rising[-1])
+        self.count += int(self.onsets.sum())
+        return block
+
+    def reset(self):
+        self.history = None
+        self.rising = False
+        self.onsets = np.zeros(0, dtype=bool)
+
+
+class HysteresisGate(Stage):
+    """
+    Porte à hystérésis : s'ouvre quand la mesure atteint le seuil d'ouverture, ne se referme que sous
+    le seuil de fermeture. Porte fermée, la mesure est remplacée par `rest`. Les seuils sont absolus,
+    ou relatifs au bruit de fond suivi par un étage NoiseFloor.
+    """
+    name = "gate"
+
+    def __init__(self, open: float, close: float, rest: float = 0.0, floor: Optional[NoiseFloor] = None):
+        """
+        :param open: le seuil d'ouverture
+        :param close: le seuil de fermeture (inférieur ou égal au seuil d'ouverture)
+        :param rest: la valeur émise porte fermée
+        :param floor: l'étage de bruit de fond auquel les seuils sont relatifs (facultatif)
+        """
+        self.open_level = open
+        self.close_level = min(close, open)
+        self.rest = rest
+        self.floor = floor
+        self.is_open = False
+
+    def process(self, block):
+        if not len(block):
+            return block
+        reference = self.floor.levels if self.floor is not None and len(self.floor.levels) == len(block) else 0.0
+        # 1 : ouverture, 0 : fermeture, -1 : l'état précédent est conservé
+        events = np.where(block >= reference + self.open_level, 1, np.where(block < reference + self.close_level, 0, -1))
+        last = np.maximum.accumulate(np.where(events >= 0, np.arange(len(block)), -1))
+        state = np.where(last >= 0, events[np.maximum(last, 0)], int(self.is_open)).astype(bool)
+        self.is_open = bool(state[-1])
+        return np.where(state, block, self.rest)
+
+    def reset(self):
+        self.is_open = False
+
+
+# Étages disponibles dans la configuration
+STAGES = {
+    "ema": EMA,
+    "median": Median,
+    "noise_floor": NoiseFloor,
+    "onset": Onset,
+    "gate": HysteresisGate,
+}
+
+
+class FilterChain:
+    """
+    Suite d'étages appliqués dans l'ordre à chaque bloc de mesures.
+    """
+    def __init__(self, stages: Sequence[Stage], rate: float):
+        """
+        :param stages: les étages, dans l'ordre
+        :param rate: le nombre de mesures par seconde (pour exprimer les retards en millisecondes)
+        """
+        self.stages = list(stages)
+        self.rate = rate
+
+    def process(self, block) -> np.ndarray:
+        """
+        Fait passer un bloc de mesures par tous les étages.
+
+        :param block: les mesures du bloc
+        :return: les mesures filtrées
+        """
+        block = np.asarray(block, dtype="f8")
+        for stage in self.stages:
+            block = stage.process(block)
+        return block
+
+    def find(self, cls):
+        """
+        Renvoie le dernier étage d'un type donné, ou None.
+        """
+        for stage in reversed(self.stages):
+            if isinstance(stage, cls):
+                return stage
+        return None
+
+    def latency(self) -> List[Tuple[str, float]]:
+        """
+        Retard ajouté par chaque étage.
+
+        :return: la liste des couples (nom de l'étage, retard en ms)
+        """
+        return [(stage.name, stage.latency / self.rate * 1000) for stage in self.stages]
+
+    def total_latency(self) -> float:
+        """
+        Retard total de la chaîne (ms).
+        """
+        return sum(stage.latency for stage in self.stages) / self.rate * 1000
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+
+def build_chain(spec: Sequence[Tuple[str, Dict[str, Any]]], rate: float) -> FilterChain:
+    """
+    Construit une chaîne à partir de sa description dans config (liste de couples (étage, paramètres)).
+    Les durées sont en secondes ; une porte est reliée au dernier étage de bruit de fond qui la précède
+    (sauf avec le paramètre "relative": False, pour des seuils absolus).
+
+    :param spec: la description de la chaîne
+    :param rate: le nombre de mesures par seconde
+    :return: la chaîne de filtres
+    """
+    stages = []
+    for name, params in spec:
+        cls = STAGES[name]
+        params = dict(params)
+        if cls in (EMA, NoiseFloor, Onset):
+            params["rate"] = rate
+        if cls is HysteresisGate and params.pop("relative", True):
+            params["floor"] = FilterChain(stages, rate).find(NoiseFloor)
+        stages.append(cls(**params))
+    return FilterChain(stages, rate)
+
+
+class ConditionedInput:
+    """
+    Source d'entrées qui filtre le gain et la fréquence d'une autre source (SerialMonitor ou ScriptedInput).
+    Avec SerialMonitor, les chaînes traitent toutes les mesures reçues pendant l'image ; avec une source
+    qui ne fournit qu'une mesure par pas de simulation, chaque pas est un bloc d'une mesure.
+    Le reste (boutons, potentiomètres, commandes) est transmis tel quel.
+    """
+    def __init__(self, source, gain_filters=GAIN_FILTERS, frequency_filters=FREQUENCY_FILTERS, rate=None):
+        """
+        :param source: la source d'entrées filtrée
+        :param gain_filters: la description de la chaîne du gain
+        :param frequency_filters: la description de la chaîne de la fréquence
+        :param rate: le nombre de mesures par seconde (par défaut SIGNAL_RATE pour Teensy, SIM_RATE sinon)
+        """
+        self.source = source
+        self.rate = rate or (SIGNAL_RATE if hasattr(source, "ring") else SIM_RATE)
+        self.gain = build_chain(gain_filters, self.rate)
+        self.frequency = build_chain(frequency_filters, self.rate)
+        self.onset = self.gain.find(Onset)
+        self.noise_floor = self.gain.find(NoiseFloor)
+        self.last = None
+
+    def __getattr__(self, name):
+        # Tout le reste (start, stop, send, get_keys, statistiques...) est celui de la source
+        return getattr(self.source, name)
+
+    def get_frame_data(self) -> Dict[str, Any]:
+        """
+        Renvoie les mesures de l'image, gain et fréquence filtrés.
+        Comme SerialMonitor, le gain retenu est le pic (filtré) du bloc, avec la fréquence (filtrée) à cet instant.
+        """
+        data = self.source.get_frame_data()
+        samples = getattr(self.source, "frame_samples", None)
+        if samples is None:
+            gains, frequencies = [data["gain"]], [data["frequency"]]
+        else:
+            gains, frequencies = samples["gain"], samples["frequency"]
+
+        if len(gains):
+            gains = self.gain.process(gains)
+            frequencies = self.frequency.process(frequencies)
+            peak = int(gains.argmax())
+            self.last = float(gains[peak]), float(frequencies[peak])
+        if self.last is not None:
+            data["gain"], data["frequency"] = self.last
+
+        # Sans nouvelle mesure, l'attaque du bloc précédent n'est pas signalée une seconde fois
+        data["onset"] = bool(len(gains) and self.onset is not None and self.onset.onsets.any())
+        data["noise_floor"] = self.noise_floor.floor if self.noise_floor is not None else None
+        return data
+
+    def latency(self) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Retard ajouté par chaque étage des deux chaînes (ms).
+        """
+        return {"gain": self.gain.latency(), "frequency": self.frequency.latency()}
+
+    def describe(self) -> str:
+        """
+        Décrit les deux chaînes et le retard de chaque étage, pour le journal de démarrage.
+        """
+        lines = []
+        for name, chain in (("gain", self.gain), ("fréquence", self.frequency)):
+            stages = ", ".join(f"{stage} +{delay:.0f} ms" for stage, delay in chain.latency()) or "aucun filtre"
+            lines.append(f"Filtres {name} ({self.rate:g} mesures/s) : {stages} (total {chain.total_latency():.0f} ms)")
+        return "\n".join(lines)
+
+
+def condition(source):
+    """
+    Place les chaînes de filtres devant une source d'entrées, si elles sont activées dans config.
+
+    :param source: la source d'entrées
+    :return: la source filtrée (ou la source elle-même)
+    """
+    if not SIGNAL_FILTERS:
+        return source
+    conditioned = ConditionedInput(source)
+    print(conditioned.describe())
+    return conditioned
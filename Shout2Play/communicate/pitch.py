@@ -0,0 +1,440 @@
+"""
+Analyse de la voix sur l'hôte : hauteur (YIN) et niveau sonore (RMS) à partir de l'audio brut décimé
+envoyé par Teensy en mode audio (trames KIND_AUDIO), ou lu dans un fichier WAV.
+
+La FFT 1024 points de la carte a une résolution d'environ 43 Hz : la fréquence mesurée saute d'un
+intervalle à l'autre. YIN mesure la période du signal dans le domaine temporel et l'affine par
+interpolation parabolique, ce qui donne une hauteur continue.
+
+Ce module n'importe pas config (ni pygame) : il est chargé tel quel par le processus d'analyse.
+
+Exécution hors ligne depuis le dossier Shout2Play :
+    python -m communicate.pitch enregistrement.wav [--output piste.json]
+"""
+import json
+import time
+import wave
+import queue
+import argparse
+import multiprocessing
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+
+# Conversion du niveau en dB SPL (mêmes constantes que le firmware)
+MIC_SENSITIVITY = 0.01
+REFERENCE_PRESSURE = 0.00002
+
+# Bloc d'audio à analyser : (temps de l'appareil du premier échantillon, heure d'arrivée, fréquence d'échantillonnage, échantillons int16)
+Block = Tuple[float, float, int, np.ndarray]
+
+
+class Pitch(NamedTuple):
+    """
+    Mesure publiée pour chaque bloc analysé.
+    """
+    device_time: float   # Temps de l'appareil à la fin du bloc (s)
+    host_time: float     # Heure d'arrivée du bloc sur l'hôte (time.monotonic)
+    gain: float          # Niveau sonore du bloc (dB SPL, échelle du firmware)
+    frequency: float     # Fréquence fondamentale (Hz, 0 : pas de hauteur)
+    aperiodicity: float  # Minimum de la différence normalisée de YIN (0 : parfaitement périodique)
+    latency: float       # Délai entre l'arrivée du bloc et la fin de son analyse (s)
+
+
+def yin(frames, sample_rate, fmin, fmax, threshold):
+    """
+    Estime la fréquence fondamentale de plusieurs fenêtres à la fois (algorithme YIN, vectorisé).
+    La fonction de différence est calculée pour toutes les fenêtres par une seule corrélation FFT.
+
+    :param frames: les fenêtres à analyser, tableau (fenêtres, échantillons)
+    :param sample_rate: la fréquence d'échantillonnage (Hz)
+    :param fmin: la fréquence minimale recherchée (Hz)
+    :param fmax: la fréquence maximale recherchée (Hz)
+    :param threshold: le seuil de la différence normalisée en dessous duquel une période est retenue
+    :return: un tuple (fréquences en Hz, 0 sans hauteur ; apériodicités)
+    """
+    frames = np.atleast_2d(np.asarray(frames, dtype="f8"))
+    count, length = frames.shape
+    tau_min = max(2, int(sample_rate / fmax))
+    tau_max = min(int(sample_rate / fmin) + 1, length // 2)
+    window = length - tau_max
+    taus = np.arange(tau_max + 1)
+
+    # d(tau) = somme des x[j]² + somme des x[j + tau]² - 2 * somme des x[j] * x[j + tau], pour j < window
+    size = 1 << int(np.ceil(np.log2(length + window)))
+    cross = np.fft.irfft(np.fft.rfft(frames, size) * np.conj(np.fft.rfft(frames[:, :window], size)), size)[:, :tau_max + 1]
+    energy = np.zeros((count, length + 1))
+    np.cumsum(frames ** 2, axis=1, out=energy[:, 1:])
+    difference = energy[:, window:window + 1] + energy[:, taus + window] - energy[:, taus] - 2 * cross
+    np.maximum(difference, 0, out=difference)  # Erreurs d'arrondi de la FFT
+
+    # Différence normalisée par sa moyenne cumulée (1 pour un signal nul)
+    cumulative = np.cumsum(difference[:, 1:], axis=1)
+    normalized = np.ones_like(difference)
+    np.divide(difference[:, 1:] * taus[1:], cumulative, out=normalized[:, 1:], where=cumulative > 0)
+
+    # Premier minimum local sous le seuil : c'est le fond du premier creux qui passe sous le seuil
+    search = normalized[:, tau_min:tau_max]
+    candidates = (search < threshold) & (search <= normalized[:, tau_min + 1:tau_max + 1])
+    voiced = candidates.any(axis=1)
+    tau = tau_min + candidates.argmax(axis=1)
+
+    # Interpolation parabolique autour du minimum
+    rows = np.arange(count)
+    before, current, after = normalized[rows, tau - 1], normalized[rows, tau], normalized[rows, tau + 1]
+    curvature = before - 2 * current + after
+    shift = np.divide(before - after, 2 * curvature, out=np.zeros(count), where=np.abs(curvature) > 1e-12)
+    period = tau + np.clip(shift, -1, 1)
+
+    frequency = np.where(voiced, sample_rate / period, 0.0)
+    aperiodicity = np.where(voiced, current, search.min(axis=1))
+    return frequency, aperiodicity
+
+
+def loudness(blocks, offset=0.0):
+    """
+    Calcule le niveau sonore (RMS) de plusieurs blocs, converti en dB SPL comme par le firmware.
+
+    :param blocks: les blocs d'échantillons int16 (ou normalisés sur [-1, 1] s'ils sont flottants), tableau (blocs, échantillons)
+    :param offset: la correction (dB) qui ramène le niveau RMS à l'échelle de la mesure FFT du firmware
+    :return: le tableau des niveaux (dB SPL, 0 au plus bas comme sur la carte)
+    """
+    blocks = np.atleast_2d(blocks)
+    if blocks.dtype.kind in "iu":
+        blocks = blocks / 32768.0
+    rms = np.sqrt(np.mean(np.square(blocks, dtype="f8"), axis=1))
+    pressure = rms / MIC_SENSITIVITY
+    return np.maximum(20 * np.log10(np.maximum(pressure, REFERENCE_PRESSURE) / REFERENCE_PRESSURE) + offset, 0.0)
+
+
+def amplitude(gain, offset=0.0):
+    """
+    Renvoie l'amplitude (sur [0, 1]) d'une sinusoïde mesurée au niveau donné par loudness.
+
+    :param gain: le niveau (dB SPL)
+    :param offset: la même correction que pour loudness
+    :return: l'amplitude crête
+    """
+    return REFERENCE_PRESSURE * 10 ** ((gain - offset) / 20) * MIC_SENSITIVITY * np.sqrt(2)
+
+
+class PitchTracker:
+    """
+    Analyse en continu d'un flux d'audio décimé.
+    Chaque bloc reçu termine une fenêtre de `window` échantillons (les précédents sont gardés en tampon) ;
+    tous les blocs reçus ensemble sont analysés en un seul appel vectorisé. Les blocs plus vieux que
+    le budget de latence sont seulement ajoutés au tampon : seule la mesure la plus récente compte pour le jeu.
+    """
+    def __init__(self, sample_rate, window, block, fmin, fmax, threshold, silence, gain_offset, budget):
+        """
+        :param sample_rate: la fréquence d'échantillonnage attendue (Hz)
+        :param window: le nombre d'échantillons de chaque fenêtre analysée
+        :param block: le nombre d'échantillons utilisés pour le niveau sonore (fin de la fenêtre)
+        :param fmin: la fréquence minimale recherchée (Hz)
+        :param fmax: la fréquence maximale recherchée (Hz)
+        :param threshold: le seuil de YIN
+        :param silence: le niveau (dB SPL) en dessous duquel aucune hauteur n'est mesurée
+        :param gain_offset: la correction du niveau (dB) vers l'échelle du firmware
+        :param budget: l'âge maximal (s) d'un bloc analysé
+        """
+        self.window = window
+        self.block = block
+        self.fmin = fmin
+        self.fmax = fmax
+        self.threshold = threshold
+        self.silence = silence
+        self.gain_offset = gain_offset
+        self.budget = budget
+
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros(window)
+
+        # Statistiques
+        self.analyzed = 0
+        self.skipped = 0
+
+    def reset(self, sample_rate=None):
+        """
+        Vide le tampon (et change la fréquence d'échantillonnage si besoin).
+        """
+        self.sample_rate = sample_rate or self.sample_rate
+        self.buffer = np.zeros(self.window)
+
+    def feed(self, blocks: Sequence[Block], now=None) -> List[Pitch]:
+        """
+        Ajoute des blocs au tampon et analyse ceux qui respectent le budget de latence (au moins le dernier).
+
+        :param blocks: les blocs reçus, dans l'ordre
+        :param now: l'heure de référence pour le budget (par défaut, time.monotonic())
+        :return: une mesure par bloc analysé
+        """
+        if not blocks:
+            return []
+        if blocks[0][2] != self.sample_rate:
+            self.reset(blocks[0][2])
+
+        now = time.monotonic() if now is None else now
+        data = np.concatenate([self.buffer] + [np.asarray(samples, dtype="f8") / 32768.0 for _, _, _, samples in blocks])
+        ends = self.window + np.cumsum([len(samples) for _, _, _, samples in blocks])
+        self.buffer = data[-self.window:]
+
+        keep = [i for i, (_, host_time, _, _) in enumerate(blocks) if now - host_time <= self.budget]
+        if not keep or keep[-1] != len(blocks) - 1:
+            keep.append(len(blocks) - 1)
+        self.skipped += len(blocks) - len(keep)
+        self.analyzed += len(keep)
+
+        frames = data[ends[keep, None] - self.window + np.arange(self.window)]
+        frequency, aperiodicity = yin(frames, self.sample_rate, self.fmin, self.fmax, self.threshold)
+        gain = loudness(frames[:, -self.block:], self.gain_offset)
+        frequency[gain < self.silence] = 0.0
+
+        done = time.monotonic()
+        results = []
+        for i, f, a, g in zip(keep, frequency.tolist(), aperiodicity.tolist(), gain.tolist()):
+            device_time, host_time, sample_rate, samples = blocks[i]
+            results.append(Pitch(device_time + len(samples) / sample_rate, host_time, g, f, a, done - host_time))
+        return results
+
+
+def run_worker(inputs, outputs, settings):
+    """
+    Boucle du processus d'analyse : regroupe les blocs en attente, les analyse et publie les mesures.
+
+    :param inputs: la file des blocs (None : arrêt)
+    :param outputs: la file des listes de mesures
+    :param settings: les paramètres de PitchTracker
+    """
+    tracker = PitchTracker(**settings)
+    running = True
+    while running:
+        block = inputs.get()
+        if block is None:
+            return
+        blocks = [block]
+        while True:
+            try:
+                block = inputs.get_nowait()
+            except queue.Empty:
+                break
+            if block is None:
+                running = False
+                break
+            blocks.append(block)
+        outputs.put(tracker.feed(blocks))
+
+
+class PitchWorker:
+    """
+    Analyse des blocs d'audio hors du thread du lecteur série.
+    Dans un processus séparé (par défaut), les blocs passent par une file bornée : un bloc qui n'y trouve
+    pas de place est abandonné plutôt que de retarder la lecture du port série.
+    """
+    def __init__(self, settings: Dict[str, Any], process: bool = True, queue_size: int = 64):
+        """
+        :param settings: les paramètres de PitchTracker (voir settings_from_config)
+        :param process: analyse dans un processus séparé (False : dans le thread appelant, à chaque appel de results)
+        :param queue_size: le nombre maximal de blocs en attente
+        """
+        self.settings = settings
+        self.process = process
+        self.queue_size = queue_size
+
+        self.inputs = None
+        self.outputs = None
+        self.worker = None
+        self.tracker = None if process else PitchTracker(**settings)
+        self.pending: List[Block] = []
+
+        # Statistiques
+        self.submitted = 0
+        self.dropped = 0
+        self.published = 0
+        self.latency = 0.0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        """
+        Démarre le processus d'analyse.
+        """
+        if not self.process:
+            return
+        self.inputs = multiprocessing.Queue(self.queue_size)
+        self.outputs = multiprocessing.Queue()
+        self.worker = multiprocessing.Process(target=run_worker, args=(self.inputs, self.outputs, self.settings), daemon=True)
+        self.worker.start()
+
+    def submit(self, device_time, host_time, sample_rate, samples):
+        """
+        Transmet un bloc d'audio à analyser, sans attendre.
+
+        :return: False si le bloc a été abandonné (file pleine)
+        """
+        self.submitted += 1
+        block = (device_time, host_time, sample_rate, samples)
+        if not self.process:
+            self.pending.append(block)
+            return True
+        try:
+            self.inputs.put_nowait(block)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def results(self) -> List[Pitch]:
+        """
+        Renvoie les mesures publiées depuis l'appel précédent, sans attendre.
+        """
+        results = []
+        if not self.process:
+            results = self.tracker.feed(self.pending)
+            self.pending = []
+        elif self.outputs is not None:
+            while True:
+                try:
+                    results += self.outputs.get_nowait()
+                except queue.Empty:
+                    break
+
+        for result in results:
+            self.latency = result.latency
+            self.avg_latency += (self.latency - self.avg_latency) * 0.05
+            self.max_latency = max(self.max_latency, self.latency)
+        self.published += len(results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques d'analyse (latences en ms).
+        """
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "published": self.published,
+            "latency_ms": self.latency * 1000,
+            "avg_latency_ms": self.avg_latency * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+        }
+
+    def stop(self):
+        """
+        Arrête le processus d'analyse.
+        """
+        if self.worker is None:
+            return
+        try:
+            self.inputs.put(None, timeout=0.5)
+        except queue.Full:
+            pass
+        self.worker.join(1)
+        if self.worker.is_alive():
+            self.worker.terminate()
+        for channel in (self.inputs, self.outputs):
+            channel.cancel_join_thread()
+            channel.close()
+        self.worker = None
+
+
+def load_wav(path: str, sample_rate: int) -> np.ndarray:
+    """
+    Charge un fichier WAV PCM, le mixe en mono et le ramène à la fréquence d'échantillonnage voulue.
+    Une décimation entière se fait par moyenne de groupes d'échantillons, comme sur la carte.
+
+    :param path: le chemin du fichier
+    :param sample_rate: la fréquence d'échantillonnage voulue (Hz)
+    :return: les échantillons int16
+    """
+    with wave.open(path, "rb") as file:
+        width, channels, rate = file.getsampwidth(), file.getnchannels(), file.getframerate()
+        raw = file.readframes(file.getnframes())
+
+    if width == 1:
+        audio = (np.frombuffer(raw, dtype="u1").astype("f8") - 128) * 256
+    elif width == 2:
+        audio = np.frombuffer(raw, dtype="<i2").astype("f8")
+    elif width == 3:
+        bytes_ = np.frombuffer(raw, dtype="u1").reshape(-1, 3)
+        audio = ((bytes_[:, 0].astype("i4") << 8 | bytes_[:, 1].astype("i4") << 16 | bytes_[:, 2].astype("i4") << 24) >> 16).astype("f8")
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype="<i4").astype("f8") / 65536
+    else:
+        raise ValueError(f"{path} : échantillons de {width} octets non pris en charge")
+    audio = audio.reshape(-1, channels).mean(axis=1)
+
+    if rate % sample_rate == 0:
+        factor = rate // sample_rate
+        audio = audio[:len(audio) // factor * factor].reshape(-1, factor).mean(axis=1)
+    elif rate != sample_rate:
+        times = np.arange(int(len(audio) * sample_rate / rate)) * (rate / sample_rate)
+        audio = np.interp(times, np.arange(len(audio)), audio)
+    return np.clip(np.round(audio), -32768, 32767).astype("i2")
+
+
+def analyze(audio: np.ndarray, settings: Dict[str, Any], batch: int = 256) -> List[Pitch]:
+    """
+    Analyse un enregistrement complet, bloc par bloc comme en jeu, par lots vectorisés.
+
+    :param audio: les échantillons int16 à la fréquence settings["sample_rate"]
+    :param settings: les paramètres de PitchTracker
+    :param batch: le nombre de blocs analysés par appel
+    :return: une mesure par bloc
+    """
+    tracker = PitchTracker(**dict(settings, budget=float("inf")))
+    rate, size = settings["sample_rate"], settings["block"]
+    blocks = [(start / rate, start / rate, rate, audio[start:start + size])
+              for start in range(0, len(audio) - size + 1, size)]
+    results = []
+    for start in range(0, len(blocks), batch):
+        results += tracker.feed(blocks[start:start + batch], now=0.0)
+    return results
+
+
+def settings_from_config() -> Dict[str, Any]:
+    """
+    Renvoie les paramètres de PitchTracker définis dans config.
+    """
+    from config import (PITCH_RATE, PITCH_WINDOW, PITCH_BLOCK, PITCH_FMIN, PITCH_FMAX, PITCH_THRESHOLD,
+                        PITCH_SILENCE, PITCH_GAIN_OFFSET, PITCH_LATENCY_BUDGET)
+    return {
+        "sample_rate": PITCH_RATE,
+        "window": PITCH_WINDOW,
+        "block": PITCH_BLOCK,
+        "fmin": PITCH_FMIN,
+        "fmax": PITCH_FMAX,
+        "threshold": PITCH_THRESHOLD,
+        "silence": PITCH_SILENCE,
+        "gain_offset": PITCH_GAIN_OFFSET,
+        "budget": PITCH_LATENCY_BUDGET,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure de la hauteur et du niveau d'un fichier WAV")
+    parser.add_argument("path", help="fichier WAV à analyser")
+    parser.add_argument("--output", help="piste à écrire au format data.json (temps, fréquences, niveaux)")
+    args = parser.parse_args()
+
+    settings = settings_from_config()
+    audio = load_wav(args.path, settings["sample_rate"])
+    start = time.perf_counter()
+    track = analyze(audio, settings)
+    elapsed = time.perf_counter() - start
+
+    voiced = [pitch.frequency for pitch in track if pitch.frequency > 0]
+    duration = len(audio) / settings["sample_rate"]
+    print(f"{len(track)} blocs ({duration:.1f} s) analysés en {elapsed * 1000:.0f} ms "
+          f"({elapsed / max(len(track), 1) * 1e6:.0f} µs/bloc)")
+    if voiced:
+        print(f"Voisé : {len(voiced) / len(track):.0%}, fréquence médiane {np.median(voiced):.1f} Hz")
+    else:
+        print("Aucune hauteur détectée")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"times": [pitch.device_time for pitch in track],
+                       "freqs": [pitch.frequency for pitch in track],
+                       "gains": [pitch.gain for pitch in track]}, file)
+        print(f"Piste enregistrée dans {args.output}")
@@ -0,0 +1,226 @@
+import json
+import base64
+import binascii
+import struct
+from collections import namedtuple
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+
+# --- Trames binaires (protocole v1) ---
+# En-tête : marqueur de synchronisation, version, type de trame, numéro de séquence, longueur de la charge utile
+# Charge utile : dépend du type de trame
+# Fin de trame : CRC-16/CCITT (init 0xFFFF) calculé de la version jusqu'à la fin de la charge utile
+SYNC = b"\xa5\x5a"
+VERSION = 1
+HEADER = struct.Struct("<2sBBHH")
+CRC = struct.Struct("<H")
+MAX_PAYLOAD = 1024
+
+# Types de trames
+KIND_TELEMETRY = 1
+KIND_AUDIO = 2
+
+# Télémétrie : temps de l'appareil (ms), gain (dB SPL), fréquence (Hz), diviseur, seuil, boutons
+TELEMETRY = struct.Struct("<IffHHB")
+BUTTON_SHOOT = 0x01
+BUTTON_PAUSE = 0x02
+
+# Audio décimé : temps de l'appareil (ms) du premier échantillon, fréquence d'échantillonnage (Hz),
+# nombre d'échantillons, puis les échantillons (int16)
+AUDIO = struct.Struct("<IHH")
+MAX_AUDIO_SAMPLES = (MAX_PAYLOAD - AUDIO.size) // 2
+
+# Commande envoyée par l'hôte pour passer en binaire ; la carte répond par la même ligne
+NEGOTIATE = f"proto {VERSION}"
+# Commande demandant en plus l'envoi de l'audio brut (après passage en binaire) ; même réponse
+NEGOTIATE_AUDIO = f"audio {VERSION}"
+
+Telemetry = namedtuple("Telemetry", [
+    "seq", "device_time", "gain", "frequency",
+    "button_pressed_shoot", "button_pressed_pause", "divider", "threshold"
+])
+
+AudioBlock = namedtuple("AudioBlock", ["seq", "device_time", "sample_rate", "samples"])
+
+Record = Union[Telemetry, AudioBlock, Dict[str, Any], str]
+
+
+def crc16(data: bytes) -> int:
+    """
+    Calcule le CRC-16/CCITT (polynôme 0x1021, init 0xFFFF) utilisé par les trames.
+
+    :param data: les octets à protéger
+    :return: le CRC sur 16 bits
+    """
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(kind: int, seq: int, payload: bytes) -> bytes:
+    """
+    Construit une trame binaire complète.
+
+    :param kind: le type de trame
+    :param seq: le numéro de séquence (modulo 65536)
+    :param payload: la charge utile
+    :return: la trame encodée
+    """
+    header = HEADER.pack(SYNC, VERSION, kind, seq & 0xFFFF, len(payload))
+    return header + payload + CRC.pack(crc16(header[2:] + payload))
+
+
+def encode_telemetry(seq: int, device_time: float, gain: float, frequency: float,
+                     shoot: bool, pause: bool, divider: int, threshold: int) -> bytes:
+    """
+    Encode une mesure de télémétrie dans une trame binaire (format émis par la carte).
+
+    :param seq: le numéro de séquence
+    :param device_time: le temps de l'appareil en secondes
+    :param gain: le niveau sonore en dB SPL
+    :param frequency: la fréquence dominante en Hz
+    :param shoot: l'état du bouton de tir
+    :param pause: l'état du bouton de pause
+    :param divider: la valeur du potentiomètre diviseur
+    :param threshold: la valeur du potentiomètre de seuil
+    :return: la trame encodée
+    """
+    buttons = (BUTTON_SHOOT if shoot else 0) | (BUTTON_PAUSE if pause else 0)
+    payload = TELEMETRY.pack(int(device_time * 1000) & 0xFFFFFFFF, gain, frequency, int(divider), int(threshold), buttons)
+    return encode_frame(KIND_TELEMETRY, seq, payload)
+
+
+def encode_audio(seq: int, device_time: float, sample_rate: int, samples) -> bytes:
+    """
+    Encode un bloc d'audio décimé dans une trame binaire (format émis par la carte en mode audio).
+
+    :param seq: le numéro de séquence
+    :param device_time: le temps de l'appareil du premier échantillon, en secondes
+    :param sample_rate: la fréquence d'échantillonnage en Hz
+    :param samples: les échantillons (int16, au plus MAX_AUDIO_SAMPLES)
+    :return: la trame encodée
+    """
+    samples = np.asarray(samples, dtype="<i2")
+    payload = AUDIO.pack(int(device_time * 1000) & 0xFFFFFFFF, sample_rate, len(samples)) + samples.tobytes()
+    return encode_frame(KIND_AUDIO, seq, payload)
+
+
+def encode_legacy(gain: float, frequency: float, shoot: bool, pause: bool, divider: int, threshold: int) -> bytes:
+    """
+    Encode une mesure au format historique (JSON encodé en Base64, une ligne par message).
+
+    :return: la ligne encodée, terminée par un retour à la ligne
+    """
+    message = (f'{{"gain":{gain:.2f},"frequency":{frequency:.2f},'
+               f'"button_pressed_shoot":{int(shoot)},"button_pressed_pause":{int(pause)},'
+               f'"divider":{int(divider)},"threshold":{int(threshold)}}}')
+    return base64.b64encode(message.encode("utf-8")) + b"\r\n"
+
+
+class StreamDecoder:
+    """
+    Décodeur incrémental du flux série.
+    Accepte indifféremment des trames binaires et des lignes de texte (format historique ou journal de la carte),
+    se resynchronise sur le marqueur de début de trame et vérifie le CRC de chaque trame.
+    """
+    def __init__(self):
+        """
+        Initialise un décodeur avec un tampon vide.
+        """
+        self.buffer = bytearray()
+
+        # Format des dernières données reçues ("legacy" ou "binary")
+        self.format = "legacy"
+
+        # Compteurs
+        self.frames = 0
+        self.audio_frames = 0
+        self.legacy_lines = 0
+        self.crc_errors = 0
+        self.resyncs = 0
+
+    def feed(self, data: bytes) -> List[Record]:
+        """
+        Ajoute des octets reçus et renvoie les messages complets qu'ils contiennent.
+
+        :param data: les octets lus sur le port série
+        :return: la liste des messages décodés (Telemetry pour une trame binaire,
+                 dictionnaire pour une ligne au format historique, texte brut sinon)
+        """
+        buf = self.buffer
+        buf += data
+        records = []
+        size = len(buf)
+        pos = 0
+
+        while pos < size:
+            if buf[pos] == SYNC[0]:
+                # Début de trame binaire : on attend d'avoir l'en-tête complet
+                if size - pos < HEADER.size:
+                    break
+                sync, version, kind, seq, length = HEADER.unpack_from(buf, pos)
+                if sync != SYNC or version != VERSION or length > MAX_PAYLOAD:
+                    self.resyncs += 1
+                    pos += 1
+                    continue
+
+                end = pos + HEADER.size + length + CRC.size
+                if end > size:
+                    break
+                if crc16(buf[pos + 2:end - CRC.size]) != CRC.unpack_from(buf, end - CRC.size)[0]:
+                    self.crc_errors += 1
+                    pos += 1
+                    continue
+
+                if kind == KIND_TELEMETRY and length == TELEMETRY.size:
+                    time_ms, gain, frequency, divider, threshold, buttons = TELEMETRY.unpack_from(buf, pos + HEADER.size)
+                    records.append(Telemetry(seq, time_ms / 1000, gain, frequency,
+                                             bool(buttons & BUTTON_SHOOT), bool(buttons & BUTTON_PAUSE),
+                                             divider, threshold))
+                    self.frames += 1
+                    self.format = "binary"
+                elif kind == KIND_AUDIO and length >= AUDIO.size:
+                    time_ms, sample_rate, count = AUDIO.unpack_from(buf, pos + HEADER.size)
+                    if length == AUDIO.size + 2 * count:
+                        start = pos + HEADER.size + AUDIO.size
+                        samples = np.frombuffer(bytes(buf[start:start + 2 * count]), dtype="<i2")
+                        records.append(AudioBlock(seq, time_ms / 1000, sample_rate, samples))
+                        self.audio_frames += 1
+                pos = end
+                continue
+
+            # Ligne de texte : elle s'arrête au retour à la ligne ou au prochain début de trame
+            newline = buf.find(b"\n", pos)
+            sync = buf.find(SYNC[:1], pos)
+            if sync != -1 and (newline == -1 or sync < newline):
+                # Reste d'une trame corrompue : on l'ignore
+                self.resyncs += 1
+                pos = sync
+                continue
+            if newline == -1:
+                break
+
+            line = bytes(buf[pos:newline]).strip()
+            pos = newline + 1
+            if line:
+                records.append(self.decode_line(line))
+
+        del buf[:pos]
+        return records
+
+    def decode_line(self, line: bytes) -> Record:
+        """
+        Décode une ligne de texte au format historique (JSON encodé en Base64).
+
+        :param line: la ligne sans retour à la ligne
+        :return: le dictionnaire décodé, ou le texte brut si la ligne n'est pas un message
+        """
+        try:
+            data = json.loads(base64.b64decode(line, validate=True))
+            if isinstance(data, dict):
+                self.legacy_lines += 1
+                self.format = "legacy"
+                return data
+        except (ValueError, binascii.Error):
+            pass
+        return line.decode("utf-8", errors="replace")
@@ -0,0 +1,138 @@
+import numpy as np
+
+from config import RING_CAPACITY
+
+
+# Format d'un enregistrement de télémétrie
+RECORD = np.dtype([
+    ("device_time", "f8"),  # Temps de Teensy en secondes (NaN au format historique)
+    ("host_time", "f8"),    # Heure d'arrivée sur l'hôte (time.monotonic)
+    ("gain", "f4"),         # Niveau sonore (dB SPL)
+    ("frequency", "f4"),    # Fréquence dominante (Hz)
+    ("buttons", "u1"),      # État des boutons (bits BUTTON_SHOOT / BUTTON_PAUSE)
+])
+
+
+class TelemetryRing:
+    """
+    Tampon circulaire de taille fixe contenant les dernières mesures reçues de Teensy.
+    Un seul thread écrit (le lecteur série), les autres lisent sans verrou : un lecteur copie
+    d'abord les données puis écarte celles que l'écrivain a pu écraser pendant la copie.
+    """
+    def __init__(self, capacity=RING_CAPACITY):
+        """
+        Initialise un tampon vide.
+
+        :param capacity: le nombre maximal de mesures conservées
+        """
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=RECORD)
+
+        # Nombre total de mesures écrites depuis la création (jamais remis à zéro)
+        self.count = 0
+
+    def push(self, device_time, host_time, gain, frequency, buttons):
+        """
+        Ajoute une mesure (réservé à l'unique thread écrivain).
+
+        :param device_time: le temps de Teensy en secondes
+        :param host_time: l'heure d'arrivée sur l'hôte
+        :param gain: le niveau sonore
+        :param frequency: la fréquence dominante
+        :param buttons: l'état des boutons
+        """
+        self.data[self.count % self.capacity] = (device_time, host_time, gain, frequency, buttons)
+        # Publication de la mesure une fois entièrement écrite
+        self.count += 1
+
+    def read(self, start, end=None):
+        """
+        Copie les mesures d'index global [start, end) dans l'ordre chronologique.
+        Les mesures déjà écrasées par l'écrivain sont omises : la case de la mesure count est
+        en cours d'écriture, seules les capacity - 1 dernières mesures sont donc lisibles.
+
+        :param start: l'index global de la première mesure
+        :param end: l'index global de fin (par défaut, la dernière mesure publiée)
+        :return: un tableau NumPy de mesures (copie)
+        """
+        end = self.count if end is None else end
+        start = max(start, end - self.capacity + 1, 0)
+        if start >= end:
+            return np.empty(0, dtype=RECORD)
+
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            records = self.data[first:last].copy()
+        else:
+            records = np.concatenate((self.data[first:], self.data[:last]))
+
+        # Écarte les mesures écrasées pendant la copie
+        overwritten = self.count - self.capacity + 1 - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records
+
+    def window(self, n):
+        """
+        Renvoie les n dernières mesures.
+
+        :param n: le nombre de mesures
+        :return: un tableau NumPy de mesures
+        """
+        end = self.count
+        return self.read(end - n, end)
+
+    def since(self, t, field="host_time"):
+        """
+        Renvoie les mesures postérieures à un instant donné.
+
+        :param t: l'instant de référence
+        :param field: l'horloge utilisée ("host_time" ou "device_time")
+        :return: un tableau NumPy de mesures
+        """
+        records = self.read(0)
+        return records[np.searchsorted(records[field], t, side="right"):]
+
+    def max(self, field, n=None, since=None):
+        """
+        Renvoie le maximum d'un champ sur une fenêtre (n dernières mesures ou depuis un instant).
+
+        :return: le maximum, ou None si la fenêtre est vide
+        """
+        values = self._select(n, since)[field]
+        return values.max() if len(values) else None
+
+    def mean(self, field, n=None, since=None):
+        """
+        Renvoie la moyenne d'un champ sur une fenêtre (n dernières mesures ou depuis un instant).
+
+        :return: la moyenne, ou None si la fenêtre est vide
+        """
+        values = self._select(n, since)[field]
+        return values.mean() if len(values) else None
+
+    def edges(self, button, since=None, rising=True):
+        """
+        Renvoie les instants où un bouton a été enfoncé (ou relâché).
+
+        :param button: le bit du bouton (BUTTON_SHOOT ou BUTTON_PAUSE)
+        :param since: l'instant de référence (host_time) ; par défaut tout le tampon
+        :param rising: True pour les appuis, False pour les relâchements
+        :return: un tableau des host_time des fronts
+        """
+        records = self.read(0)
+        start = 0 if since is None else np.searchsorted(records["host_time"], since, side="right")
+        # On garde la mesure précédente pour détecter un front sur la première mesure de la fenêtre
+        records = records[max(start - 1, 0):]
+        pressed = (records["buttons"] & button) != 0
+        changes = pressed[1:] != pressed[:-1]
+        changes &= pressed[1:] if rising else ~pressed[1:]
+        return records["host_time"][1:][changes]
+
+    def _select(self, n, since):
+        """
+        Sélectionne la fenêtre demandée.
+        """
+        if since is not None:
+            return self.since(since)
+        return self.window(n if n is not None else self.capacity)
@@ -0,0 +1,100 @@
+import json
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+
+# Mesure émise : (délai depuis la précédente (s), gain, fréquence, tir, pause, diviseur, seuil)
+Sample = Tuple[float, float, float, bool, bool, int, int]
+
+
+def load_recording(path: str, divider: int = 1000, threshold: int = 60) -> List[Sample]:
+    """
+    Charge un enregistrement au format data.json (clés "times", "freqs" et "gains").
+
+    :param path: le chemin du fichier
+    :param divider: la valeur du potentiomètre diviseur à émettre
+    :param threshold: la valeur du potentiomètre de seuil à émettre
+    :return: la liste des mesures
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    times = data["times"]
+    samples = []
+    for i, (gain, frequency) in enumerate(zip(data["gains"], data["freqs"])):
+        delay = times[i] - times[i - 1] if i > 0 else 0.0
+        samples.append((max(delay, 0.0), gain, frequency, False, False, divider, threshold))
+    return samples
+
+
+def load_capture(path: str, divider: int = 1000, threshold: int = 60) -> List[Sample]:
+    """
+    Charge un fichier de capture (.s2c), en rejouant les mesures au rythme de leur arrivée sur l'hôte.
+
+    :param path: le chemin du fichier
+    :param divider: la valeur du potentiomètre diviseur à émettre
+    :param threshold: la valeur du potentiomètre de seuil à émettre
+    :return: la liste des mesures
+    """
+    from communicate.capture import CaptureReader
+    from communicate.protocol import BUTTON_SHOOT, BUTTON_PAUSE
+
+    records = CaptureReader(path).records()
+    delays = np.maximum(np.diff(records["host_time"], prepend=records["host_time"][:1]), 0.0)
+    return [(float(delay), float(gain), float(frequency), bool(buttons & BUTTON_SHOOT), bool(buttons & BUTTON_PAUSE), divider, threshold)
+            for delay, gain, frequency, buttons in zip(delays, records["gain"], records["frequency"], records["buttons"])]
+
+
+def synthetic_shouts(duration: float = 30.0, period: float = 0.01, shout_every: float = 2.0, shout_length: float = 0.3,
+                     floor: float = 55.0, peak: float = 95.0, frequency: float = 440.0,
+                     divider: int = 1000, threshold: int = 60) -> Iterator[Sample]:
+    """
+    Génère un profil de cris synthétique : un niveau de fond et un cri régulier à fréquence fixe.
+
+    :param duration: la durée totale en secondes
+    :param period: l'intervalle entre deux mesures
+    :param shout_every: l'intervalle entre deux cris
+    :param shout_length: la durée d'un cri
+    :param floor: le niveau de fond (dB SPL)
+    :param peak: le niveau d'un cri (dB SPL)
+    :param frequency: la fréquence d'un cri (Hz)
+    :return: un itérateur de mesures
+    """
+    for i in range(int(duration / period)):
+        t = i * period
+        shouting = t % shout_every < shout_length
+        yield (period, peak if shouting else floor, frequency if shouting else 0.0, False, False, divider, threshold)
+
+
+def load_wav_samples(path: str, divider: int = 1000, threshold: int = 60) -> List[Sample]:
+    """
+    Mesure la hauteur et le niveau d'un fichier WAV (analyse de l'hôte, comme en mode audio), une mesure par bloc.
+
+    :param path: le chemin du fichier
+    :param divider: la valeur du potentiomètre diviseur à émettre
+    :param threshold: la valeur du potentiomètre de seuil à émettre
+    :return: la liste des mesures
+    """
+    from communicate.pitch import analyze, load_wav, settings_from_config
+
+    settings = settings_from_config()
+    period = settings["block"] / settings["sample_rate"]
+    return [(period, pitch.gain, pitch.frequency, False, False, divider, threshold)
+            for pitch in analyze(load_wav(path, settings["sample_rate"]), settings)]
+
+
+def load_samples(source: str) -> List[Sample]:
+    """
+    Charge des mesures depuis un enregistrement data.json, une capture ou un fichier WAV, ou génère le profil synthétique.
+
+    :param source: le chemin d'un enregistrement (.json, .s2c ou .wav), ou "synthetic"
+    :return: la liste des mesures
+    """
+    if source == "synthetic":
+        return list(synthetic_shouts())
+    if source.lower().endswith(".wav"):
+        return load_wav_samples(source)
+    if source.lower().endswith(".s2c"):
+        return load_capture(source)
+    return load_recording(source)
@@ -1,30 +1,72 @@
-import json
 import time
-import base64
 import threading
-from queue import Queue
 from typing import Optional, Dict, Any
 
+import numpy as np
 import serial
 from serial.tools import list_ports
 
+from config import SERIAL_PROTOCOL, NEGOTIATION_TIMEOUT, SERIAL_READER, SERIAL_READ_TIMEOUT, SERIAL_DEVICE, VIRTUAL_TEENSY, VIRTUAL_RATE, VIRTUAL_AUDIO
+from config import PITCH_HOST, PITCH_PROCESS, PITCH_QUEUE
+from communicate.protocol import NEGOTIATE, NEGOTIATE_AUDIO, BUTTON_SHOOT, BUTTON_PAUSE, StreamDecoder, Telemetry, AudioBlock
+from communicate.pitch import Pitch, PitchWorker, settings_from_config
+from communicate.ringbuffer import TelemetryRing
+from communicate.commands import CommandWriter
+
 
 class SerialMonitor(threading.Thread):
     """
     Classe qui gère la lecture des données en série à partir d'un périphérique Teensy.
     Elle fonctionne dans un thread séparé pour effectuer une lecture continue des données.
     """
-    def __init__(self, serial_port: str, baud_rate: int):
+    def __init__(self, serial_port: str, baud_rate: int, protocol: str = SERIAL_PROTOCOL, reader: str = SERIAL_READER,
+                 pitch: bool = PITCH_HOST):
         """
         Initialise la connexion série pour lire les données de Teensy.
         
         :param serial_port: Le port série auquel est connecté le Teensy.
         :param baud_rate: La vitesse de transmission en bauds.
+        :param protocol: Le format demandé à Teensy ("binary" ou "legacy").
+        :param reader: Le mode de lecture ("blocking" : lecture bloquante avec délai court, "poll" : scrutation).
+        :param pitch: Demande l'audio brut à Teensy (après passage en binaire) et mesure hauteur et niveau sur l'hôte.
         """
         super().__init__()
-        self.ser = serial.Serial(serial_port, baud_rate, timeout=0.1)
+        self.reader = reader
+        timeout = SERIAL_READ_TIMEOUT if reader == "blocking" else 0.1
+        self.ser = serial.Serial(serial_port, baud_rate, timeout=timeout)
         self.stop_event = threading.Event()
-        self.queue = Queue()
+
+        # Teensy virtuel éventuellement associé (arrêté avec le moniteur)
+        self.virtual_device = None
+
+        # Envoi des commandes dans un thread dédié (file bornée, commandes redondantes fusionnées)
+        self.writer = CommandWriter(self.ser)
+
+        # Décodage du flux (trames binaires ou lignes Base64/JSON historiques)
+        self.protocol = protocol
+        self.decoder = StreamDecoder()
+        self.negotiated = False
+
+        # Analyse de la voix sur l'hôte (active une fois l'audio brut accepté par Teensy)
+        self.pitch = PitchWorker(settings_from_config(), PITCH_PROCESS, PITCH_QUEUE) if pitch else None
+        self.audio = False
+
+        # Historique horodaté des mesures et position de lecture du jeu
+        self.ring = TelemetryRing()
+        self.cursor = 0
+        self.frame_samples = None
+
+        # Statistiques de lecture (arriéré et latence d'arrivée des trames)
+        self.backlog = 0
+        self.max_backlog = 0
+        self.reads = 0
+        self.records = 0
+        self.latency = 0.0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+        self.avg_interval = 0.0
+        self.last_arrival = None
+        self.min_offset = None
 
         # Variables pour stocker les données
         self.gain = 0
@@ -39,25 +81,160 @@ class SerialMonitor(threading.Thread):
         Boucle principale de lecture des données de Teensy.
         Lit les données du port série et les décode.
         """
+        # Demande le format binaire ; sans réponse, on reste sur le format historique
+        negotiation_start = time.time()
+        if self.protocol == "binary":
+            self.send(NEGOTIATE)
+
         while not self.stop_event.is_set():
             try:
-                if self.ser.in_waiting > 0:
-                    data = self.ser.readline().decode("utf-8").strip()
-                    if data:
-                        try:
-                            data = base64.b64decode(data).decode("utf-8")
-                            data = json.loads(data)
-                            self.process_data(data)
-                        except Exception as e:
-                            print(f"Erreur de décodage ou traitement des données: {e}")
-                            print(f"> {data}")  # Log si non JSON
-                else:
-                    time.sleep(0.05)  # Réduit la durée du sommeil pour améliorer la réactivité
+                data = self.read_available()
+                if data:
+                    arrival = time.monotonic()
+                    records = self.decoder.feed(data)
+                    self.update_stats(records, arrival)
+                    for record in records:
+                        self.process_record(record, arrival)
+
+                if self.pitch:
+                    for result in self.pitch.results():
+                        self.process_pitch(result)
+
+                if self.protocol == "binary" and not self.negotiated and time.time() - negotiation_start > NEGOTIATION_TIMEOUT:
+                    print("Format binaire non supporté par Teensy, utilisation du format historique")
+                    self.protocol = "legacy"
 
             except Exception as e:
                 print(f"Erreur de lecture série : {e}")
                 break
 
+    def read_available(self) -> bytes:
+        """
+        Lit en une fois tous les octets disponibles sur le port série.
+        En mode "blocking", attend le premier octet (au plus SERIAL_READ_TIMEOUT) au lieu de dormir,
+        puis vide le tampon du port d'un seul bloc.
+
+        :return: Les octets lus (éventuellement vides).
+        """
+        if self.reader == "blocking":
+            data = self.ser.read(1)
+            if not data:
+                return data
+            waiting = self.ser.in_waiting
+            self.backlog = waiting + 1
+            if waiting:
+                data += self.ser.read(waiting)
+        else:
+            waiting = self.ser.in_waiting
+            self.backlog = waiting
+            if not waiting:
+                time.sleep(0.05)  # Réduit la durée du sommeil pour améliorer la réactivité
+                return b""
+            data = self.ser.read(waiting)
+
+        self.reads += 1
+        self.max_backlog = max(self.max_backlog, self.backlog)
+        return data
+
+    def update_stats(self, records, arrival: float):
+        """
+        Met à jour les statistiques de latence à partir des messages reçus lors d'une lecture.
+        Pour les trames binaires, la latence est l'écart entre l'horloge de l'hôte et celle de Teensy,
+        rapporté au plus petit écart observé (latence au-delà du meilleur cas).
+
+        :param records: Les messages décodés lors de la lecture.
+        :param arrival: L'heure d'arrivée (time.monotonic) des données.
+        """
+        if not records:
+            return
+        self.records += len(records)
+
+        if self.last_arrival is not None:
+            interval = (arrival - self.last_arrival) / len(records)
+            self.avg_interval += (interval - self.avg_interval) * 0.05
+        self.last_arrival = arrival
+
+        for record in records:
+            if isinstance(record, Telemetry):
+                offset = arrival - record.device_time
+                if self.min_offset is None or offset < self.min_offset:
+                    self.min_offset = offset
+                self.latency = offset - self.min_offset
+                self.avg_latency += (self.latency - self.avg_latency) * 0.05
+                self.max_latency = max(self.max_latency, self.latency)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de lecture du port série.
+
+        :return: Dictionnaire avec l'arriéré (octets), le nombre de messages par lecture et les latences (ms).
+        """
+        return {
+            "backlog": self.backlog,
+            "max_backlog": self.max_backlog,
+            "records_per_read": self.records / self.reads if self.reads else 0.0,
+            "latency_ms": self.latency * 1000,
+            "avg_latency_ms": self.avg_latency * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+            "avg_interval_ms": self.avg_interval * 1000,
+            "format": self.decoder.format,
+            "pitch": self.pitch.stats() if self.audio else None
+        }
+
+    def process_record(self, record, arrival: Optional[float] = None):
+        """
+        Traite un message décodé du flux série.
+
+        :param record: une trame binaire (Telemetry ou AudioBlock), un dictionnaire (format historique) ou une ligne de texte.
+        :param arrival: L'heure d'arrivée (time.monotonic) du message.
+        """
+        arrival = time.monotonic() if arrival is None else arrival
+        if isinstance(record, Telemetry):
+            self.process_frame(record)
+            self.ring.push(record.device_time, arrival, self.gain, self.frequency, self.buttons())
+        elif isinstance(record, AudioBlock):
+            if self.pitch:
+                self.pitch.submit(record.device_time, arrival, record.sample_rate, record.samples)
+        elif isinstance(record, dict):
+            self.process_data(record)
+            self.ring.push(np.nan, arrival, self.gain, self.frequency, self.buttons())
+        elif record == NEGOTIATE:
+            self.negotiated = True
+            print("Format binaire accepté par Teensy")
+            if self.pitch:
+                self.send(NEGOTIATE_AUDIO)
+        elif record == NEGOTIATE_AUDIO:
+            self.audio = True
+            print("Audio brut accepté par Teensy : hauteur et niveau mesurés sur l'hôte")
+        else:
+            print(f"> {record}")  # Log de Teensy
+
+    def process_frame(self, frame: Telemetry):
+        """
+        Met à jour les variables internes à partir d'une trame binaire.
+
+        :param frame: La trame de télémétrie décodée.
+        """
+        if not self.audio:
+            # Avec l'audio brut, le gain et la fréquence viennent de l'analyse sur l'hôte
+            self.gain = frame.gain
+            self.frequency = frame.frequency
+        self.button_pressed_shoot = frame.button_pressed_shoot
+        self.button_pressed_pause = frame.button_pressed_pause
+        self.divider = frame.divider
+        self.threshold = frame.threshold
+
+    def process_pitch(self, pitch: Pitch):
+        """
+        Publie une mesure de l'analyse sur l'hôte (gain et fréquence) dans les variables internes et l'historique.
+
+        :param pitch: La mesure calculée à partir de l'audio brut.
+        """
+        self.gain = pitch.gain
+        self.frequency = pitch.frequency
+        # Horodatée à la publication : l'historique reste trié par heure d'arrivée
+        self.ring.push(pitch.device_time, time.monotonic(), self.gain, self.frequency, self.buttons())
+
     def process_data(self, data: Dict[str, Any]):
         """
         Parse les données JSON et met à jour les variables internes.
@@ -72,6 +249,37 @@ class SerialMonitor(threading.Thread):
             except Exception as e:
                 print(f"Erreur lors de la lecture des données {key} de Teensy : {e}")
 
+    def buttons(self) -> int:
+        """
+        Retourne l'état des boutons sous forme de champ de bits.
+
+        :return: Combinaison de BUTTON_SHOOT et BUTTON_PAUSE.
+        """
+        return (BUTTON_SHOOT if self.button_pressed_shoot else 0) | (BUTTON_PAUSE if self.button_pressed_pause else 0)
+
+    def get_frame_data(self) -> Dict[str, Any]:
+        """
+        Retourne les valeurs lues depuis Teensy, agrégées sur toutes les mesures reçues depuis l'appel précédent.
+        Le gain retenu est le pic de la fenêtre (avec la fréquence mesurée à cet instant) et un bouton est
+        considéré enfoncé s'il l'a été dans au moins une mesure : aucun cri ni appui bref n'est perdu entre deux images.
+
+        :return: Dictionnaire au même format que get_data.
+        """
+        data = self.get_data()
+        end = self.ring.count
+        samples = self.ring.read(self.cursor, end)
+        self.cursor = end
+        self.frame_samples = samples  # Mesures brutes de l'image (pour le conditionnement)
+
+        if len(samples):
+            peak = samples["gain"].argmax()
+            data["gain"] = float(samples["gain"][peak])
+            data["frequency"] = float(samples["frequency"][peak])
+            buttons = int(np.bitwise_or.reduce(samples["buttons"]))
+            data["button_pressed_shoot"] = bool(buttons & BUTTON_SHOOT)
+            data["button_pressed_pause"] = bool(buttons & BUTTON_PAUSE)
+        return data
+
     def get_data(self) -> Dict[str, Any]:
         """
         Retourne un dictionnaire des dernières valeurs lues depuis Teensy.
@@ -87,17 +295,24 @@ class SerialMonitor(threading.Thread):
             "threshold": self.threshold
         }
     
+    def start(self):
+        """
+        Démarre le processus d'analyse de la voix (s'il est demandé), le thread d'écriture puis le thread de lecture.
+        """
+        if self.pitch:
+            self.pitch.start()
+        self.writer.start()
+        super().start()
+
     def send(self, message: str) -> None:
         """
-        Envoie un message au Teensy via le port série.
+        Envoie un message au Teensy via le port série, sans attendre l'écriture.
 
         :param message: Le message à envoyer à Teensy.
         """
-        try:
-            print(f"Sending message to Teensy: {message}")
-            self.ser.write(f"{message}\n".encode("utf-8"))
-        except Exception as e:
-            print(f"Erreur lors de l'envoi du message à Teensy : {e}")
+        if not self.writer.submit(message):
+            if self.writer.log:
+                print(f"Message abandonné (file pleine ou rafale) : {message}")
 
     def stop(self):
         """
@@ -105,7 +320,12 @@ class SerialMonitor(threading.Thread):
         """
         self.stop_event.set()  # Déclenche l'arrêt
         self.join()  # Attendre la fin du thread
+        self.writer.stop()  # Envoyer les dernières commandes
         self.ser.close()  # Fermer le port série
+        if self.pitch:
+            self.pitch.stop()
+        if self.virtual_device:
+            self.virtual_device.stop()
         print("Connexion série fermée.")
 
 
@@ -126,17 +346,29 @@ def open_serial(default_port: str = "", baudrate: int = 115200) -> SerialMonitor
     """
     Ouvre une connexion série avec Teensy.
 
+    Si VIRTUAL_TEENSY est défini, un Teensy virtuel est démarré et utilisé à la place de la carte ;
+    si SERIAL_DEVICE est défini, ce port est utilisé sans recherche automatique.
+
     :param default_port: Port série par défaut à utiliser si aucun périphérique Teensy n'est trouvé automatiquement.
     :param baudrate: Vitesse de transmission en bauds.
     :return: Instance de SerialMonitor pour la gestion de la communication série.
     """
     try:
-        port = get_teensy_com_port() or default_port
+        device = None
+        if VIRTUAL_TEENSY:
+            from communicate.virtual_teensy import open_virtual_teensy
+            device = open_virtual_teensy(VIRTUAL_TEENSY, rate=VIRTUAL_RATE, audio=VIRTUAL_AUDIO)
+            port = device.port
+            print(f"Teensy virtuel ({VIRTUAL_TEENSY}) démarré sur {port}")
+        else:
+            port = SERIAL_DEVICE or get_teensy_com_port() or default_port
         if not port:
             raise Exception("Port série non trouvé")
         
         print(f"Ouverture du port série {port} à {baudrate}bps...")
-        return SerialMonitor(port, baudrate)
+        monitor = SerialMonitor(port, baudrate)
+        monitor.virtual_device = device
+        return monitor
     except Exception as e:
         print(f"Erreur lors de la recherche de ports série : {e}")
         raise
@@ -144,42 +376,10 @@ def open_serial(default_port: str = "", baudrate: int = 115200) -> SerialMonitor
 
 if __name__ == "__main__":
     """
-    Exécution principale du programme. Lit les données depuis Teensy, les enregistre dans un fichier JSON 
-    et affiche un graphique avec les données lues.
+    Exécution principale du programme : enregistre les mesures de Teensy dans un fichier de capture
+    (voir communicate.capture, ex. `python -m communicate.serialMonitor session.s2c --plot`).
     """
-    monitor = open_serial()
-    monitor.start()
-
-    times = []
-    freqs = []
-    gains = []
-
-    try:
-        while len(times) <= 1000:
-            data = monitor.get_data()
-            print(data)
-
-            times.append(time.time())
-            freqs.append(data["frequency"])
-            gains.append(data["gain"])
-
-            time.sleep(0.01)  # Temps d'attente pour éviter d'être trop rapide
-
-    except KeyboardInterrupt:
-        print("Lecture interrompue.")
-
-    # Sauvegarde des données en JSON
-    with open("data.json", "w") as f:
-        json.dump({"times": times, "freqs": freqs, "gains": gains}, f)
-
-    # Importation des bibliothèques pour le graphique
-    import matplotlib.pyplot as plt
-
-    # Génération du graphique
-    plt.plot(times, freqs, label="Fréquence")
-    plt.plot(times, gains, label="Gain")
-    plt.legend()
-    plt.show()
+    import sys
+    from communicate.capture import main
 
-    # Stoppe le thread de manière propre
-    monitor.stop()
+    main(["record"] + sys.argv[1:])
@@ -0,0 +1,266 @@
+"""
+Teensy virtuel : remplace la carte en rejouant des mesures enregistrées (ou synthétiques)
+sur un pseudo-terminal, au format exact de src/main.cpp.
+
+Exécution depuis le dossier Shout2Play :
+    python -m communicate.virtual_teensy --replay ../data.json --rate 2 --loop
+    python -m communicate.virtual_teensy --synthetic --rate 0
+    python -m communicate.virtual_teensy --synthetic --audio voix.wav --loop
+"""
+import os
+import pty
+import tty
+import time
+import select
+import argparse
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import PITCH_RATE, PITCH_BLOCK, PITCH_GAIN_OFFSET
+from communicate.protocol import NEGOTIATE, NEGOTIATE_AUDIO, encode_audio, encode_legacy, encode_telemetry
+from communicate.samples import Sample, load_samples, synthetic_shouts
+from communicate.pitch import amplitude, load_wav
+
+
+class VirtualTeensy(threading.Thread):
+    """
+    Appareil virtuel exposant un pseudo-terminal Linux.
+    Émet les mesures au format historique (Base64/JSON) ou en trames binaires après négociation,
+    répond aux commandes comme le firmware et garde la liste des commandes reçues.
+    En mode audio, émet aussi l'audio décimé : celui d'un fichier WAV, ou à défaut une sinusoïde
+    à la fréquence et au niveau de chaque mesure (un bruit blanc de même niveau si la fréquence est nulle).
+    """
+    def __init__(self, samples: Iterable[Sample], rate: float = 1.0, loop: bool = False, log: bool = False,
+                 audio: Optional[np.ndarray] = None):
+        """
+        Ouvre le pseudo-terminal.
+
+        :param samples: les mesures à émettre
+        :param rate: la vitesse de rejeu (1 : temps réel, N : N fois plus vite, 0 : sans attente)
+        :param loop: rejoue les mesures en boucle
+        :param log: affiche les commandes reçues
+        :param audio: l'audio émis en mode audio (int16 à PITCH_RATE, rejoué en boucle ; par défaut synthétisé)
+        """
+        super().__init__(daemon=True)
+        self.samples = list(samples) if loop else samples
+        self.rate = rate
+        self.loop = loop
+        self.log = log
+
+        # Pseudo-terminal en mode brut (aucune transformation des octets)
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+        self.stop_event = threading.Event()
+        self.binary = False
+        self.audio_mode = False
+        self.seq = 0
+        self.start_time = time.monotonic()
+        self.emitted = 0
+        self.commands: List[Tuple[float, str]] = []
+        self.input = bytearray()
+
+        # Audio émis en mode audio : position de lecture, phase de la sinusoïde et échantillons en attente
+        self.audio = audio
+        self.audio_position = 0
+        self.audio_due = 0.0
+        self.phase = 0.0
+        self.noise = np.random.default_rng(0)
+        self.pending_audio = np.empty(0, dtype="i2")
+
+        # État simplifié de la musique (pour reproduire les messages du firmware)
+        self.background_playing = False
+        self.was_playing = False
+
+    def run(self):
+        """
+        Boucle d'émission des mesures.
+        """
+        next_time = time.monotonic()
+        while not self.stop_event.is_set():
+            for delay, gain, frequency, shoot, pause, divider, threshold in self.samples:
+                if self.stop_event.is_set():
+                    break
+                if self.rate > 0:
+                    next_time += delay / self.rate
+                    wait = next_time - time.monotonic()
+                    if wait > 0:
+                        self.stop_event.wait(wait)
+
+                self.read_commands()
+                if self.binary:
+                    self.write(encode_telemetry(self.seq, time.monotonic() - self.start_time,
+                                                gain, frequency, shoot, pause, divider, threshold))
+                    self.seq += 1
+                else:
+                    self.write(encode_legacy(gain, frequency, shoot, pause, divider, threshold))
+                if self.audio_mode:
+                    self.emit_audio(delay, gain, frequency)
+                self.emitted += 1
+
+            if not self.loop:
+                break
+
+        # Les commandes restent traitées jusqu'à l'arrêt
+        while not self.stop_event.wait(0.01):
+            self.read_commands()
+
+    def read_commands(self):
+        """
+        Lit sans bloquer les commandes envoyées par l'hôte et y répond.
+        """
+        while select.select([self.master], [], [], 0)[0]:
+            try:
+                data = os.read(self.master, 1024)
+            except OSError:
+                return
+            if not data:
+                return
+            self.input += data
+
+        while b"\n" in self.input:
+            line, _, rest = bytes(self.input).partition(b"\n")
+            self.input = bytearray(rest)
+            command = line.decode("utf-8", errors="replace").strip()
+            if command:
+                self.handle_command(command)
+
+    def handle_command(self, command: str):
+        """
+        Applique une commande comme le ferait le firmware et enregistre sa réception.
+
+        :param command: la commande reçue
+        """
+        self.commands.append((time.monotonic() - self.start_time, command))
+        if self.log:
+            print(f"[Teensy virtuel] {command}")
+
+        if command == NEGOTIATE:
+            self.println(NEGOTIATE)
+            self.binary = True
+        elif command == NEGOTIATE_AUDIO and self.binary:
+            self.println(NEGOTIATE_AUDIO)
+            self.audio_mode = True
+        elif command == "init":
+            self.background_playing = self.was_playing = False
+            self.println("Playing main_menu.wav")
+        elif command in ("shoot.wav", "die.wav"):
+            self.println(f"Playing {command}")
+        elif command == "pause" and self.background_playing:
+            self.background_playing = False
+            self.was_playing = True
+            self.println("Pausing background music")
+            self.println("Playing main_menu.wav")
+        elif command == "resume":
+            self.println("Resuming background music" if self.was_playing else "Playing shout2play.wav")
+            self.background_playing = True
+            self.was_playing = False
+        elif command == "stop":
+            if self.background_playing:
+                self.println("Stopping background music")
+            self.background_playing = self.was_playing = False
+
+    def emit_audio(self, duration: float, gain: float, frequency: float):
+        """
+        Émet l'audio correspondant à la durée d'une mesure, par trames de PITCH_BLOCK échantillons.
+
+        :param duration: la durée couverte par la mesure (s)
+        :param gain: le niveau de la mesure (dB SPL), pour la sinusoïde synthétisée
+        :param frequency: la fréquence de la mesure (Hz, 0 : silence), pour la sinusoïde synthétisée
+        """
+        self.audio_due += duration * PITCH_RATE
+        count = int(self.audio_due)
+        self.audio_due -= count
+        if self.audio is not None:
+            indices = (self.audio_position + np.arange(count)) % len(self.audio)
+            self.audio_position = (self.audio_position + count) % len(self.audio)
+            samples = self.audio[indices]
+        else:
+            steps = self.phase + 2 * np.pi * frequency / PITCH_RATE * np.arange(1, count + 1)
+            self.phase = float(steps[-1]) % (2 * np.pi) if count else self.phase
+            level = min(amplitude(gain, PITCH_GAIN_OFFSET), 1.0)
+            wave = np.sin(steps) if frequency > 0 else self.noise.standard_normal(count) / np.sqrt(2)
+            samples = np.round(np.clip(wave * level, -1, 1) * 32767).astype("i2")
+
+        self.pending_audio = np.concatenate((self.pending_audio, samples))
+        while len(self.pending_audio) >= PITCH_BLOCK:
+            block, self.pending_audio = self.pending_audio[:PITCH_BLOCK], self.pending_audio[PITCH_BLOCK:]
+            self.write(encode_audio(self.seq, time.monotonic() - self.start_time - PITCH_BLOCK / PITCH_RATE, PITCH_RATE, block))
+            self.seq += 1
+
+    def println(self, text: str):
+        """
+        Envoie une ligne de texte (équivalent de Serial.println).
+        """
+        self.write(f"{text}\r\n".encode("utf-8"))
+
+    def write(self, data: bytes):
+        """
+        Écrit des octets vers l'hôte (bloque si l'hôte ne lit pas assez vite).
+        """
+        try:
+            os.write(self.master, data)
+        except OSError:
+            self.stop_event.set()
+
+    def command_names(self) -> List[str]:
+        """
+        Retourne la liste des commandes reçues, dans l'ordre.
+        """
+        return [command for _, command in self.commands]
+
+    def stop(self):
+        """
+        Arrête l'émission et ferme le pseudo-terminal.
+        """
+        self.stop_event.set()
+        if self.is_alive():
+            self.join()
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def open_virtual_teensy(source: str, rate: float = 1.0, loop: bool = True, audio: str = "") -> VirtualTeensy:
+    """
+    Crée et démarre un Teensy virtuel.
+
+    :param source: le chemin d'un enregistrement data.json ou d'une capture .s2c, ou "synthetic" pour un profil synthétique
+    :param rate: la vitesse de rejeu (0 : sans attente)
+    :param loop: rejoue les mesures en boucle
+    :param audio: le fichier WAV émis en mode audio (par défaut, audio synthétisé à partir des mesures)
+    :return: l'appareil démarré (son port est dans l'attribut port)
+    """
+    device = VirtualTeensy(load_samples(source), rate=rate, loop=loop, audio=load_wav(audio, PITCH_RATE) if audio else None)
+    device.start()
+    return device
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teensy virtuel sur pseudo-terminal")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--replay", help="enregistrement au format data.json ou capture .s2c à rejouer")
+    group.add_argument("--synthetic", action="store_true", help="profil de cris synthétique")
+    parser.add_argument("--rate", type=float, default=1.0, help="vitesse de rejeu (1 : temps réel, 0 : sans attente)")
+    parser.add_argument("--loop", action="store_true", help="rejoue en boucle")
+    parser.add_argument("--audio", help="fichier WAV émis quand l'hôte demande l'audio brut (par défaut, audio synthétisé)")
+    args = parser.parse_args()
+
+    samples = synthetic_shouts() if args.synthetic else load_samples(args.replay)
+    audio = load_wav(args.audio, PITCH_RATE) if args.audio else None
+    device = VirtualTeensy(samples, rate=args.rate, loop=args.loop, log=True, audio=audio)
+    device.start()
+    print(f"Teensy virtuel disponible sur {device.port} (SHOUT2PLAY_SERIAL={device.port})")
+
+    try:
+        while device.is_alive():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    device.stop()
+    print(f"{device.emitted} mesures émises, {len(device.commands)} commandes reçues")
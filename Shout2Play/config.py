@@ -1,12 +1,24 @@
+import os
+
 import pygame
 
+# --- Mode sans affichage (simulation seule) ---
+HEADLESS = os.environ.get("SHOUT2PLAY_HEADLESS", "") == "1"
+if HEADLESS:
+    # Pilotes SDL factices : aucune fenêtre ni sortie audio
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
 pygame.init()
 
 # --- Configuration générale ---
 infoObject = pygame.display.Info()
-WIDTH, HEIGHT = infoObject.current_w, infoObject.current_h
-WIDTH, HEIGHT = 800,600
-FPS = 30
+DISPLAY_SIZE = infoObject.current_w, infoObject.current_h  # Résolution du moniteur
+WIDTH, HEIGHT = 800,600  # Canevas logique : tout le jeu est dessiné à cette taille, puis mis à l'échelle de la fenêtre
+FPS = 60  # Cadence d'affichage maximale (indépendante de la simulation)
+SIM_RATE = 30  # Pas de simulation par seconde (les réglages du jeu ont été faits à 30 mises à jour/s)
+SIM_DT = 1 / SIM_RATE  # Durée d'un pas de simulation (s)
+MAX_FRAME_TIME = 0.25  # Temps maximal (s) rattrapé en une image, pour ne pas s'emballer après un blocage
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 
 # --- Paramètres physiques ---
@@ -16,11 +28,109 @@ CAP_GRAVITY = GRAVITY*5
 
 SPAWN_JUMP= GRAVITY*JUMP_FACTOR*10
 SCROLL_SPEED = 8
+RAMP_SPEED = SCROLL_SPEED * 3  # Vitesse atteinte par accélération rapide en début de partie
+SPEED_RAMP = 1.05  # Facteur d'accélération par pas jusqu'à RAMP_SPEED
+SPEED_GAIN = 0.015  # Gain de vitesse par pas (accélération lente continue)
 TILE_SIZE = 128
+COLLISION_RADIUS = 64  # Distance entre centres (ennemi / oeuf) en dessous de laquelle il y a collision
+WORLD_LOOKAHEAD = WIDTH * 2  # Distance (px) au-delà de l'écran sur laquelle les plateformes sont générées à l'avance
+WORLD_CHUNK_SIZE = 16  # Nombre de plateformes par tronçon généré
+WORLD_CHUNKS_AHEAD = 2  # Tronçons préparés à l'avance (par le thread de génération) et au démarrage
+WORLD_THREAD = True  # Génère les tronçons à l'avance dans un thread
+WORLD_SEED = os.environ.get("SHOUT2PLAY_SEED", "")  # Graine du monde (vide : tirée au hasard à chaque lancement)
+WORLD_CACHE = os.environ.get("SHOUT2PLAY_WORLD_CACHE", "")  # Fichier .npz de tronçons déjà générés (facultatif)
+WORLD_CACHE_RUNS = 8  # Nombre de parties dont les premiers tronçons sont gardés pour le cache
+MAX_ENEMIES = 6  # Nombre d'ennemis au-delà duquel les nouvelles plateformes n'en reçoivent plus
+ENEMY_CAPACITY = 64  # Taille de la réserve d'ennemis (colonnes NumPy préallouées)
+BULLET_CAPACITY = 256  # Taille de la réserve d'oeufs (lancés et cuits)
+COLLISION_NUMPY_MIN = 256  # Nombre de paires ennemi / oeuf à partir duquel les distances sont calculées en bloc (NumPy)
+
+# --- Assets ---
+ASSET_CACHE_SIZE = 128  # Nombre maximal d'images gardées en cache
+ASSET_DIR = "assets"  # Dossier des images sources
+ATLAS = os.environ.get("SHOUT2PLAY_ATLAS", "1") != "0"  # Charge les images depuis l'atlas de textures s'il est à jour
+ATLAS_DIR = os.environ.get("SHOUT2PLAY_ATLAS_DIR", "assets/cache")  # Dossier des atlas construits (python -m core.atlas build)
+ATLAS_MAX_WIDTH = 2048  # Largeur maximale d'un atlas (px)
+ATLAS_PADDING = 1  # Marge (px) entre deux images de l'atlas
+ATLAS_FORMAT = "bmp"  # Format de l'image d'atlas : "bmp" (non compressé, décodé ~20 fois plus vite) ou "png" (compact)
+
+# --- Fenêtre ---
+WINDOW = os.environ.get("SHOUT2PLAY_WINDOW", "")  # Taille de la fenêtre ("1920x1080"), "fullscreen", ou vide : taille du canevas
+SCALE_MODE = "fit"  # Mise à l'échelle du canevas : "fit" (proportions gardées), "integer" (facteur entier) ou "stretch"
+SCALE_FILTER = "smooth"  # Filtre de mise à l'échelle : "smooth" (lissé) ou "nearest" (pixels nets)
+LETTERBOX_IMAGE = "assets/background1.png"  # Image floutée affichée dans les bandes autour du canevas (vide : noir)
+DISPLAY_CACHE_SIZE = 4  # Nombre de résolutions dont le fond des bandes est gardé
+FULLSCREEN_KEY = pygame.K_F11  # Touche basculant entre plein écran et fenêtre
+
+# --- Rendu ---
+DIRTY_RECTS = False  # Présente uniquement les zones modifiées (rectangles sales)
+DIRTY_FULL_RATIO = 0.5  # Part de l'écran modifiée au-delà de laquelle on présente l'image entière
+TEXT_CACHE_SIZE = 256  # Nombre maximal de textes rendus gardés en cache
 
 # --- Serial (Teensy) ---
 SERIAL_PORT = "COM13"  # À ajuster
+SERIAL_DEVICE = os.environ.get("SHOUT2PLAY_SERIAL", "")  # Port imposé (ex. pseudo-terminal d'un Teensy virtuel)
+VIRTUAL_TEENSY = os.environ.get("SHOUT2PLAY_VIRTUAL", "")  # Enregistrement data.json (ou "synthetic") rejoué par un Teensy virtuel
+VIRTUAL_RATE = float(os.environ.get("SHOUT2PLAY_VIRTUAL_RATE", "1"))  # Vitesse de rejeu du Teensy virtuel (0 : sans attente)
+VIRTUAL_AUDIO = os.environ.get("SHOUT2PLAY_VIRTUAL_AUDIO", "")  # Fichier WAV émis par le Teensy virtuel en mode audio (vide : synthétisé)
 BAUD_RATE = 115200
+SERIAL_PROTOCOL = "binary"  # Format demandé à Teensy : "binary" (trames) ou "legacy" (Base64/JSON)
+NEGOTIATION_TIMEOUT = 1  # Délai (s) avant de revenir au format historique
+SERIAL_READER = "blocking"  # Lecture "blocking" (attente active du port) ou "poll" (scrutation toutes les 50 ms)
+SERIAL_READ_TIMEOUT = 0.005  # Délai maximal (s) d'une lecture bloquante
+RING_CAPACITY = 1024  # Nombre de mesures horodatées conservées (~10 s à 100 Hz)
+COMMAND_QUEUE_SIZE = 32  # Nombre maximal de commandes en attente d'envoi
+SOUND_BURST = 2  # Nombre maximal d'exemplaires d'un même effet sonore en attente
+SERIAL_LOG = False  # Affiche chaque commande envoyée à Teensy
+
+# --- Capture des mesures ---
+CAPTURE_CHUNK = 4096  # Nombre maximal de mesures par tronçon d'un fichier de capture (.s2c)
+CAPTURE_FLUSH = 1.0  # Intervalle (s) entre deux écritures de tronçon : au plus cette durée perdue en cas d'arrêt brutal
+CAPTURE_POLL = 0.1  # Intervalle (s) entre deux relèves de l'historique des mesures (bien plus court que sa durée)
+
+# --- Conditionnement des mesures ---
+SIGNAL_FILTERS = os.environ.get("SHOUT2PLAY_FILTERS", "1") != "0"  # Filtre le gain et la fréquence avant le jeu
+SIGNAL_RATE = 100  # Mesures par seconde envoyées par Teensy (boucle de 10 ms)
+# Chaînes de filtres : (étage, paramètres), durées en secondes ; seuils de la porte relatifs au bruit de fond
+GAIN_FILTERS = [
+    ("median", {"width": 3}),  # Écarte une mesure aberrante isolée
+    ("ema", {"time_constant": 0.02}),  # Lisse le bruit de mesure
+    ("noise_floor", {"window": 8.0}),  # Niveau du bruit ambiant (minimum glissant)
+    ("onset", {"rise": 10, "span": 0.1}),  # Début d'un cri : +10 dB en 100 ms
+    ("gate", {"open": 12, "close": 6}),  # Gain à 0 tant que la voix ne dépasse pas le bruit de fond de 12 dB
+]
+FREQUENCY_FILTERS = [
+    ("median", {"width": 5}),  # Écarte les sauts isolés (harmoniques, intervalle voisin de la FFT)
+    ("ema", {"time_constant": 0.03}),
+]
+
+# --- Analyse de la voix sur l'hôte ---
+PITCH_HOST = os.environ.get("SHOUT2PLAY_PITCH_HOST", "") == "1"  # Demande l'audio brut à Teensy et mesure hauteur et niveau sur l'hôte
+PITCH_RATE = 11025  # Fréquence d'échantillonnage de l'audio décimé (44,1 kHz / 4)
+PITCH_BLOCK = 256  # Échantillons par trame audio (~23 ms)
+PITCH_WINDOW = 1024  # Échantillons analysés pour chaque estimation (~93 ms)
+PITCH_FMIN = 60  # Fréquence minimale détectée (Hz)
+PITCH_FMAX = 1500  # Fréquence maximale détectée (Hz)
+PITCH_THRESHOLD = 0.15  # Seuil de YIN (plus bas : plus strict sur la périodicité)
+PITCH_SILENCE = 50  # Niveau (dB SPL) en dessous duquel aucune hauteur n'est mesurée
+PITCH_GAIN_OFFSET = -57  # Correction (dB) du niveau RMS vers l'échelle de la FFT du firmware (calée sur un son pur)
+PITCH_LATENCY_BUDGET = 0.05  # Âge maximal (s) d'un bloc analysé ; les blocs plus anciens sont seulement mis en tampon
+PITCH_QUEUE = 64  # Nombre maximal de blocs en attente d'analyse
+PITCH_PROCESS = True  # Analyse dans un processus séparé (False : dans le thread du lecteur série)
+
+# --- Profilage ---
+PROFILER = os.environ.get("SHOUT2PLAY_PROFILE", "") == "1"  # Mesure le temps passé dans chaque sous-système
+PROFILER_WINDOW = 600  # Nombre d'images gardées pour les centiles
+PROFILER_REFRESH = 15  # Nombre d'images entre deux mises à jour de l'incrustation
+PROFILER_EXPORT = os.environ.get("SHOUT2PLAY_PROFILE_EXPORT", "")  # Fichier .csv ou .json écrit à la fermeture
+PROFILER_KEY = pygame.K_F3  # Touche affichant l'incrustation du profileur
+
+# --- Coin-coin mètre ---
+TUNER = os.environ.get("SHOUT2PLAY_TUNER", "") == "1"  # Affiche la note chantée pendant la partie
+TUNER_KEY = pygame.K_F4  # Touche affichant ou masquant le coin-coin mètre en jeu
+
+# --- Enregistrement des parties ---
+REPLAY_CHECKPOINT = 300  # Intervalle (en pas de simulation) entre deux sommes de contrôle de l'état du jeu
 
 # --- Paramètres Vocaux ---
 THRESHOLD = 2  # Seuil pour la détection de la voix
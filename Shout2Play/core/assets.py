@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pygame
+
+from config import ASSET_CACHE_SIZE
+from core.utils import extract_frame
+
+
+class AssetCache:
+    """
+    Registre d'assets partagé par tout le processus.
+    Les images sont chargées une seule fois, converties au format de l'écran
+    puis conservées dans un cache LRU borné indexé par (chemin, échelle, miroir, image).
+    Le cache peut être prérempli depuis un atlas de textures (voir core.atlas).
+    """
+    def __init__(self, max_size: int = ASSET_CACHE_SIZE):
+        """
+        Initialise un cache vide.
+
+        :param max_size: le nombre maximal de surfaces conservées en mémoire
+        """
+        self.max_size = max_size
+        self.entries: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Clés demandées par le jeu (hors feuilles intermédiaires), rangées dans l'atlas
+        self.requested = set()
+
+    def sheet(self, path: str, scale: Any = 1) -> pygame.Surface:
+        """
+        Renvoie une feuille de sprites (ou une image) chargée depuis le disque.
+
+        :param path: le chemin de l'image
+        :param scale: un coefficient multiplicateur ou une taille cible (largeur, hauteur)
+        :return: la surface convertie au format de l'écran
+        """
+        self.requested.add((path, scale, False, None))
+        return self._sheet(path, scale)
+
+    def _sheet(self, path: str, scale: Any = 1, count: bool = True) -> pygame.Surface:
+        """
+        Charge une feuille de sprites sans la compter parmi les images demandées par le jeu.
+        Avec count=False (feuille lue pour extraire une image), la recherche n'entre pas dans les compteurs.
+        """
+        key = (path, scale, False, None)
+        surface = self._get(key, count)
+        if surface is None:
+            surface = pygame.image.load(path)
+            if isinstance(scale, tuple):
+                surface = pygame.transform.scale(surface, scale)
+            elif scale != 1:
+                surface = pygame.transform.scale(surface, (surface.get_width() * scale, surface.get_height() * scale))
+            surface = self._put(key, convert(surface))
+        return surface
+
+    def frame(self, path: str, sprite_size: Tuple[int, int], col: int, row: int,
+              resize: Optional[int] = None, flip: bool = False, scale: Any = 1) -> pygame.Surface:
+        """
+        Renvoie une image extraite d'une feuille de sprites, redimensionnée et retournée si demandé.
+
+        :param path: le chemin de la feuille de sprites
+        :param sprite_size: les dimensions d'une image sur la feuille (après mise à l'échelle)
+        :param col: la colonne de l'image
+        :param row: la ligne de l'image
+        :param resize: la taille finale de l'image (facultatif)
+        :param flip: si l'image doit être retournée horizontalement
+        :param scale: l'échelle appliquée à la feuille avant l'extraction
+        :return: la surface convertie au format de l'écran
+        """
+        key = (path, scale, flip, (sprite_size, col, row, resize))
+        self.requested.add(key)
+        surface = self._get(key)
+        if surface is None:
+            # La demande d'image est déjà comptée : la feuille est lue sans toucher aux compteurs
+            surface = extract_frame(self._sheet(path, scale, count=False), sprite_size, col, row, resize)
+            if flip:
+                surface = pygame.transform.flip(surface, True, False)
+            surface = self._put(key, convert(surface))
+        return surface
+
+    def preload(self, key: Hashable, surface: pygame.Surface):
+        """
+        Range une image déjà prête (par exemple une sous-surface d'un atlas) sous sa clé.
+
+        :param key: la clé de l'image, au format de sheet ou frame
+        :param surface: la surface prête à l'affichage
+        """
+        self._put(key, surface)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Renvoie les compteurs du cache.
+
+        :return: un dictionnaire avec la taille, les succès, les échecs et le taux de succès
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def clear(self):
+        """
+        Vide le cache (par exemple après un changement de mode vidéo).
+        """
+        self.entries.clear()
+
+    def _get(self, key: Hashable, count: bool = True) -> Optional[pygame.Surface]:
+        """
+        Cherche une entrée et la marque comme récemment utilisée.
+        Avec count=False, la recherche n'est comptée ni comme succès ni comme échec.
+        """
+        surface = self.entries.get(key)
+        if surface is None:
+            if count:
+                self.misses += 1
+            return None
+        if count:
+            self.hits += 1
+        self.entries.move_to_end(key)
+        return surface
+
+    def _put(self, key: Hashable, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Ajoute une entrée et évince les moins récemment utilisées au-delà de la taille maximale.
+        """
+        self.entries[key] = surface
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return surface
+
+
+def convert(surface: pygame.Surface) -> pygame.Surface:
+    """
+    Convertit une surface au format de l'écran pour que les blits empruntent le chemin rapide.
+    Sans fenêtre ouverte, la surface est renvoyée telle quelle.
+
+    :param surface: la surface à convertir
+    :return: la surface convertie
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+# Cache partagé par tous les objets du jeu
+assets = AssetCache()
@@ -0,0 +1,213 @@
+"""
+Atlas de textures : toutes les images du jeu, déjà mises à l'échelle, réunies dans une seule image.
+
+La construction charge les images comme le jeu (via le cache d'assets), puis range chaque image demandée
+dans un atlas (rangement par étagères) accompagné d'un manifeste JSON (clé d'asset -> rectangle).
+L'atlas est rangé dans ATLAS_DIR sous une clé qui combine l'empreinte des images sources, la taille du
+canevas et la version du format : une image modifiée donne un nouvel atlas, l'ancien n'est plus utilisé.
+Au démarrage, le jeu décode cette seule image et remplit le cache d'assets avec des sous-surfaces.
+L'image est enregistrée par défaut en BMP non compressé : son décodage est une simple copie.
+
+Utilisation :
+    python -m core.atlas build
+    python -m core.atlas info
+    python -m core.atlas clean
+"""
+import os
+import json
+import glob
+import hashlib
+import argparse
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pygame
+
+from config import WIDTH, HEIGHT, ASSET_DIR, ATLAS_DIR, ATLAS_MAX_WIDTH, ATLAS_PADDING, ATLAS_FORMAT
+from core.assets import AssetCache, assets, convert
+
+
+ATLAS_VERSION = 1
+
+
+def source_paths(directory: str = ASSET_DIR) -> List[str]:
+    """
+    Renvoie les images sources, dans un ordre stable.
+
+    :param directory: le dossier des images
+    :return: la liste des chemins des fichiers PNG
+    """
+    return sorted(glob.glob(os.path.join(directory, "*.png")))
+
+
+def atlas_key(paths: List[str], resolution: Tuple[int, int] = (WIDTH, HEIGHT)) -> str:
+    """
+    Calcule la clé d'un atlas : empreinte du contenu des images sources, de la résolution cible et du format.
+
+    :param paths: les images sources
+    :param resolution: la taille du canevas pour laquelle les images sont mises à l'échelle
+    :return: la clé (hexadécimale)
+    """
+    digest = hashlib.sha1(f"{ATLAS_VERSION}:{resolution[0]}x{resolution[1]}".encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def atlas_files(key: str, directory: str = ATLAS_DIR, image_format: str = ATLAS_FORMAT) -> Tuple[str, str]:
+    """
+    Renvoie les chemins de l'image et du manifeste d'un atlas.
+    """
+    return os.path.join(directory, f"atlas-{key}.{image_format}"), os.path.join(directory, f"atlas-{key}.json")
+
+
+def as_key(value):
+    """
+    Reconstruit une clé d'asset (tuples imbriqués) depuis sa forme JSON (listes imbriquées).
+    """
+    return tuple(as_key(item) for item in value) if isinstance(value, list) else value
+
+
+def collect() -> Dict[Hashable, pygame.Surface]:
+    """
+    Charge toutes les images du jeu comme au démarrage et renvoie celles demandées par le jeu.
+
+    :return: un dictionnaire clé d'asset -> surface mise à l'échelle
+    """
+    from objects.platforms import load_tiles
+    from objects.enemies import load_images as load_enemy_images
+    from objects.bullets import load_images as load_bullet_images
+    from visual.background import Background
+
+    # Repart d'un cache vide : seules les images chargées depuis les sources sont rangées
+    assets.clear()
+    assets.requested.clear()
+    load_tiles()
+    load_enemy_images()
+    load_bullet_images()
+    Background()
+    return {key: assets.entries[key] for key in sorted(assets.requested, key=repr) if key in assets.entries}
+
+
+def pack(sizes: List[Tuple[int, int]], padding: int = ATLAS_PADDING, max_width: int = ATLAS_MAX_WIDTH):
+    """
+    Range des rectangles par étagères : du plus haut au plus bas, de gauche à droite, une nouvelle étagère
+    quand la largeur visée est atteinte (la largeur donnant le plus petit atlas est retenue).
+
+    :param sizes: les tailles (largeur, hauteur) à ranger
+    :param padding: la marge entre deux rectangles
+    :param max_width: la largeur maximale de l'atlas
+    :return: la liste des rectangles (dans l'ordre des tailles) et la taille de l'atlas
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    widest = min(max_width, max([w for w, _ in sizes] + [1]))
+    best = None
+    # Essaie plusieurs largeurs d'étagère et garde l'atlas de plus petite surface
+    for width in range(widest, max(widest, max_width) + 1, 32):
+        rects: List[Optional[pygame.Rect]] = [None] * len(sizes)
+        x = y = shelf = 0
+        for index in order:
+            w, h = sizes[index]
+            if x and x + w > width:
+                x, y, shelf = 0, y + shelf + padding, 0
+            rects[index] = pygame.Rect(x, y, w, h)
+            x += w + padding
+            shelf = max(shelf, h)
+        size = (max((rect.right for rect in rects), default=1), max(y + shelf, 1))
+        if best is None or size[0] * size[1] < best[1][0] * best[1][1]:
+            best = rects, size
+    return best
+
+
+def build(directory: str = ATLAS_DIR, sources: str = ASSET_DIR) -> Tuple[str, int]:
+    """
+    Construit l'atlas des images actuelles (remplace celui des mêmes sources s'il existe).
+
+    :param directory: le dossier des atlas
+    :param sources: le dossier des images sources
+    :return: le chemin du manifeste et le nombre d'images rangées
+    """
+    key = atlas_key(source_paths(sources))
+    image_path, manifest_path = atlas_files(key, directory)
+    surfaces = collect()
+    keys = list(surfaces)
+    rects, size = pack([surfaces[asset].get_size() for asset in keys])
+
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    frames = []
+    for asset, rect in zip(keys, rects):
+        surface = surfaces[asset]
+        alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+        if alpha:
+            # Copie exacte (couleurs et transparence) sur la zone transparente de l'atlas
+            atlas.blit(surface, rect, special_flags=pygame.BLEND_RGBA_MAX)
+        else:
+            atlas.blit(surface, rect)
+            atlas.fill((0, 0, 0, 255), rect, special_flags=pygame.BLEND_RGBA_MAX)
+        frames.append({"key": asset, "rect": list(rect), "alpha": alpha})
+
+    os.makedirs(directory, exist_ok=True)
+    # Le manifeste est écrit en dernier : sa présence signale un atlas complet
+    temporary = f"{image_path}.tmp.{ATLAS_FORMAT}"
+    pygame.image.save(atlas, temporary)
+    os.replace(temporary, image_path)
+    manifest = {"version": ATLAS_VERSION, "key": key, "resolution": [WIDTH, HEIGHT], "size": list(size), "frames": frames}
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest_path, len(frames)
+
+
+def load(cache: AssetCache = assets, directory: str = ATLAS_DIR, sources: str = ASSET_DIR) -> int:
+    """
+    Remplit le cache d'assets depuis l'atlas des images actuelles, s'il a été construit.
+    Les images opaques sont copiées hors de l'atlas pour garder des blits sans transparence.
+
+    :param cache: le cache d'assets à remplir
+    :param directory: le dossier des atlas
+    :param sources: le dossier des images sources
+    :return: le nombre d'images chargées (0 sans atlas à jour)
+    """
+    image_path, manifest_path = atlas_files(atlas_key(source_paths(sources)), directory)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        atlas = convert(pygame.image.load(image_path))
+    except (OSError, ValueError, pygame.error):
+        return 0
+
+    for frame in manifest["frames"]:
+        surface = atlas.subsurface(frame["rect"])
+        if not frame["alpha"]:
+            surface = surface.convert() if pygame.display.get_surface() else surface.copy()
+        cache.preload(as_key(frame["key"]), surface)
+    return len(manifest["frames"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atlas de textures du jeu")
+    parser.add_argument("command", choices=("build", "info", "clean"))
+    parser.add_argument("--dir", default=ATLAS_DIR, help="dossier des atlas")
+    args = parser.parse_args()
+
+    key = atlas_key(source_paths())
+    image_path, manifest_path = atlas_files(key, args.dir)
+    if args.command == "build":
+        path, count = build(args.dir)
+        print(f"{count} images rangées dans {image_path} ({pygame.image.load(image_path).get_size()})")
+    elif args.command == "info":
+        if not os.path.exists(manifest_path):
+            print(f"Aucun atlas à jour (clé {key}) : python -m core.atlas build")
+        else:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            print(f"Atlas {key} : {len(manifest['frames'])} images, {manifest['size'][0]}x{manifest['size'][1]} px, "
+                  f"canevas {manifest['resolution'][0]}x{manifest['resolution'][1]}")
+            for frame in manifest["frames"]:
+                print(f"  {frame['rect']}  {as_key(frame['key'])}")
+    elif args.command == "clean":
+        stale = [path for path in glob.glob(os.path.join(args.dir, "atlas-*")) if key not in os.path.basename(path)]
+        for path in stale:
+            os.remove(path)
+        print(f"{len(stale)} fichiers d'atlas périmés supprimés")
@@ -0,0 +1,74 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+import numpy as np
+
+from config import COLLISION_RADIUS, COLLISION_NUMPY_MIN
+
+
+def find_collisions(enemy_centers: np.ndarray, bullet_centers: np.ndarray, radius: float = COLLISION_RADIUS,
+                    numpy_min: int = COLLISION_NUMPY_MIN) -> List[Tuple[int, int]]:
+    """
+    Renvoie toutes les collisions ennemi / oeuf du pas en un seul appel.
+    Chaque ennemi et chaque oeuf apparaît au plus une fois : les ennemis sont traités dans l'ordre
+    et prennent le premier oeuf libre à moins de radius de leur centre.
+
+    Phase large par balayage trié sur x (en bloc avec NumPy quand il y a beaucoup de paires),
+    puis test exact sur le carré de la distance, sans racine carrée.
+
+    :param enemy_centers: les centres des ennemis, tableau (n, 2)
+    :param bullet_centers: les centres des oeufs lancés, tableau (m, 2)
+    :param radius: la distance entre centres en dessous de laquelle il y a collision
+    :param numpy_min: le nombre de paires à partir duquel le test est fait en bloc avec NumPy
+    :return: la liste des paires (index de l'ennemi, index de l'oeuf) en collision
+    """
+    if not len(enemy_centers) or not len(bullet_centers):
+        return []
+
+    radius2 = radius * radius
+    used = set()
+    pairs = []
+
+    # Oeufs triés par abscisse : la bande [x - r, x + r] de chaque ennemi est une tranche contiguë
+    order = np.argsort(bullet_centers[:, 0], kind="stable")
+
+    if len(enemy_centers) * len(bullet_centers) >= numpy_min:
+        # Toutes les paires candidates d'un coup (tranches mises bout à bout), puis test groupé des distances
+        xs = bullet_centers[order, 0]
+        lo = np.searchsorted(xs, enemy_centers[:, 0] - radius, side="left")
+        counts = np.searchsorted(xs, enemy_centers[:, 0] + radius, side="right") - lo
+        total = int(counts.sum())
+        if not total:
+            return []
+        candidates = np.repeat(np.arange(len(enemy_centers)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        bullets = order[np.repeat(lo, counts) + offsets]
+        delta = enemy_centers[candidates] - bullet_centers[bullets]
+        touching = np.einsum("ij,ij->i", delta, delta) < radius2
+
+        # Attribution dans l'ordre (ennemi, oeuf), sur les seules paires en contact
+        candidates, bullets = candidates[touching], bullets[touching]
+        ranked = np.lexsort((bullets, candidates))
+        last = -1
+        for e, b in zip(candidates[ranked].tolist(), bullets[ranked].tolist()):
+            if e != last and b not in used:
+                used.add(b)
+                pairs.append((e, b))
+                last = e
+        return pairs
+
+    # Balayage : recherche dichotomique de la bande de chaque ennemi
+    xs = bullet_centers[order, 0].tolist()
+    for e, (x, y) in enumerate(enemy_centers.tolist()):
+        best = None
+        for b in order[bisect_left(xs, x - radius):bisect_right(xs, x + radius)].tolist():
+            if b in used or (best is not None and b > best):
+                continue
+            dx = x - bullet_centers[b, 0]
+            dy = y - bullet_centers[b, 1]
+            if dx * dx + dy * dy < radius2:
+                best = b
+        if best is not None:
+            used.add(best)
+            pairs.append((e, best))
+    return pairs
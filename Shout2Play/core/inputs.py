@@ -0,0 +1,104 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from communicate.samples import Sample, load_samples
+
+
+class KeyState:
+    """
+    État du clavier fourni par un script, indexable comme pygame.key.get_pressed().
+    """
+    def __init__(self, pressed: Iterable[int] = ()):
+        """
+        :param pressed: les codes des touches enfoncées
+        """
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+class ScriptedInput:
+    """
+    Source d'entrées scriptée qui remplace SerialMonitor (et le clavier) en mode sans affichage.
+    Chaque appel à get_frame_data consomme une mesure : une mesure par pas de simulation,
+    quelle que soit la vitesse d'exécution.
+    """
+    def __init__(self, samples: Iterable[Sample], keys: Optional[Iterable[Iterable[int]]] = None, loop: bool = True):
+        """
+        :param samples: les mesures à fournir, une par pas
+        :param keys: les touches enfoncées à chaque pas (facultatif)
+        :param loop: recommence au début une fois les mesures épuisées
+        """
+        self.samples = list(samples)
+        self.keys = [KeyState(pressed) for pressed in keys] if keys is not None else None
+        self.loop = loop
+        self.tick = 0
+        self.sent = Counter()
+        self.data = {
+            "gain": 0,
+            "frequency": 0,
+            "button_pressed_shoot": False,
+            "button_pressed_pause": False,
+            "divider": 1000,
+            "threshold": 70
+        }
+
+    def start(self):
+        """
+        Rien à démarrer : les mesures sont fournies à la demande.
+        """
+
+    def stop(self):
+        """
+        Rien à arrêter.
+        """
+
+    def send(self, message: str) -> None:
+        """
+        Compte les commandes qui auraient été envoyées à Teensy.
+
+        :param message: la commande
+        """
+        self.sent[message] += 1
+
+    def get_frame_data(self) -> Dict[str, Any]:
+        """
+        Passe à la mesure suivante et la renvoie (même format que SerialMonitor.get_frame_data).
+        """
+        if self.samples and (self.loop or self.tick < len(self.samples)):
+            _, gain, frequency, shoot, pause, divider, threshold = self.samples[self.tick % len(self.samples)]
+            self.data = {
+                "gain": gain,
+                "frequency": frequency,
+                "button_pressed_shoot": shoot,
+                "button_pressed_pause": pause,
+                "divider": divider,
+                "threshold": threshold
+            }
+        self.tick += 1
+        return dict(self.data)
+
+    def get_data(self) -> Dict[str, Any]:
+        """
+        Renvoie la dernière mesure fournie.
+        """
+        return dict(self.data)
+
+    def get_keys(self) -> KeyState:
+        """
+        Renvoie l'état du clavier pour le pas courant.
+        """
+        if not self.keys:
+            return KeyState()
+        return self.keys[(self.tick - 1) % len(self.keys)]
+
+
+def load_input(source: str) -> ScriptedInput:
+    """
+    Crée une source d'entrées scriptée depuis un enregistrement data.json, une capture .s2c, un fichier WAV ou le profil synthétique.
+
+    :param source: le chemin d'un enregistrement (.json ou .wav), ou "synthetic"
+    :return: la source d'entrées
+    """
+    return ScriptedInput(load_samples(source))
@@ -0,0 +1,130 @@
+"""
+Correspondance entre fréquences et notes (gamme tempérée, La4 = 440 Hz).
+
+La note la plus proche et l'écart en cents sont calculés directement avec log2, sans parcourir
+de table : les fonctions acceptent un nombre comme un tableau NumPy (une piste entière en un appel).
+
+Utilisation :
+    python -m core.notes session.s2c [--min-gain 60]
+"""
+import math
+import argparse
+from typing import NamedTuple, Union
+
+import numpy as np
+
+
+A4 = 440.0  # Fréquence de référence (Hz)
+A4_MIDI = 69  # Numéro MIDI du La4
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+LOWEST = 12  # Do0 (16,35 Hz), note la plus grave nommée
+HIGHEST = 119  # Si8 (7902 Hz), note la plus aiguë nommée
+
+# Nom de chaque numéro MIDI de LOWEST à HIGHEST
+LABELS = np.array([f"{NOTE_NAMES[midi % 12]}{midi // 12 - 1}" for midi in range(LOWEST, HIGHEST + 1)])
+
+Number = Union[float, np.ndarray]
+
+
+class Note(NamedTuple):
+    midi: Number  # Numéro MIDI de la note la plus proche (entier)
+    cents: Number  # Écart à cette note, entre -50 et +50 cents (en dehors de la plage nommée, au-delà)
+    frequency: Number  # Fréquence exacte de la note
+
+
+def midi(frequency: Number) -> Number:
+    """
+    Convertit une fréquence en numéro MIDI fractionnaire (69 pour 440 Hz, +1 par demi-ton).
+
+    :param frequency: la fréquence (Hz), nombre ou tableau ; NaN pour une fréquence nulle ou négative
+    :return: le numéro MIDI
+    """
+    frequency = np.asarray(frequency, dtype="f8")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = A4_MIDI + 12 * np.log2(np.where(frequency > 0, frequency, np.nan) / A4)
+    return value if value.ndim else float(value)
+
+
+def note_frequency(number: Number) -> Number:
+    """
+    Renvoie la fréquence d'une note.
+
+    :param number: le numéro MIDI (éventuellement fractionnaire)
+    :return: la fréquence (Hz)
+    """
+    value = A4 * 2.0 ** ((np.asarray(number, dtype="f8") - A4_MIDI) / 12)
+    return value if value.ndim else float(value)
+
+
+def nearest(frequency: Number) -> Note:
+    """
+    Trouve la note la plus proche d'une fréquence (limitée à la plage Do0 - Si8) et l'écart en cents.
+
+    :param frequency: la fréquence (Hz), nombre ou tableau (fréquences nulles : note LOWEST, écart NaN)
+    :return: la note (numéro MIDI, écart en cents, fréquence de la note)
+    """
+    if not np.ndim(frequency):
+        # Chemin rapide pour une seule mesure (affichage image par image)
+        if not frequency > 0:
+            return Note(LOWEST, float("nan"), note_frequency(LOWEST))
+        exact = A4_MIDI + 12 * math.log2(float(frequency) / A4)
+        number = min(max(int(round(exact)), LOWEST), HIGHEST)
+        return Note(number, (exact - number) * 100, A4 * 2.0 ** ((number - A4_MIDI) / 12))
+    exact = midi(frequency)
+    number = np.clip(np.rint(np.nan_to_num(exact, nan=LOWEST)), LOWEST, HIGHEST).astype("i4")
+    cents = (exact - number) * 100
+    return Note(number, cents, note_frequency(number))
+
+
+def label(number: Number) -> Union[str, np.ndarray]:
+    """
+    Renvoie le nom d'une note ("A4"), ou un tableau de noms.
+
+    :param number: le numéro MIDI entier (limité à la plage nommée)
+    :return: le nom de la note
+    """
+    names = LABELS[np.clip(number, LOWEST, HIGHEST) - LOWEST]
+    return str(names) if np.ndim(names) == 0 else names
+
+
+def summarize(frequencies: np.ndarray, active: np.ndarray = None):
+    """
+    Analyse une piste de fréquences : temps passé sur chaque note et justesse moyenne.
+
+    :param frequencies: les fréquences mesurées (Hz)
+    :param active: les mesures à prendre en compte (par défaut, fréquences non nulles)
+    :return: une liste (nom, nombre de mesures, écart moyen en cents), de la note la plus tenue à la moins tenue
+    """
+    frequencies = np.asarray(frequencies, dtype="f8")
+    active = frequencies > 0 if active is None else active & (frequencies > 0)
+    note = nearest(frequencies[active])
+    numbers, inverse, counts = np.unique(note.midi, return_inverse=True, return_counts=True)
+    mean_cents = np.bincount(inverse, weights=note.cents, minlength=len(numbers)) / np.maximum(counts, 1)
+    order = np.argsort(-counts, kind="stable")
+    return [(label(int(numbers[i])), int(counts[i]), float(mean_cents[i])) for i in order]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notes chantées dans une capture (.s2c) ou un enregistrement data.json")
+    parser.add_argument("path")
+    parser.add_argument("--min-gain", type=float, default=0.0, help="niveau (dB) en dessous duquel une mesure est ignorée")
+    parser.add_argument("--top", type=int, default=12, help="nombre de notes affichées")
+    args = parser.parse_args()
+
+    if args.path.endswith(".s2c"):
+        from communicate.capture import CaptureReader
+
+        reader = CaptureReader(args.path)
+        frequencies, gains = reader.column("frequency"), reader.column("gain")
+    else:
+        import json
+
+        with open(args.path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        frequencies, gains = np.asarray(data["freqs"]), np.asarray(data["gains"])
+
+    rows = summarize(frequencies, gains >= args.min_gain)
+    total = sum(count for _, count, _ in rows)
+    print(f"{total} mesures chantées sur {len(frequencies)}")
+    for name, count, cents in rows[:args.top]:
+        print(f"{name:<4} {count:>7} mesures ({count / max(total, 1):6.1%})  écart moyen {cents:+6.1f} cents")
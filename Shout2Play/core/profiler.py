@@ -0,0 +1,178 @@
+import csv
+import json
+from time import perf_counter
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import PROFILER, PROFILER_WINDOW, PROFILER_REFRESH, PROFILER_EXPORT
+
+
+class Scope:
+    """
+    Zone mesurée : ajoute sa durée au cumul de l'image en cours.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + perf_counter() - self.start
+        return False
+
+
+class NullScope:
+    """
+    Zone mesurée inerte, partagée par toutes les zones quand le profileur est désactivé.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+class Profiler:
+    """
+    Profileur du temps d'image par sous-système.
+    Chaque zone (`with profiler.scope("draw.enemies"):`) cumule sa durée sur l'image en cours ;
+    à la fin de l'image, les cumuls sont rangés dans un historique glissant (tableau NumPy circulaire)
+    dont on tire les centiles p50/p95/p99 et le maximum.
+    Désactivé, scope renvoie une zone inerte partagée : le coût se limite à un appel de méthode.
+    """
+    def __init__(self, enabled=PROFILER, window=PROFILER_WINDOW, refresh=PROFILER_REFRESH, export_path=PROFILER_EXPORT):
+        """
+        Initialise le profileur.
+
+        :param enabled: active les mesures
+        :param window: le nombre d'images conservées dans l'historique de chaque zone
+        :param refresh: le nombre d'images entre deux calculs du rapport affiché
+        :param export_path: le fichier .csv ou .json écrit à la fermeture du jeu (facultatif)
+        """
+        self.enabled = enabled
+        self.window = window
+        self.refresh = refresh
+        self.export_path = export_path
+        self.overlay = False
+
+        self.scopes: Dict[str, Scope] = {}
+        self.current: Dict[str, float] = {}
+        self.history: Dict[str, np.ndarray] = {}
+        self.frames = 0
+        self.frame_start = perf_counter()
+        self.last_report: Optional[Dict[str, Dict[str, float]]] = None
+
+    def scope(self, name):
+        """
+        Renvoie la zone mesurée d'un sous-système, à utiliser avec `with`.
+
+        :param name: le nom du sous-système (par exemple "draw.enemies")
+        :return: la zone mesurée (inerte si le profileur est désactivé)
+        """
+        if not self.enabled:
+            return NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = Scope(self, name)
+        return scope
+
+    def end_frame(self):
+        """
+        Clôt l'image en cours : range les cumuls de chaque zone et la durée totale de l'image.
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self.current["frame"] = now - self.frame_start
+        self.frame_start = now
+
+        slot = self.frames % self.window
+        for name, duration in self.current.items():
+            history = self.history.get(name)
+            if history is None:
+                # Les images antérieures à la première mesure de la zone comptent pour 0
+                history = self.history[name] = np.zeros(self.window)
+            history[slot] = duration
+        # Une zone absente de cette image (ex. pas de simulation sauté) compte pour 0
+        for name, history in self.history.items():
+            if name not in self.current:
+                history[slot] = 0.0
+        self.current = {}
+        self.frames += 1
+
+    def stats(self):
+        """
+        Calcule les statistiques de chaque zone sur l'historique glissant.
+
+        :return: un dictionnaire nom -> {"p50", "p95", "p99", "max", "mean"} en millisecondes
+        """
+        count = min(self.frames, self.window)
+        report = {}
+        if not count:
+            return report
+        for name, history in sorted(self.history.items()):
+            samples = history[:count] * 1000
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            report[name] = {"p50": float(p50), "p95": float(p95), "p99": float(p99),
+                            "max": float(samples.max()), "mean": float(samples.mean())}
+        return report
+
+    def report(self):
+        """
+        Renvoie les statistiques pour l'affichage, recalculées seulement toutes les `refresh` images.
+
+        :return: le dictionnaire de statistiques (le même objet entre deux recalculs)
+        """
+        if self.last_report is None or self.frames % self.refresh == 0:
+            self.last_report = self.stats()
+        return self.last_report
+
+    def toggle_overlay(self):
+        """
+        Affiche ou masque l'incrustation (et active les mesures si besoin).
+        """
+        self.overlay = not self.overlay
+        if self.overlay and not self.enabled:
+            self.enabled = True
+            self.frame_start = perf_counter()
+
+    def export(self, path):
+        """
+        Écrit les statistiques dans un fichier CSV ou JSON (selon l'extension).
+
+        :param path: le chemin du fichier
+        """
+        report = self.stats()
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"frames": self.frames, "scopes_ms": report}, file, indent=2)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["scope", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms"])
+                for name, values in report.items():
+                    writer.writerow([name] + [f"{values[key]:.4f}" for key in ("p50", "p95", "p99", "max", "mean")])
+
+    def save(self):
+        """
+        Exporte les statistiques vers le fichier configuré, s'il y en a un et si des mesures ont été faites.
+        """
+        if self.export_path and self.frames:
+            self.export(self.export_path)
+
+
+# Profileur partagé par tout le jeu
+profiler = Profiler()
@@ -0,0 +1,320 @@
+"""
+Enregistrement et rejeu déterministe des parties.
+
+Chaque pas de simulation, tout ce que Game.handle_events consomme (mesures de Teensy et touches)
+est enregistré dans un journal binaire compact : un octet d'indicateurs par pas, suivi des seuls
+champs qui ont changé depuis le pas précédent, le tout compressé avec zlib. Le journal contient aussi
+la graine du monde et des sommes de contrôle de l'état du jeu, vérifiées lors du rejeu.
+"""
+import struct
+import zlib
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pygame
+
+from config import SIM_RATE, REPLAY_CHECKPOINT
+from core.inputs import KeyState
+
+
+MAGIC = b"S2PR"
+VERSION = 1
+
+# En-tête : magique, version, graine du monde, pas par seconde, nombre de pas, nombre de points de contrôle
+HEADER = struct.Struct("<4sBQHII")
+CHECKPOINT = struct.Struct("<II")  # Pas, somme de contrôle
+
+# Indicateurs des champs modifiés depuis le pas précédent
+CHANGED_GAIN = 1
+CHANGED_FREQUENCY = 2
+CHANGED_DIVIDER = 4
+CHANGED_THRESHOLD = 8
+CHANGED_INPUTS = 16
+
+FLOAT = struct.Struct("<f")
+UINT16 = struct.Struct("<H")
+
+# Bits de l'octet d'entrées : boutons de Teensy puis touches du clavier utilisées par le jeu
+BUTTON_SHOOT = 1
+BUTTON_PAUSE = 2
+REPLAY_KEYS = (pygame.K_z, pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_SPACE)
+
+
+def as_float32(value):
+    """
+    Arrondit une valeur au format stocké dans le journal (le jeu consomme exactement ce qui est rejoué).
+    """
+    return FLOAT.unpack(FLOAT.pack(value))[0]
+
+
+def checksum(game) -> int:
+    """
+    Calcule une somme de contrôle de l'état de la simulation (score, vitesse, ennemis, oeufs, plateformes, joueur).
+
+    :param game: la partie
+    :return: le CRC-32 de l'état
+    """
+    n_enemies, n_bullets = game.enemies.count, game.bullets.count
+    state = [
+        struct.pack("<IdiII", game.ticks, game.speed, game.score(), game.kills, game.world.run),
+        struct.pack("<dd", getattr(game.player, "x", 0), getattr(game.player, "y", 0)),
+        game.enemies.x[:n_enemies].tobytes(), game.enemies.y[:n_enemies].tobytes(),
+        game.bullets.x[:n_bullets].tobytes(), game.bullets.y[:n_bullets].tobytes(),
+        game.bullets.state[:n_bullets].tobytes(),
+        np.array([(platform.x, platform.y, platform.width) for platform in game.platforms], dtype="f8").tobytes(),
+    ]
+    crc = 0
+    for chunk in state:
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class InputRecorder:
+    """
+    Enregistre une partie en s'intercalant devant la source d'entrées du jeu (SerialMonitor ou ScriptedInput).
+    Les mesures sont arrondies au format du journal avant d'être transmises au jeu,
+    pour que le rejeu reproduise exactement la même simulation.
+    """
+    def __init__(self, source, path: str, checkpoint: int = REPLAY_CHECKPOINT):
+        """
+        :param source: la source d'entrées enregistrée
+        :param path: le fichier du journal, écrit à l'arrêt
+        :param checkpoint: l'intervalle (en pas) entre deux sommes de contrôle
+        """
+        self.source = source
+        self.path = path
+        self.checkpoint = checkpoint
+
+        self.body = bytearray()
+        self.checkpoints: List[Tuple[int, int]] = []
+        self.previous = None
+        self.keys = None
+        self.ticks = 0
+        self.seed = 0
+        self.game = None
+
+    def start(self):
+        self.source.start()
+
+    def send(self, message: str) -> None:
+        self.source.send(message)
+
+    def get_data(self) -> Dict[str, Any]:
+        return self.source.get_data()
+
+    def get_keys(self):
+        """
+        Renvoie l'état du clavier (ou celui de la source scriptée) et le garde pour l'enregistrement du pas.
+        """
+        keys = self.source.get_keys() if hasattr(self.source, "get_keys") else pygame.key.get_pressed()
+        self.keys = KeyState([key for key in REPLAY_KEYS if keys[key]])
+        return self.keys
+
+    def get_frame_data(self) -> Dict[str, Any]:
+        """
+        Renvoie les mesures du pas, arrondies au format du journal, et les enregistre.
+        """
+        data = self.source.get_frame_data()
+        record = (
+            as_float32(data["gain"]),
+            as_float32(data["frequency"]),
+            min(max(int(data["divider"] or 0), 0), 0xFFFF),
+            min(max(int(data["threshold"] or 0), 0), 0xFFFF),
+            encode_inputs(data["button_pressed_shoot"], data["button_pressed_pause"], self.keys or KeyState()),
+        )
+        self.write(record)
+        self.keys = None
+        return decode_record(record)
+
+    def write(self, record):
+        """
+        Ajoute un pas au journal (indicateurs puis champs modifiés).
+
+        :param record: le tuple (gain, fréquence, diviseur, seuil, entrées)
+        """
+        flags = 0
+        fields = bytearray()
+        for i, (flag, value) in enumerate(zip((CHANGED_GAIN, CHANGED_FREQUENCY, CHANGED_DIVIDER, CHANGED_THRESHOLD, CHANGED_INPUTS), record)):
+            if self.previous is None or self.previous[i] != value:
+                flags |= flag
+                if flag in (CHANGED_GAIN, CHANGED_FREQUENCY):
+                    fields += FLOAT.pack(value)
+                elif flag == CHANGED_INPUTS:
+                    fields.append(value)
+                else:
+                    fields += UINT16.pack(value)
+        self.body.append(flags)
+        self.body += fields
+        self.previous = record
+        self.ticks += 1
+
+    def after_tick(self, game):
+        """
+        Appelé par le jeu après chaque pas : relève la graine du monde et les sommes de contrôle.
+
+        :param game: la partie
+        """
+        self.game = game
+        self.seed = game.world.generator.seed
+        if game.ticks % self.checkpoint == 0:
+            self.checkpoints.append((game.ticks, checksum(game)))
+
+    def stop(self):
+        """
+        Arrête la source d'entrées et écrit le journal (avec une dernière somme de contrôle).
+        """
+        self.source.stop()
+        if self.game is not None and (not self.checkpoints or self.checkpoints[-1][0] != self.game.ticks):
+            self.checkpoints.append((self.game.ticks, checksum(self.game)))
+        self.save(self.path)
+
+    def save(self, path: str):
+        """
+        Écrit le journal sur disque.
+
+        :param path: le chemin du fichier
+        """
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, SIM_RATE, self.ticks, len(self.checkpoints)))
+            file.write(zlib.compress(bytes(self.body) + b"".join(CHECKPOINT.pack(*c) for c in self.checkpoints), 9))
+
+
+class ReplayInput:
+    """
+    Source d'entrées qui rejoue un journal, un pas de simulation par enregistrement,
+    et vérifie les sommes de contrôle de l'état du jeu au fil du rejeu.
+    """
+    def __init__(self, path: str):
+        """
+        Charge et décode un journal.
+
+        :param path: le chemin du fichier
+        """
+        with open(path, "rb") as file:
+            magic, version, self.seed, self.sim_rate, ticks, count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} n'est pas un journal Shout 2 Play (version {VERSION})")
+            body = zlib.decompress(file.read())
+        if self.sim_rate != SIM_RATE:
+            raise ValueError(f"{path} a été enregistré à {self.sim_rate} pas/s (SIM_RATE vaut {SIM_RATE})")
+
+        self.records, offset = decode_body(body, ticks)
+        self.checkpoints = dict(CHECKPOINT.iter_unpack(body[offset:offset + count * CHECKPOINT.size]))
+        self.tick = 0
+        self.data = decode_record(self.records[0]) if self.records else None
+        self.verified = 0
+        self.mismatches: List[Tuple[int, int, int]] = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def start(self):
+        """
+        Rien à démarrer : les mesures sont fournies à la demande.
+        """
+
+    def stop(self):
+        """
+        Rien à arrêter.
+        """
+
+    def send(self, message: str) -> None:
+        """
+        Les commandes destinées à Teensy sont ignorées pendant le rejeu.
+        """
+
+    def get_keys(self) -> KeyState:
+        """
+        Renvoie l'état des touches enregistré pour le pas courant.
+        """
+        if self.tick >= len(self.records):
+            return KeyState()
+        return KeyState([key for i, key in enumerate(REPLAY_KEYS) if self.records[self.tick][4] & (4 << i)])
+
+    def get_frame_data(self) -> Dict[str, Any]:
+        """
+        Renvoie les mesures enregistrées du pas courant et passe au suivant (la dernière est répétée en fin de journal).
+        """
+        if self.tick < len(self.records):
+            self.data = decode_record(self.records[self.tick])
+        self.tick += 1
+        return dict(self.data)
+
+    def get_data(self) -> Dict[str, Any]:
+        return dict(self.data)
+
+    def after_tick(self, game):
+        """
+        Compare l'état du jeu à la somme de contrôle enregistrée pour ce pas, s'il y en a une.
+
+        :param game: la partie
+        """
+        expected = self.checkpoints.get(game.ticks)
+        if expected is not None:
+            actual = checksum(game)
+            self.verified += 1
+            if actual != expected:
+                self.mismatches.append((game.ticks, expected, actual))
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and self.verified == len(self.checkpoints)
+
+
+def encode_inputs(shoot, pause, keys) -> int:
+    """
+    Regroupe les boutons de Teensy et les touches du jeu dans un octet.
+    """
+    bits = (BUTTON_SHOOT if shoot else 0) | (BUTTON_PAUSE if pause else 0)
+    for i, key in enumerate(REPLAY_KEYS):
+        if keys[key]:
+            bits |= 4 << i
+    return bits
+
+
+def decode_record(record) -> Dict[str, Any]:
+    """
+    Convertit un enregistrement en mesures au format de SerialMonitor.get_frame_data.
+    """
+    gain, frequency, divider, threshold, inputs = record
+    return {
+        "gain": gain,
+        "frequency": frequency,
+        "button_pressed_shoot": bool(inputs & BUTTON_SHOOT),
+        "button_pressed_pause": bool(inputs & BUTTON_PAUSE),
+        "divider": divider,
+        "threshold": threshold
+    }
+
+
+def decode_body(body: bytes, ticks: int):
+    """
+    Décode les enregistrements delta d'un journal.
+
+    :param body: le contenu décompressé
+    :param ticks: le nombre de pas enregistrés
+    :return: la liste des enregistrements et la position de la table des points de contrôle
+    """
+    records = []
+    current = [0.0, 0.0, 0, 0, 0]
+    offset = 0
+    for _ in range(ticks):
+        flags = body[offset]
+        offset += 1
+        if flags & CHANGED_GAIN:
+            current[0] = FLOAT.unpack_from(body, offset)[0]
+            offset += 4
+        if flags & CHANGED_FREQUENCY:
+            current[1] = FLOAT.unpack_from(body, offset)[0]
+            offset += 4
+        if flags & CHANGED_DIVIDER:
+            current[2] = UINT16.unpack_from(body, offset)[0]
+            offset += 2
+        if flags & CHANGED_THRESHOLD:
+            current[3] = UINT16.unpack_from(body, offset)[0]
+            offset += 2
+        if flags & CHANGED_INPUTS:
+            current[4] = body[offset]
+            offset += 1
+        records.append(tuple(current))
+    return records, offset
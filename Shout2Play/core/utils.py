@@ -1,30 +1,27 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import pygame
 
 
-def get_image(self, col: int, row: int, resize: Optional[int] = None, sprite_sheet: Optional[pygame.Surface] = None) -> pygame.Surface:
+def extract_frame(sheet: pygame.Surface, sprite_size: Tuple[int, int], col: int, row: int, resize: Optional[int] = None) -> pygame.Surface:
     """
-    Récupère une image à partir d'une feuille de sprites et la redimensionne si nécessaire.
-    
+    Extrait une image d'une feuille de sprites et la redimensionne si nécessaire.
+
     Args:
+        sheet (pygame.Surface): La feuille de sprites.
+        sprite_size (Tuple[int, int]): Les dimensions d'une image sur la feuille.
         col (int): La colonne de l'image dans la feuille de sprites.
         row (int): La ligne de l'image dans la feuille de sprites.
         resize (Optional[int]): La taille de redimensionnement de l'image (facultatif).
-        sprite_sheet (Optional[pygame.Surface]): La feuille de sprites personnalisée (facultatif).
 
     Returns:
-        pygame.Surface: L'image récupérée, redimensionnée si nécessaire.
+        pygame.Surface: L'image extraite, redimensionnée si nécessaire.
     """
-    # Récupère les dimensions de l'image sur la feuille de sprites
-    x, y = self.sprite_size
+    x, y = sprite_size
 
     # Crée une surface pour l'image extraite
     image = pygame.Surface((x, y), pygame.SRCALPHA)
 
-    # Si sprite_sheet est fourni, on l'utilise, sinon on utilise celle de la classe
-    sheet = sprite_sheet if sprite_sheet else self.sprite_sheet
-
     # Récupère l'image à la position (col, row) dans la feuille de sprites
     image.blit(sheet, (0, 0), (col * x, row * y, x, y))
 
@@ -35,3 +32,37 @@ def get_image(self, col: int, row: int, resize: Optional[int] = None, sprite_she
         image = pygame.transform.rotozoom(image, 0, coef)
 
     return image
+
+
+def lerp(previous: float, current: float, alpha: float) -> float:
+    """
+    Interpole linéairement entre l'état précédent et l'état courant d'une valeur.
+
+    Args:
+        previous (float): La valeur au pas de simulation précédent.
+        current (float): La valeur au pas de simulation courant.
+        alpha (float): La fraction du pas écoulée (entre 0 et 1).
+
+    Returns:
+        float: La valeur à afficher.
+    """
+    return previous + (current - previous) * alpha
+
+
+def get_image(self, col: int, row: int, resize: Optional[int] = None, sprite_sheet: Optional[pygame.Surface] = None) -> pygame.Surface:
+    """
+    Récupère une image à partir d'une feuille de sprites et la redimensionne si nécessaire.
+    
+    Args:
+        col (int): La colonne de l'image dans la feuille de sprites.
+        row (int): La ligne de l'image dans la feuille de sprites.
+        resize (Optional[int]): La taille de redimensionnement de l'image (facultatif).
+        sprite_sheet (Optional[pygame.Surface]): La feuille de sprites personnalisée (facultatif).
+
+    Returns:
+        pygame.Surface: L'image récupérée, redimensionnée si nécessaire.
+    """
+    # Si sprite_sheet est fourni, on l'utilise, sinon on utilise celle de la classe
+    sheet = sprite_sheet if sprite_sheet else self.sprite_sheet
+
+    return extract_frame(sheet, self.sprite_size, col, row, resize)
@@ -1,19 +1,26 @@
 import sys
-from time import time
+from time import perf_counter
 
 import pygame
 import tkinter as tk
 from tkinter import simpledialog
-from random import random
 
 from config import *
 from objects.player import Player
-from objects.platforms import Platform, generate_platforms
-from objects.bullets import Bullet, generate_bullet
-from objects.enemies import Enemy, generate_enemy
+from objects.platforms import Platform, load_tiles, platform_strips
+from objects.world import World
+from objects.generator import WorldGenerator, parse_seed
+from objects.bullets import BulletPool, load_images as load_bullet_images
+from objects.enemies import EnemyPool, load_images as load_enemy_images
+from core.collisions import find_collisions
+from core.profiler import profiler
+from core.atlas import load as load_atlas
 from communicate.serialMonitor import open_serial, SerialMonitor
+from communicate.filters import condition
 from visual.background import Background
 from visual.ui import UI
+from visual.render import DirtyRenderer
+from visual.display import Display
 from menus.pause import Pause
 
 # Initialisation de Pygame
@@ -22,15 +29,28 @@ pygame.init()
 class Game:
     """Classe représentant le jeu Shout 2 Play."""
 
-    def __init__(self):
-        """Initialisation des paramètres du jeu."""
-        # Initialisation de la fenêtre du jeu
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    def __init__(self, headless=HEADLESS, inputs=None, seed=None):
+        """
+        Initialisation des paramètres du jeu.
+
+        :param headless: mode sans affichage (simulation seule, aussi vite que possible)
+        :param inputs: source d'entrées remplaçant la connexion série (par exemple ScriptedInput ou ReplayInput)
+        :param seed: la graine du monde (par défaut, WORLD_SEED)
+        """
+        self.headless = headless
+
+        # Initialisation de la fenêtre du jeu : le jeu dessine sur un canevas logique de WIDTH x HEIGHT
+        self.display = Display()
+        self.screen = self.display.canvas
         pygame.display.set_caption("Shout 2 Play")
+        self.renderer = DirtyRenderer(self.display)
+
+        # Préchargement des assets partagés (convertis au format de l'écran)
+        self.preload_assets()
         
         # Initialisation des objets nécessaires au jeu
         self.clock = pygame.time.Clock()
-        self.serial_reader: SerialMonitor = open_serial(SERIAL_PORT, BAUD_RATE)
+        self.serial_reader: SerialMonitor = inputs or condition(open_serial(SERIAL_PORT, BAUD_RATE))
         self.running = True
         self.game_started = False
         self.paused = False
@@ -41,17 +61,20 @@ class Game:
 
         # Initialisation des objets du jeu
         self.mode = False
-        self.enemies = []
+        self.enemies = EnemyPool()
         self.player = Player(self.mode)
         pygame.display.set_icon(self.player.images[0])
         self.speed = SCROLL_SPEED
         self.calibrate = 70
-        self.platforms = [Platform(-100, HEIGHT - 100, WIDTH//TILE_SIZE+2)]
-        self.construct_platform(6)
-        self.bullets = []
-        self.touched_bullets = []
+        self.world = World(self.enemies, WorldGenerator(seed if seed is not None else parse_seed(WORLD_SEED)))
+        self.world.reset(Platform(-100, HEIGHT - 100, WIDTH//TILE_SIZE+2))
+        if WORLD_THREAD:
+            self.world.generator.start()
+        self.platforms = self.world.platforms
+        self.bullets = BulletPool()
         self.background = Background()
         self.ui = UI()
+        self.show_tuner = TUNER  # Coin-coin mètre affiché pendant la partie
         self.pause = Pause()
         self.last_state_shoot = 0
         self.last_state_pause = 0
@@ -65,7 +88,24 @@ class Game:
         self.button_wait_1 = 0
         self.button_wait_2 = 0
         self.shoot_wait = 0
-        self.pause_wait = 0 
+        self.pause_wait = -1  # Aucune pause récente
+
+        # Horloge de la simulation (en pas), indépendante de l'heure réelle pour des parties reproductibles
+        self.ticks = 0
+
+        # Temps réel pas encore simulé (pas de simulation fixe)
+        self.accumulator = 0.0
+
+    def preload_assets(self):
+        """Précharge les images partagées pour éviter les accrocs lors des premiers tirs et apparitions."""
+        if ATLAS:
+            # Images déjà mises à l'échelle, décodées en une fois depuis l'atlas (s'il est à jour)
+            load_atlas()
+        tiles = load_tiles()
+        for width in range(1, 6):
+            platform_strips.get(width, tiles)  # Largeurs courantes des plateformes
+        load_enemy_images()
+        load_bullet_images()
 
     def load_best_score(self):
         """Charge le meilleur score depuis le fichier 'highscores.txt'."""
@@ -79,16 +119,6 @@ class Game:
             self.best_score = 0
             self.best_user = "Inconnu"
 
-    def construct_platform(self, n):
-        """Construit des plateformes aléatoires pour le jeu."""
-        for i in range(n):
-            platform = generate_platforms(self.platforms[-1], self.speed)
-            self.platforms.append(platform)
-            if random() < 0.6:
-                if len(self.enemies) < 6:
-                    if platform.width > 1:
-                        self.enemies.append(generate_enemy(platform))
-
     def handle_events(self):
         """Gère les événements clavier et de communication série."""
         if pygame.event.get(pygame.QUIT):
@@ -96,8 +126,19 @@ class Game:
             self.stop()
             return
 
-        keys = pygame.key.get_pressed()
-        data = self.serial_reader.get_data()
+        for event in pygame.event.get(pygame.KEYDOWN):
+            if event.key == PROFILER_KEY:
+                profiler.toggle_overlay()
+            elif event.key == TUNER_KEY:
+                self.show_tuner = not self.show_tuner
+            elif event.key == FULLSCREEN_KEY:
+                self.display.toggle_fullscreen()
+        for event in pygame.event.get(pygame.VIDEORESIZE):
+            self.display.handle_event(event)
+
+        keys = self.get_keys()
+        # Mesures agrégées sur toute la durée de l'image (pic de gain, appuis brefs)
+        data = self.serial_reader.get_frame_data()
 
         # Mise à jour des valeurs en fonction des données du capteur
         self.power_jump = (data["gain"] - self.calibrate) / 1.5
@@ -108,20 +149,20 @@ class Game:
         pause = data["button_pressed_pause"] or keys[pygame.K_ESCAPE]
 
         # Logique de tir
-        if ((shoot and self.last_state_shoot != shoot)) and time() - self.shoot_wait and self.player.loading > 100 and not self.paused:
+        if ((shoot and self.last_state_shoot != shoot)) and self.now() - self.shoot_wait and self.player.loading > 100 and not self.paused:
             self.shoot()
-            self.shoot_wait = time()
+            self.shoot_wait = self.now()
         
         self.last_state_shoot = shoot
 
         # Logique de mise en pause
-        if ((pause and self.last_state_pause != pause)) and time() - self.pause_wait > 1:
+        if ((pause and self.last_state_pause != pause)) and self.now() - self.pause_wait > 1:
             self.paused = not self.paused
             if self.paused:
                 self.serial_reader.send("pause")
             else:
                 self.serial_reader.send("resume")
-            self.pause_wait = time()
+            self.pause_wait = self.now()
         
         self.last_state_pause = pause
 
@@ -141,115 +182,184 @@ class Game:
         if keys[pygame.K_SPACE]:
             self.power_jump = 10
 
-        # Décrément des timers
+        # Décrément des timers (un pas de simulation)
         if self.shoot_wait > 0:
-            self.shoot_wait -= 1 / FPS
+            self.shoot_wait -= SIM_DT
         if self.pause_wait > 0:
-            self.pause_wait -= 1 / FPS
+            self.pause_wait -= SIM_DT
+
+    def get_keys(self):
+        """Renvoie l'état du clavier, ou celui fourni par la source d'entrées scriptée."""
+        if hasattr(self.serial_reader, "get_keys"):
+            return self.serial_reader.get_keys()
+        return pygame.key.get_pressed()
+
+    def step(self):
+        """Avance la simulation d'un pas : entrées, démarrage éventuel de la partie et mise à jour."""
+        self.ticks += 1
+        with profiler.scope("events"):
+            self.handle_events()
+        if not self.running:
+            return
 
-    def update_draw(self):
-        """Met à jour l'affichage et les objets du jeu."""
+        # Démarrage du jeu si les conditions sont réunies
+        if self.power_jump >= THRESHOLD:
+            if not self.game_started and not self.paused:
+                self.game_started = True
+                self.serial_reader.send("resume")
+                if self.loose == 1:
+                    self.power_jump = 10
+                    self.speed = SCROLL_SPEED
+
+        self.update()
+
+        # Enregistrement ou vérification du rejeu
+        if hasattr(self.serial_reader, "after_tick"):
+            self.serial_reader.after_tick(self)
+
+    def now(self):
+        """Renvoie le temps de simulation écoulé (s)."""
+        return self.ticks * SIM_DT
+
+    def update(self):
+        """Met à jour les objets du jeu (sans rien dessiner)."""
         if not self.game_started and not self.paused:
-            self.background.update(self.screen, self.speed)
-            self.player.draw(self.screen, self.speed)
+            self.background.scroll(self.speed)
             self.platforms[0].update(self.speed)
             self.platforms[0].spawn_platform()
-            self.platforms[0].draw(self.screen)
-            self.ui.draw_start_menu(self.screen, self.best_score, self.best_user)
 
         if not self.paused and self.game_started:
             # Augmente la vitesse de défilement du jeu
-            if self.speed < SCROLL_SPEED * 3:
-                self.speed *= 1.05
-                if self.speed > SCROLL_SPEED * 3:
-                    self.speed = SCROLL_SPEED * 3
-            self.speed += 0.015
-            self.player.update(self.power_charge, self.power_jump, self.platforms, self.speed)
+            if self.speed < RAMP_SPEED:
+                self.speed *= SPEED_RAMP
+                if self.speed > RAMP_SPEED:
+                    self.speed = RAMP_SPEED
+            self.speed += SPEED_GAIN
+            with profiler.scope("update.player"):
+                self.player.update(self.power_charge, self.power_jump, self.platforms, self.speed)
             self.power_jump = 0
 
-            # Mise à jour de l'arrière-plan et des plateformes
-            self.background.update(self.screen, self.speed)
-            self.player.draw(self.screen, self.speed)
+            # Mise à jour de l'arrière-plan
+            with profiler.scope("update.background"):
+                self.background.scroll(self.speed)
 
             # Vérification de la condition de fin du jeu
             if self.player.y > HEIGHT * 1.4:
                 self.end_game()
 
-            # Mise à jour des plateformes
-            for platform in self.platforms:
-                platform.update(self.speed)
-                platform.draw(self.screen)
-                if platform.x + platform.size < -WIDTH:
-                    self.platforms.remove(platform)
-                    self.construct_platform(1)
+            # Mise à jour des plateformes (défilement du monde, génération anticipée)
+            with profiler.scope("update.world"):
+                self.world.update(self.speed)
 
             # Mise à jour des balles
-            self.update_bullets()
+            with profiler.scope("update.bullets"):
+                self.update_bullets()
+
+            # Mise à jour des ennemis (collisions comprises)
+            with profiler.scope("update.enemies"):
+                self.update_enemies()
+
+    def draw(self, alpha=1):
+        """
+        Dessine l'image courante et la présente à l'écran.
 
-            # Mise à jour des ennemis
-            self.update_enemies()
+        :param alpha: la fraction du pas de simulation écoulée, pour interpoler les positions entre deux pas
+        """
+        if not self.paused:
+            # La scène bouge : l'image de fond figée de la pause n'est plus valable
+            self.renderer.invalidate()
+
+        if not self.game_started and not self.paused:
+            self.renderer.mark(self.background.draw(self.screen, alpha))
+            self.renderer.mark(self.player.draw(self.screen, self.speed))
+            self.renderer.mark(self.platforms[0].draw(self.screen, alpha))
+            self.renderer.mark(self.ui.draw_start_menu(self.screen, self.best_score, self.best_user))
+
+        if not self.paused and self.game_started:
+            # Arrière-plan, joueur et plateformes
+            with profiler.scope("draw.background"):
+                self.renderer.mark(self.background.draw(self.screen, alpha))
+            with profiler.scope("draw.player"):
+                self.renderer.mark(self.player.draw(self.screen, self.speed))
+            with profiler.scope("draw.platforms"):
+                for platform in self.platforms:
+                    self.renderer.mark(platform.draw(self.screen, alpha))
+
+            # Balles et ennemis
+            with profiler.scope("draw.bullets"):
+                self.renderer.mark(*self.bullets.draw(self.screen, alpha))
+            with profiler.scope("draw.enemies"):
+                self.renderer.mark(*self.enemies.draw(self.screen, alpha))
 
             # Affichage du score et de la barre de chargement
-            self.ui.draw_score(self.screen, max(0, int(self.speed - SCROLL_SPEED * 3 + self.kills * 10)))
-            self.ui.loading_bar(self.screen, self.player.loading)
+            with profiler.scope("draw.ui"):
+                self.renderer.mark(self.ui.draw_score(self.screen, self.score()))
+                self.renderer.mark(self.ui.loading_bar(self.screen, self.player.loading))
+                if self.show_tuner:
+                    # Note chantée : voix active quand le gain dépasse le seuil de calibration
+                    self.renderer.mark(*self.ui.draw_tuner(self.screen, self.power_charge, self.power_jump > 0))
         elif self.paused:
             self.draw_pause_screen()
 
-        pygame.display.flip()
+        if profiler.overlay:
+            self.renderer.mark(self.ui.draw_profiler(self.screen, profiler.report()))
+
+        with profiler.scope("present"):
+            self.renderer.present()
+
+    def score(self):
+        """Renvoie le score courant (jamais négatif)."""
+        return max(0, int(self.speed - SCROLL_SPEED * 3 + self.kills * 10))
 
     def update_bullets(self):
         """Met à jour l'état des balles dans le jeu."""
-        for bullet in self.bullets:
-            bullet.update(self.speed * 0.5)
-            bullet.draw(self.screen)
-            if not bullet.active:
-                self.bullets.remove(bullet)
-
-        for bullet in self.touched_bullets:
-            bullet.update(self.speed * 0.5)
-            bullet.draw(self.screen)
-            if not bullet.active:
-                self.touched_bullets.remove(bullet)
+        self.bullets.update(self.speed * 0.5)
 
     def update_enemies(self):
         """Met à jour l'état des ennemis dans le jeu."""
-        for enemy in self.enemies:
-            if not enemy:
-                self.enemies.remove(enemy)
-                continue
-            died_from = enemy.update(self.speed, self.bullets)
-            if died_from:
-                self.enemies.remove(enemy) 
-                self.bullets.remove(died_from)
-                self.touched_bullets.append(died_from)  # Affiche l'œuf au plat au premier plan
-                self.kills += 1
-                self.serial_reader.send("die.wav")
-                continue
-            enemy.draw(self.screen, self.speed)
-            if enemy.x < -enemy.display_size[0] * 2:
-                self.enemies.remove(enemy)
+        # Toutes les collisions du pas, avant tout déplacement des ennemis
+        eggs = self.bullets.eggs()
+        hits = find_collisions(self.enemies.centers(self.enemies.width, self.enemies.height),
+                               self.bullets.centers(self.bullets.width, self.bullets.height, eggs))
+
+        for enemy, egg in hits:
+            self.enemies.active[enemy] = False  # Supprimé lors de la mise à jour ci-dessous
+            self.bullets.break_egg(eggs[egg])  # L'oeuf devient un oeuf au plat
+            self.kills += 1
+            self.serial_reader.send("die.wav")
+
+        self.enemies.update(self.speed)
 
     def draw_pause_screen(self):
         """Dessine l'écran de pause."""
-        self.background.update(self.screen, 0)
-        self.player.draw(self.screen, 0)
-        for platform in self.platforms:
-            platform.draw(self.screen)
-        
-        # Application d'un filtre de gris semi-transparent pour la pause
-        gray_surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        gray_surface.fill((100, 100, 100, 100))
-        self.screen.blit(gray_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        if self.renderer.backdrop is None:
+            self.background.draw(self.screen)
+            self.player.draw(self.screen, 0)
+            for platform in self.platforms:
+                platform.draw(self.screen)
+            
+            # Application d'un filtre de gris semi-transparent pour la pause
+            gray_surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+            gray_surface.fill((100, 100, 100, 100))
+            self.screen.blit(gray_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            self.renderer.mark_all()
+
+            # En mode rectangles sales, la scène figée est conservée pour les images suivantes
+            if self.renderer.enabled:
+                self.renderer.snapshot()
+        else:
+            # Seules les zones de l'interface dessinées à l'image précédente sont effacées
+            self.renderer.restore()
 
         # Affichage du score et de la barre de chargement pendant la pause
-        self.ui.draw_score(self.screen, max(0, int(self.speed - SCROLL_SPEED * 3 + self.kills * 10)))
-        self.ui.loading_bar(self.screen, self.player.loading)
-        self.ui.draw_stat(self.screen, int(self.calibrate), int(self.player.divide), int(self.power_jump + self.calibrate))
-        self.ui.draw_pause_menu(self.screen)
+        self.renderer.mark(self.ui.draw_score(self.screen, self.score()))
+        self.renderer.mark(self.ui.loading_bar(self.screen, self.player.loading))
+        self.renderer.mark(self.ui.draw_stat(self.screen, int(self.calibrate), int(self.player.divide), int(self.power_jump + self.calibrate)))
+        self.renderer.mark(self.ui.draw_pause_menu(self.screen))
 
     def shoot(self):
         """Tire une balle depuis la position du joueur."""
-        self.bullets.append(Bullet(self.player.x, self.player.y, self.speed))
+        self.bullets.shoot(self.player.x, self.player.y, self.speed)
         self.player.loading = max(self.player.loading - 100, 0)
         self.serial_reader.send("shoot.wav")
 
@@ -260,17 +370,16 @@ class Game:
         score = int(self.speed - SCROLL_SPEED * 3 + self.kills * 10)
         if score > self.best_score:
             self.best_score = score
-            self.update_best_score(score)
+            if not self.headless:
+                self.update_best_score(score)
 
         self.kills = 0
         self.player.reset()
-        self.enemies = []
-        self.bullets = []
-        self.touched_bullets = []
+        self.enemies.clear()
+        self.bullets.clear()
         self.speed = SCROLL_SPEED
-        self.platforms = [Platform(-TILE_SIZE * 3, HEIGHT - 100, WIDTH // TILE_SIZE + 2)]
+        self.world.reset(Platform(-TILE_SIZE * 3, HEIGHT - 100, WIDTH // TILE_SIZE + 2))
         self.loose = 1
-        self.construct_platform(6)
 
     def update_best_score(self, score):
         """Met à jour le meilleur score et demande le nom du joueur."""
@@ -284,33 +393,83 @@ class Game:
         with open("highscores.txt", "w", encoding="utf-8") as file:
             file.write(f"{username}: {score}\n")
 
-    def run(self):
-        """Boucle principale du jeu."""
+    def run(self, ticks=None):
+        """
+        Boucle principale du jeu.
+        La simulation avance par pas fixes de SIM_DT, quel que soit le nombre d'images affichées :
+        le temps réel écoulé est accumulé puis consommé pas à pas, et l'affichage interpole
+        les positions avec le reste de l'accumulateur.
+
+        :param ticks: le nombre de pas à jouer avant de rendre la main (par défaut, jusqu'à la fermeture du jeu)
+        """
         self.serial_reader.start()
         self.serial_reader.send("init")
 
-        while self.running:
-            self.handle_events()
+        previous = perf_counter()
+        while self.running and (ticks is None or self.ticks < ticks):
+            now = perf_counter()
+            # Borné pour ne pas enchaîner des dizaines de pas après un blocage
+            self.accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
 
-            # Démarrage du jeu si les conditions sont réunies
-            if self.power_jump >= THRESHOLD:
-                if not self.game_started and not self.paused:
-                    self.game_started = True
-                    self.serial_reader.send("resume")
-                    if self.loose == 1:
-                        self.power_jump = 10
-                        self.speed = SCROLL_SPEED
+            while self.accumulator >= SIM_DT and self.running and (ticks is None or self.ticks < ticks):
+                self.step()
+                self.accumulator -= SIM_DT
 
-            self.update_draw()
-            self.clock.tick(FPS)
+            self.draw(self.accumulator / SIM_DT)
+            with profiler.scope("idle"):
+                self.clock.tick(FPS)
+            profiler.end_frame()
+
+        if ticks is None:
+            self.stop()
 
-        self.stop()
+    def run_headless(self, ticks=10000):
+        """
+        Boucle sans affichage : simule le jeu aussi vite que possible, sans rendu ni limite d'images par seconde.
 
-    def stop(self):
-        """Arrête le jeu et ferme les ressources."""
+        :param ticks: le nombre de pas de simulation à exécuter
+        :return: un dictionnaire de statistiques (pas exécutés, durée, pas par seconde, score)
+        """
+        self.serial_reader.start()
+        self.serial_reader.send("init")
+
+        done = 0
+        start = perf_counter()
+        try:
+            while self.running and done < ticks:
+                self.step()
+                profiler.end_frame()
+                done += 1
+        finally:
+            elapsed = perf_counter() - start
+            # Arrête le lecteur série (thread non démon) et le générateur : le processus peut se terminer
+            self.serial_reader.send("stop")
+            self.serial_reader.stop()
+            self.world.generator.stop()
+            profiler.save()
+
+        return {
+            "ticks": done,
+            "seconds": elapsed,
+            "ticks_per_second": done / elapsed if elapsed else 0.0,
+            "score": self.score(),
+            "best_score": self.best_score,
+            "kills": self.kills,
+            "seed": self.world.generator.seed
+        }
+
+    def stop(self, status=0):
+        """
+        Arrête le jeu et ferme les ressources.
+
+        :param status: le code de sortie du processus
+        """
         print("Fermeture du jeu")
         self.serial_reader.send("stop")
         self.serial_reader.stop()
+        self.world.generator.stop()
+        profiler.save()
         del self.serial_reader
-        sys.exit()
+        sys.exit(status)
         pygame.quit()
@@ -1,11 +1,67 @@
-from game import Game
 import os
+import sys
+import argparse
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shout 2 Play")
+    parser.add_argument("--headless", action="store_true", help="simulation sans affichage, aussi vite que possible")
+    parser.add_argument("--ticks", type=int, default=10000, help="nombre de pas simulés en mode sans affichage")
+    parser.add_argument("--input", help="entrées scriptées : enregistrement data.json, capture .s2c, fichier WAV ou \"synthetic\"")
+    parser.add_argument("--seed", type=int, help="graine du monde (monde reproductible d'un lancement à l'autre)")
+    parser.add_argument("--record", help="enregistre la partie dans un journal (.s2p)")
+    parser.add_argument("--replay", help="rejoue un journal (.s2p) et vérifie ses sommes de contrôle")
+    args = parser.parse_args()
+
+    # Le mode sans affichage doit être choisi avant l'initialisation de pygame (dans config)
+    if args.headless:
+        os.environ["SHOUT2PLAY_HEADLESS"] = "1"
+    if args.seed is not None:
+        os.environ["SHOUT2PLAY_SEED"] = str(args.seed)
+    source = args.input if args.input in (None, "synthetic") else os.path.abspath(args.input)
+    record = os.path.abspath(args.record) if args.record else None
+    replay = os.path.abspath(args.replay) if args.replay else None
 
     # Changer le répertoire de travail pour le répertoire du fichier main.py (pour que les chemins relatifs fonctionnent)
-    os.chdir(os.path.dirname(__file__))
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    from config import SERIAL_PORT, BAUD_RATE
+    from game import Game
+    from core.inputs import load_input
+    from core.replay import InputRecorder, ReplayInput
+    from communicate.serialMonitor import open_serial
+    from communicate.filters import condition
+
+    # Source des entrées : rejeu, entrées scriptées ou Teensy (éventuellement enregistrées)
+    seed = None
+    if replay:
+        inputs = ReplayInput(replay)
+        seed = inputs.seed
+    else:
+        # Les mesures sont filtrées avant l'enregistrement : le rejeu reproduit exactement ce que le jeu a vu
+        inputs = condition(load_input(source) if source else open_serial(SERIAL_PORT, BAUD_RATE))
+        if record:
+            inputs = InputRecorder(inputs, record)
 
     # Créer une instance de la classe Game et lancer le jeu
-    game = Game()         
-    game.run()
+    game = Game(headless=args.headless, inputs=inputs, seed=seed)
+    if replay:
+        if args.headless:
+            stats = game.run_headless(len(inputs))
+            print(f"{stats['ticks']} pas rejoués en {stats['seconds']:.2f} s, {stats['ticks_per_second']:.0f} pas/s, score {stats['score']}")
+        else:
+            game.run(len(inputs))
+        if inputs.ok:
+            print(f"Rejeu conforme : {inputs.verified} sommes de contrôle vérifiées")
+        else:
+            print(f"Rejeu divergent : {len(inputs.mismatches)} écarts, premier au pas {inputs.mismatches[0][0] if inputs.mismatches else '?'}"
+                  f" ({inputs.verified}/{len(inputs.checkpoints)} vérifiées)")
+        # Code de sortie non nul : les scripts de non-régression s'arrêtent sur un rejeu divergent
+        status = 0 if inputs.ok else 1
+        if not args.headless:
+            game.stop(status)
+        sys.exit(status)
+    elif args.headless:
+        stats = game.run_headless(args.ticks)
+        print(f"{stats['ticks']} pas en {stats['seconds']:.2f} s, {stats['ticks_per_second']:.0f} pas/s, score {stats['score']}, graine {stats['seed']}")
+    else:
+        game.run()
@@ -25,6 +25,7 @@ class Pause:
         Dessine un message "PAUSE" à l'écran lorsque le jeu est en pause.
         
         :param screen: l'écran sur lequel dessiner le message de pause
+        :return: la zone de l'écran modifiée (None si le jeu n'est pas en pause)
         """
         if self.paused:
             # Police et taille du texte
@@ -32,4 +33,4 @@ class Pause:
             text = font.render("PAUSE", True, WHITE)
             
             # Affichage du texte centré sur l'écran
-            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2))
+            return screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2))
@@ -1,81 +1,99 @@
-import pygame
+import numpy as np
 
-from core.utils import get_image
+from core.assets import assets
+from objects.pool import EntityPool
 from config import *
 
-class Bullet:
+
+# Images de l'oeuf et de l'oeuf cuit
+EGG_SHEET = "assets/egg.png"
+EGG_COOKED_SHEET = "assets/egg_cooked.png"
+
+# États d'un oeuf
+EGG = 0  # Oeuf lancé, se déplace vers la droite
+COOKED = 1  # Oeuf cuit après avoir touché un ennemi, défile avec le décor
+
+
+def load_images():
+    """
+    Renvoie les images de l'oeuf et de l'oeuf cuit depuis le cache d'assets.
+
+    :return: un tuple (oeuf, oeuf cuit)
     """
-    Classe représentant une balle (ou un oeuf) tirée par le joueur.
-    Elle gère l'image, la position, le mouvement, ainsi que les interactions avec les ennemis.
+    return assets.frame(EGG_SHEET, (64, 64), 0, 0, 64), assets.frame(EGG_COOKED_SHEET, (64, 64), 0, 0, 192)
+
+class BulletPool(EntityPool):
+    """
+    Classe regroupant tous les oeufs tirés par le joueur (lancés ou cuits) dans une réserve en colonnes.
+    Les déplacements et la sortie de l'écran sont calculés pour tous les oeufs à la fois.
     """
-    def __init__(self, x, y, speed=10):
+    def __init__(self, capacity=BULLET_CAPACITY):
         """
-        Initialise un oeuf à la position spécifiée avec une certaine vitesse.
+        Initialise une réserve d'oeufs vide.
 
-        :param x: la position horizontale de l'oeuf
-        :param y: la position verticale de l'oeuf
-        :param speed: la vitesse de l'oeuf
+        :param capacity: le nombre maximal d'oeufs simultanés
         """
-        # Taille des sprites
-        self.sprite_size = (64, 64)
+        super().__init__(capacity)
 
-        # Chargement des images pour l'oeuf et l'oeuf cuit
-        self.egg_sheet = pygame.image.load("assets/egg.png")
-        self.egg_image = get_image(self, 0, 0, 64, self.egg_sheet)
-        self.touch_image_sheet = pygame.image.load("assets/egg_cooked.png")
-        self.touch_image = get_image(self, 0, 0, 192, self.touch_image_sheet)
+        # Images partagées pour l'oeuf et l'oeuf cuit (indexées par l'état)
+        self.images = load_images()
+        self.width = 64  # Largeur de l'oeuf
+        self.height = 64  # Hauteur de l'oeuf
 
-        # Image actuelle de l'oeuf
-        self.image = self.egg_image
+    def shoot(self, x, y, speed=10):
+        """
+        Lance un oeuf depuis la position du joueur.
 
-        # Position et état de l'oeuf
-        self.x = x + 64  # Position de l'oeuf par rapport au joueur
-        self.y = y + 64  # Position de l'oeuf par rapport au joueur
-        self.width = 64  # Largeur de l'oeuf
-        self.speed = speed  # Vitesse de l'oeuf
-        self.touched = False  # Si l'oeuf a été touché par un ennemi
-        self.active = True  # Si l'oeuf est encore actif
+        :param x: la position horizontale du joueur
+        :param y: la position verticale du joueur
+        :param speed: la vitesse de l'oeuf
+        :return: l'index de l'oeuf, ou -1 si la réserve est pleine
+        """
+        return self.spawn(x + 64, y + 64, speed, EGG)
 
     def update(self, game_speed):
         """
-        Met à jour la position de l'oeuf en fonction de sa vitesse et du jeu.
+        Met à jour la position de tous les oeufs et supprime ceux qui sont sortis de l'écran.
 
-        :param game_speed: la vitesse du jeu qui influence le mouvement
-        """
-        if self.touched:
-            self.x -= game_speed  # Déplace l'oeuf à gauche une fois qu'il est touché
-        else:
-            self.x += self.speed  # Déplace l'oeuf à droite tant qu'il n'est pas touché
-        
-        # Si l'oeuf sort de l'écran à droite ou à gauche, il devient inactif
-        if self.x > 1.25 * WIDTH:  # Oeuf sortant à droite
-            self.active = False
-        elif self.x + self.width < -100:  # Oeuf sortant à gauche
-            self.active = False
-
-    def draw(self, screen):
+        :param game_speed: la vitesse du jeu (déplacement des oeufs cuits)
         """
-        Dessine l'oeuf sur l'écran.
+        n = self.count
+        x = self.x[:n]
+        self.prev_x[:n] = x
 
-        :param screen: l'écran sur lequel dessiner l'oeuf
+        # Les oeufs lancés avancent, les oeufs cuits défilent vers la gauche avec le décor
+        x += np.where(self.state[:n] == COOKED, -game_speed, self.vx[:n])
+
+        # Un oeuf sorti de l'écran à droite ou à gauche devient inactif
+        self.active[:n] &= (x <= 1.25 * WIDTH) & (x + self.width >= -100)
+        self.sweep()
+
+    def eggs(self):
+        """
+        Renvoie les index des oeufs encore lancés (pouvant toucher un ennemi).
         """
-        screen.blit(self.image, (self.x, self.y))
+        return np.flatnonzero(self.state[:self.count] == EGG)
 
-    def break_egg(self):
+    def break_egg(self, i):
         """
         Gère la logique lorsque l'oeuf touche un ennemi (devient "cuit").
+
+        :param i: l'index de l'oeuf
         """
-        self.touched = True  # Marque l'oeuf comme touché
-        self.speed = 0  # Arrête l'oeuf
-        self.image = self.touch_image  # Change l'image pour l'oeuf cuit
-        print("touched_break_egg")
+        self.state[i] = COOKED
+        self.vx[i] = 0
 
-def generate_bullet(x, y):
-    """
-    Crée un nouvel oeuf à la position spécifiée.
-    
-    :param x: la position horizontale initiale de l'oeuf
-    :param y: la position verticale initiale de l'oeuf
-    :return: une instance de Bullet
-    """
-    return Bullet(x, y)
+    def draw(self, screen, alpha=1):
+        """
+        Dessine tous les oeufs (les oeufs cuits par-dessus), en un seul appel groupé.
+
+        :param screen: l'écran sur lequel dessiner les oeufs
+        :param alpha: la fraction du pas de simulation écoulée
+        :return: la liste des zones de l'écran modifiées
+        """
+        n = self.count
+        order = np.argsort(self.state[:n], kind="stable")
+        xs = self.interpolated_x(alpha)[order].tolist()
+        ys = self.y[:n][order].tolist()
+        states = self.state[:n][order].tolist()
+        return screen.blits([(self.images[state], (x, y)) for x, y, state in zip(xs, ys, states)])
@@ -1,89 +1,93 @@
-import random
+from config import *
+from core.assets import assets
+from objects.pool import EntityPool
 
-import pygame
 
-from config import *
-from core.utils import get_image
+# Feuille de sprites des ennemis
+ENEMY_SHEET = "assets/ducky_enemy.png"
+
+
+def load_images():
+    """
+    Renvoie les images de l'animation de l'ennemi depuis le cache d'assets.
+
+    :return: la liste des images de l'animation
+    """
+    return [assets.frame(ENEMY_SHEET, (64, 64), col, 2, 192, flip=True, scale=2) for col in range(4)]
 
 
-class Enemy:
+class EnemyPool(EntityPool):
     """
-    Classe représentant un ennemi dans le jeu, avec son apparence, sa position
-    et ses comportements d'animation et d'interaction avec les projectiles.
+    Classe regroupant tous les ennemis du jeu dans une réserve en colonnes.
+    Le déplacement, l'animation et la sortie de l'écran sont calculés pour tous les ennemis à la fois.
     """
-    def __init__(self, x, y):
+    def __init__(self, capacity=ENEMY_CAPACITY):
         """
-        Initialise l'ennemi avec ses paramètres de position, sprite et animation.
-        
-        :param x: la position horizontale de l'ennemi
-        :param y: la position verticale de l'ennemi
+        Initialise une réserve d'ennemis vide.
+
+        :param capacity: le nombre maximal d'ennemis simultanés
         """
-        self.sprite_sheet = pygame.image.load("assets/ducky_enemy.png")
-        self.sprite_sheet = pygame.transform.scale(self.sprite_sheet, 
-                                                   (self.sprite_sheet.get_width() * 2, 
-                                                    self.sprite_sheet.get_height() * 2))
+        super().__init__(capacity)
         self.sprite_size = (64, 64)
         self.display_size = (192, 192)
-        self.images = [pygame.transform.flip(get_image(self, col, 2, self.display_size[0]), True, False) 
-                       for col in range(4)]
-        
-        self.animate_delay = 0.2
-        self.animate_timer = 0
-        self.animate_index = 0
+        self.images = load_images()
 
-        self.x = x
-        self.y = y - self.display_size[1]
+        self.animate_delay = 0.2
         self.width = 192
         self.height = 192
         self.speed = 0.5
 
-    def draw(self, screen, game_speed=1):
+    def spawn_on(self, platform, x):
+        """
+        Fait apparaître un ennemi sur une plateforme donnée.
+
+        :param platform: la plateforme sur laquelle l'ennemi sera généré
+        :param x: la position horizontale de l'ennemi (choisie par le générateur du monde)
+        :return: l'index de l'ennemi, ou -1 si la réserve est pleine
         """
-        Dessine l'ennemi à l'écran avec une animation en fonction de la vitesse du jeu.
-        
-        :param screen: l'écran sur lequel dessiner l'ennemi
-        :param game_speed: la vitesse du jeu (pour ajuster la vitesse de l'animation)
+        return self.spawn(x, platform.y - self.display_size[1])
+
+    def update(self, speed):
+        """
+        Met à jour la position et l'animation de tous les ennemis, puis supprime ceux qui
+        ont quitté l'écran ou ont été touchés.
+
+        :param speed: la vitesse du jeu (affecte le déplacement des ennemis)
+        """
+        n = self.count
+        x = self.x[:n]
+        self.prev_x[:n] = x
+        x -= self.speed * speed
+        self.animate(speed)
+
+        self.active[:n] &= x >= -self.display_size[0] * 2
+        self.sweep()
+
+    def animate(self, game_speed):
+        """
+        Avance l'animation de tous les ennemis d'un pas de simulation, plus vite quand le jeu accélère.
+
+        :param game_speed: la vitesse du jeu
         """
         if game_speed > 0:
-            self.animate_timer += 1 / 50
-            if self.animate_timer >= self.animate_delay * 8 / game_speed:
-                self.animate_timer = 0
-                self.animate_index = (self.animate_index + 1) % len(self.images)
-        
-        image = self.images[self.animate_index]
-        screen.blit(image, (self.x, self.y + 6))
-
-    def update(self, speed, bullets):
+            n = self.count
+            timer = self.timer[:n]
+            timer += 1 / 50
+            wrapped = timer >= self.animate_delay * 8 / game_speed
+            timer[wrapped] = 0
+            frame = self.frame[:n]
+            frame[wrapped] = (frame[wrapped] + 1) % len(self.images)
+
+    def draw(self, screen, alpha=1):
         """
-        Met à jour la position de l'ennemi et vérifie les collisions avec les projectiles.
-        
-        :param speed: la vitesse du jeu (affecte le déplacement de l'ennemi)
-        :param bullets: liste des projectiles du joueur
-        :return: un projectile si l'ennemi est touché, sinon None
+        Dessine tous les ennemis en un seul appel groupé, à une position interpolée entre les deux derniers pas.
+
+        :param screen: l'écran sur lequel dessiner les ennemis
+        :param alpha: la fraction du pas de simulation écoulée
+        :return: la liste des zones de l'écran modifiées
         """
-        rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        x, y = rect.center
-        for bullet in bullets:
-            bullet_rect = bullet.image.get_rect(topleft=(bullet.x, bullet.y)).center
-            
-            if ((x - bullet_rect[0])**2 + (y - bullet_rect[1])**2)**0.5 < 64:
-                # L'ennemi est touché par un projectile
-                bullet.break_egg()
-                print("Touched")
-                return bullet
-
-        self.x -= self.speed * speed
-        return None
-
-def generate_enemy(platform):
-    """
-    Génère un ennemi sur une plateforme donnée à une position aléatoire.
-    
-    :param platform: la plateforme sur laquelle l'ennemi sera généré
-    :return: une instance de l'ennemi généré
-    """
-    return Enemy(
-                    random.randint(int(platform.x + TILE_SIZE / 2), 
-                    int(platform.x + (platform.width - 0.5) * TILE_SIZE)), 
-                    platform.y
-                )
+        n = self.count
+        xs = self.interpolated_x(alpha).tolist()
+        ys = (self.y[:n] + 6).tolist()
+        frames = self.frame[:n].tolist()
+        return screen.blits([(self.images[frame], (x, y)) for x, y, frame in zip(xs, ys, frames)])
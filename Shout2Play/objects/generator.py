@@ -0,0 +1,324 @@
+import os
+import math
+import random
+import threading
+
+import numpy as np
+
+from config import *
+from objects.platforms import PLATFORM_SPEED, Segment, generate_segment
+
+
+# Format d'une plateforme dans un tronçon généré (repère du monde)
+CHUNK = np.dtype([
+    ("x", "f8"),        # Position horizontale
+    ("y", "i4"),        # Position verticale
+    ("width", "u2"),    # Largeur en tuiles (croît avec la vitesse, sans plafond)
+    ("enemy_x", "f8"),  # Position de l'ennemi (NaN : aucun)
+])
+
+# Plateforme de départ canonique : même hauteur et largeur que celle du jeu, son bord droit est l'origine du monde
+START_WIDTH = WIDTH // TILE_SIZE + 2
+START = Segment(-START_WIDTH * TILE_SIZE, HEIGHT - 100, START_WIDTH, 0, math.nan)
+
+# Paramètres dont dépend le monde généré (un cache produit avec d'autres valeurs est ignoré)
+FINGERPRINT = np.array([WIDTH, HEIGHT, TILE_SIZE, SCROLL_SPEED, RAMP_SPEED, SPEED_RAMP, SPEED_GAIN], dtype="f8")
+
+
+def ramp_table():
+    """
+    Calcule la phase d'accélération rapide du début de partie (comme Game.update), pas par pas.
+
+    :return: la liste des couples (distance parcourue, vitesse) jusqu'à RAMP_SPEED
+    """
+    speed, distance = SCROLL_SPEED, 0.0
+    table = [(distance, speed)]
+    while speed < RAMP_SPEED:
+        speed = min(speed * SPEED_RAMP, RAMP_SPEED) + SPEED_GAIN
+        distance += PLATFORM_SPEED * speed
+        table.append((distance, speed))
+    return table
+
+
+RAMP = ramp_table()
+
+
+def speed_at(distance):
+    """
+    Courbe de vitesse du jeu : la vitesse atteinte quand le décor a défilé d'une distance donnée depuis le départ.
+    Après la phase d'accélération rapide, la vitesse croît de SPEED_GAIN par pas et le décor avance
+    de PLATFORM_SPEED * vitesse par pas : la distance est un polynôme du second degré du nombre de pas.
+
+    :param distance: la distance parcourue par les plateformes (px)
+    :return: la vitesse du jeu
+    """
+    if distance <= RAMP[-1][0]:
+        for ramp_distance, speed in RAMP:
+            if ramp_distance >= distance:
+                return speed
+
+    start, speed = RAMP[-1]
+    # distance = start + PLATFORM_SPEED * (n * speed + SPEED_GAIN * n * (n + 1) / 2), résolu en n
+    a = PLATFORM_SPEED * SPEED_GAIN / 2
+    b = PLATFORM_SPEED * (speed + SPEED_GAIN / 2)
+    c = start - distance
+    steps = (-b + math.sqrt(b * b - 4 * a * c)) / (2 * a)
+    return speed + SPEED_GAIN * steps
+
+
+class WorldGenerator:
+    """
+    Générateur procédural du monde, par tronçons de taille fixe.
+    Chaque tronçon est un tableau NumPy compact (géométrie des plateformes et placement des ennemis),
+    entièrement déterminé par la graine, le numéro de partie, le numéro du tronçon et la courbe de vitesse :
+    deux lancements avec la même graine parcourent exactement le même monde.
+
+    Les tronçons peuvent être préparés à l'avance dans un thread et enregistrés sur disque.
+    Seuls les tronçons à venir sont gardés en mémoire (plus les premiers tronçons des premières parties,
+    si un cache est configuré) : la mémoire reste bornée quel que soit le nombre de parties.
+    """
+    def __init__(self, seed=None, chunk_size=WORLD_CHUNK_SIZE, ahead=WORLD_CHUNKS_AHEAD, cache=WORLD_CACHE,
+                 cache_runs=WORLD_CACHE_RUNS):
+        """
+        Initialise le générateur.
+
+        :param seed: la graine du monde (None : tirée au hasard)
+        :param chunk_size: le nombre de plateformes par tronçon
+        :param ahead: le nombre de tronçons préparés à l'avance
+        :param cache: le fichier .npz de tronçons à recharger (facultatif)
+        :param cache_runs: le nombre de parties dont les premiers tronçons sont gardés pour le cache
+        """
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.chunk_size = chunk_size
+        self.ahead = ahead
+        self.cache = cache
+        self.cache_runs = cache_runs
+
+        # Tronçons générés : (partie, numéro) -> tableau CHUNK
+        self.chunks = {}
+        self.condition = threading.Condition()
+        self.wanted = (0, 0)  # Dernier tronçon demandé par le jeu
+        self.thread = None
+        self.stopping = False
+
+        # Statistiques
+        self.generated = 0
+        self.loaded = 0
+        self.misses = 0
+
+        if cache and os.path.exists(cache):
+            self.load(cache)
+
+    def chunk(self, run, index):
+        """
+        Renvoie un tronçon, généré à la demande s'il n'est pas encore prêt.
+
+        :param run: le numéro de la partie (chaque partie a son propre monde)
+        :param index: le numéro du tronçon
+        :return: le tableau CHUNK des plateformes du tronçon
+        """
+        with self.condition:
+            self.wanted = (run, index)
+            chunk = self.chunks.get((run, index))
+            self.condition.notify()
+        if chunk is None:
+            self.misses += 1
+            chunk = self.build(run, index)
+        # Élagage après la génération : le tronçon précédent reste disponible pour le suivant
+        with self.condition:
+            self.prune()
+        return chunk
+
+    def build(self, run, index):
+        """
+        Génère un tronçon (et les tronçons précédents de la partie s'ils manquent).
+        Les tronçons manquants sont générés dans l'ordre, à partir du plus proche tronçon déjà prêt.
+        La génération est déterministe : si le thread et le jeu produisent le même tronçon, le résultat est identique.
+
+        :param run: le numéro de la partie
+        :param index: le numéro du tronçon
+        :return: le tableau CHUNK des plateformes du tronçon
+        """
+        with self.condition:
+            start = index
+            while start > 0 and (run, start - 1) not in self.chunks:
+                start -= 1
+            previous = self.chunks.get((run, start - 1))
+
+        before = START if previous is None else last_segment(previous)
+        for current in range(start, index + 1):
+            chunk = self.generate(run, current, before)
+            before = last_segment(chunk)
+            with self.condition:
+                # Un tronçon déjà dépassé (fini par le thread après le jeu) n'est pas gardé
+                if (run, current) >= self.horizon() or self.kept((run, current)):
+                    self.chunks[(run, current)] = chunk
+                self.generated += 1
+        return chunk
+
+    def generate(self, run, index, before):
+        """
+        Génère les plateformes d'un tronçon à partir de la dernière plateforme du tronçon précédent.
+
+        :param run: le numéro de la partie
+        :param index: le numéro du tronçon
+        :param before: la dernière plateforme du tronçon précédent (START pour le premier)
+        :return: le tableau CHUNK des plateformes du tronçon
+        """
+        rng = random.Random(f"{self.seed}/{run}/{index}")
+        chunk = np.empty(self.chunk_size, dtype=CHUNK)
+        for i in range(self.chunk_size):
+            # Vitesse prévue quand la plateforme précédente atteint le bord droit de l'écran
+            speed = speed_at(max(0.0, before.x + before.size - WIDTH))
+            before = generate_segment(before, speed, rng)
+            chunk[i] = (before.x, before.y, before.width, before.enemy_x)
+        return chunk
+
+    def horizon(self):
+        """
+        Renvoie le plus ancien tronçon encore utile : celui qui précède le dernier tronçon demandé
+        (il sert de point de départ au suivant). Appelée avec le verrou pris.
+
+        :return: le tronçon (partie, numéro)
+        """
+        run, index = self.wanted
+        return run, index - 1
+
+    def kept(self, key):
+        """
+        Indique si un tronçon déjà dépassé est gardé : premiers tronçons des premières parties, pour le cache.
+
+        :param key: le tronçon (partie, numéro)
+        :return: True si le tronçon est gardé
+        """
+        return bool(self.cache) and key[0] < self.cache_runs and key[1] < self.ahead
+
+    def prune(self):
+        """
+        Oublie les tronçons déjà dépassés par le jeu (parties précédentes, début de la partie en cours).
+        Appelée avec le verrou pris.
+        """
+        horizon = self.horizon()
+        for key in [key for key in self.chunks if key < horizon and not self.kept(key)]:
+            del self.chunks[key]
+
+    def segments(self, run, index, offset=0.0, first_id=0):
+        """
+        Renvoie les plateformes d'un tronçon sous forme de Segment, décalées dans le repère du jeu.
+
+        :param run: le numéro de la partie
+        :param index: le numéro du tronçon
+        :param offset: le décalage horizontal à appliquer (bord droit de la plateforme de départ)
+        :param first_id: l'identifiant de la plateforme de départ
+        :return: la liste des Segment
+        """
+        chunk = self.chunk(run, index)
+        base = first_id + index * self.chunk_size + 1
+        return [Segment(x + offset, y, width, base + i, enemy_x + offset)
+                for i, (x, y, width, enemy_x) in enumerate(chunk.tolist())]
+
+    def prewarm(self, run, count=None):
+        """
+        Génère les premiers tronçons d'une partie (au démarrage, avant la première image).
+
+        :param run: le numéro de la partie
+        :param count: le nombre de tronçons (par défaut, ahead)
+        """
+        with self.condition:
+            self.wanted = (run, 0)
+            self.prune()
+        for index in range(count if count is not None else self.ahead):
+            if (run, index) not in self.chunks:
+                self.build(run, index)
+
+    def start(self):
+        """
+        Démarre le thread qui garde toujours `ahead` tronçons d'avance sur le jeu.
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Boucle du thread de génération.
+        """
+        while True:
+            with self.condition:
+                while not self.stopping and self.next_missing() is None:
+                    self.condition.wait()
+                if self.stopping:
+                    return
+                run, index = self.next_missing()
+            self.build(run, index)
+
+    def next_missing(self):
+        """
+        Renvoie le prochain tronçon à préparer d'avance, ou None si l'avance est suffisante.
+        """
+        run, index = self.wanted
+        for ahead in range(1, self.ahead + 1):
+            if (run, index + ahead) not in self.chunks:
+                return run, index + ahead
+        return None
+
+    def stop(self):
+        """
+        Arrête le thread de génération et enregistre les tronçons si un cache est configuré.
+        """
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+        if self.cache:
+            self.save(self.cache)
+
+    def save(self, path):
+        """
+        Enregistre les premiers tronçons des premières parties (ceux préparés avant la première image) dans un fichier .npz.
+
+        :param path: le chemin du fichier
+        """
+        with self.condition:
+            keys = sorted(key for key in self.chunks if self.kept(key))
+            chunks = np.stack([self.chunks[key] for key in keys]) if keys else np.empty((0, self.chunk_size), dtype=CHUNK)
+        np.savez_compressed(path, seed=self.seed, chunk_size=self.chunk_size, fingerprint=FINGERPRINT,
+                            keys=np.array(keys, dtype="i8").reshape(-1, 2), chunks=chunks)
+
+    def load(self, path):
+        """
+        Recharge des tronçons enregistrés, s'ils correspondent à cette graine et à ces réglages.
+
+        :param path: le chemin du fichier
+        :return: le nombre de tronçons rechargés
+        """
+        with np.load(path) as data:
+            if (int(data["seed"]) != self.seed or int(data["chunk_size"]) != self.chunk_size
+                    or not np.array_equal(data["fingerprint"], FINGERPRINT) or data["chunks"].dtype != CHUNK):
+                return 0
+            with self.condition:
+                for (run, index), chunk in zip(data["keys"].tolist(), data["chunks"]):
+                    self.chunks[(run, index)] = chunk
+            self.loaded = len(data["keys"])
+        return self.loaded
+
+
+def last_segment(chunk):
+    """
+    Renvoie la dernière plateforme d'un tronçon, point de départ du tronçon suivant.
+
+    :param chunk: le tableau CHUNK
+    :return: le Segment correspondant
+    """
+    last = chunk[-1]
+    return Segment(float(last["x"]), int(last["y"]), int(last["width"]), 0, math.nan)
+
+
+def parse_seed(value):
+    """
+    Convertit la graine de la configuration (texte vide : aucune).
+
+    :param value: la valeur de WORLD_SEED
+    :return: la graine entière, ou None
+    """
+    return int(value) if value else None
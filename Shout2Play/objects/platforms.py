@@ -1,11 +1,91 @@
+import math
 import random
+from typing import NamedTuple
 
 import pygame
 
-from core.utils import get_image
+from core.assets import assets, convert
+from core.utils import lerp
 from config import *
 
 
+# Feuille de sprites des plateformes
+PLATFORM_SHEET = "assets/platforms.png"
+
+# Vitesse de défilement des plateformes (relative à la vitesse du jeu)
+PLATFORM_SPEED = 0.5
+
+
+def load_tiles():
+    """
+    Renvoie les tuiles gauche, milieu et droite des plateformes depuis le cache d'assets.
+
+    :return: un tuple (gauche, milieu, droite)
+    """
+    return tuple(assets.frame(PLATFORM_SHEET, (64, 64), col, 0, TILE_SIZE, scale=4) for col in (3, 4, 5))
+
+
+class StripCache:
+    """
+    Cache des plateformes pré-composées : une seule surface par largeur,
+    construite à partir des tuiles gauche/milieu/droite et partagée par toutes les plateformes.
+    """
+    def __init__(self):
+        """
+        Initialise un cache vide.
+        """
+        self.strips = {}
+        self.tiles = None
+        self.tile_size = None
+
+    def get(self, width, tiles, tile_size=TILE_SIZE):
+        """
+        Renvoie la bande pré-composée d'une plateforme de la largeur donnée.
+        Le cache est vidé si le jeu de tuiles ou la taille des tuiles change.
+
+        :param width: la largeur de la plateforme (en tuiles, hors bord gauche)
+        :param tiles: le tuple de tuiles (gauche, milieu, droite)
+        :param tile_size: la taille d'une tuile à l'écran
+        :return: la surface de la plateforme complète
+        """
+        if tiles != self.tiles or tile_size != self.tile_size:
+            self.invalidate()
+            self.tiles = tiles
+            self.tile_size = tile_size
+
+        strip = self.strips.get(width)
+        if strip is None:
+            strip = self.strips[width] = self.build(width, tiles, tile_size)
+        return strip
+
+    def build(self, width, tiles, tile_size):
+        """
+        Compose la bande d'une plateforme : bord gauche, tuiles du milieu puis bord droit.
+
+        :param width: la largeur de la plateforme
+        :param tiles: le tuple de tuiles (gauche, milieu, droite)
+        :param tile_size: la taille d'une tuile à l'écran
+        :return: la surface composée et convertie
+        """
+        left, middle, right = tiles
+        strip = pygame.Surface(((width + 1) * tile_size, tile_size), pygame.SRCALPHA)
+        strip.blit(left, (0, 0))
+        for i in range(1, width):
+            strip.blit(middle, (i * tile_size, 0))
+        strip.blit(right, (width * tile_size, 0))
+        return convert(strip)
+
+    def invalidate(self):
+        """
+        Vide le cache (à appeler si les tuiles ou TILE_SIZE changent).
+        """
+        self.strips.clear()
+
+
+# Cache partagé par toutes les plateformes
+platform_strips = StripCache()
+
+
 class Platform:
     """
     Classe représentant une plateforme dans le jeu, avec des caractéristiques
@@ -21,28 +101,21 @@ class Platform:
         :param id: l'identifiant unique de la plateforme
         """
         self.x = x
+        self.prev_x = x
         self.y = y
         self.id = id
         self.width = width
 
-        # Chargement de la sprite sheet de la plateforme
-        self.sprite_sheet = pygame.image.load("assets/platforms.png")
-        self.sprite_sheet = pygame.transform.scale(self.sprite_sheet, 
-                                                   (self.sprite_sheet.get_width() * 4, 
-                                                    self.sprite_sheet.get_height() * 4))
-        
         # Définition des tailles des sprites et des plateformes
         self.sprite_size = (64, 64)
         self.display_size = (TILE_SIZE, TILE_SIZE)
         
-        # Initialisation de l'état de la plateforme
+        # Initialisation de l'état de la plateforme (tuiles partagées via le cache d'assets)
         self.has_enemy = False
-        self.left = get_image(self, 3, 0, self.display_size[0])
-        self.middle = get_image(self, 4, 0, self.display_size[0])
-        self.right = get_image(self, 5, 0, self.display_size[0])
+        self.left, self.middle, self.right = load_tiles()
         self.size = TILE_SIZE * self.width
         self.player_on = False
-        self.speed = 0.5
+        self.speed = PLATFORM_SPEED
 
     def spawn_platform(self):
         """
@@ -50,24 +123,18 @@ class Platform:
         """
         if self.x < -TILE_SIZE * 2:
             self.x += TILE_SIZE
+            self.prev_x += TILE_SIZE
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1):
         """
-        Dessine la plateforme à l'écran.
+        Dessine la plateforme à l'écran, à une position interpolée entre les deux derniers pas de simulation.
         
         :param screen: l'écran sur lequel dessiner la plateforme
+        :param alpha: la fraction du pas de simulation écoulée
+        :return: la zone de l'écran modifiée
         """
-        i = 1
-        # Dessiner la première image (bord gauche)
-        screen.blit(self.left, (self.x, self.y))
-        
-        # Dessiner le reste de la plateforme (milieu ou droite)
-        while i <= self.width:
-            if i == self.width:
-                screen.blit(self.right, (self.x + i * TILE_SIZE, self.y))
-            else:
-                screen.blit(self.middle, (self.x + i * TILE_SIZE, self.y))
-            i += 1
+        strip = platform_strips.get(self.width, (self.left, self.middle, self.right), self.display_size[0])
+        return screen.blit(strip, (lerp(self.prev_x, self.x, alpha), self.y))
 
     def draw_id(self, screen, color):
         """
@@ -88,18 +155,40 @@ class Platform:
         
         :param speed: la vitesse de déplacement
         """
+        self.prev_x = self.x
         self.x -= self.speed * speed
 
-def generate_platforms(before, game_speed=1):
+class Segment(NamedTuple):
+    """
+    Plateforme générée à l'avance mais pas encore construite (simple enregistrement de données).
+    La position horizontale est exprimée dans le repère du monde (voir objects.world).
     """
-    Génère une nouvelle plateforme après une précédente plateforme.
+    x: float
+    y: int
+    width: int
+    id: int
+    enemy_x: float  # Position de l'ennemi placé à l'entrée de la plateforme à l'écran (NaN : aucun)
+
+    @property
+    def size(self):
+        return TILE_SIZE * self.width
+
+    @property
+    def enemy(self):
+        return not math.isnan(self.enemy_x)
+
+
+def generate_segment(before, game_speed=1, rng=random):
+    """
+    Génère la plateforme suivante après une précédente plateforme.
     
-    :param before: la plateforme précédemment générée
+    :param before: la plateforme précédemment générée (Platform ou Segment, dans le même repère)
     :param game_speed: la vitesse du jeu, influençant la largeur et la position de la plateforme
-    :return: une nouvelle instance de la classe Platform
+    :param rng: le générateur aléatoire (random.Random initialisé pour un monde reproductible)
+    :return: un Segment décrivant la nouvelle plateforme
     """
     max_width = int(2 + game_speed / SCROLL_SPEED)
-    width = random.randint(1, max_width)
+    width = rng.randint(1, max_width)
     
     # Calcul de la position horizontale minimale pour la nouvelle plateforme
     min_x = before.x + before.size + (1 / 2 + game_speed / (2 * SCROLL_SPEED)) * TILE_SIZE
@@ -110,12 +199,16 @@ def generate_platforms(before, game_speed=1):
     
     # Sélection de la position verticale aléatoire
     if y_borne1 > y_borne2:
-        y = random.randint(y_borne2, y_borne1)
+        y = rng.randint(y_borne2, y_borne1)
     else:
-        y = random.randint(y_borne1, y_borne2)
+        y = rng.randint(y_borne1, y_borne2)
     
     # Calcul de la position horizontale de la nouvelle plateforme
-    x = random.randint(int(min_x), int(min_x + TILE_SIZE * (max_width + width - abs(y - before.y) / TILE_SIZE)))
+    x = rng.randint(int(min_x), int(min_x + TILE_SIZE * (max_width + width - abs(y - before.y) / TILE_SIZE)))
     
-    # Création et renvoi de la nouvelle plateforme
-    return Platform(x, y, width, id=before.id + 1)
+    # Placement éventuel d'un ennemi (appliqué à l'entrée de la plateforme à l'écran)
+    enemy_x = math.nan
+    if rng.random() < 0.6:
+        enemy_x = rng.randint(int(x + TILE_SIZE / 2), int(x + (width - 0.5) * TILE_SIZE))
+
+    return Segment(x, y, width, before.id + 1, enemy_x)
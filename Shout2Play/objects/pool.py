@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class EntityPool:
+    """
+    Réserve d'entités de capacité fixe, rangée en colonnes NumPy (une colonne par attribut).
+    Les entités vivantes occupent toujours les `count` premiers emplacements : une suppression
+    déplace la dernière entité dans l'emplacement libéré, et les emplacements suivants forment
+    la réserve libre réutilisée par les apparitions (aucune allocation en cours de partie).
+    """
+    # Colonnes de chaque entité : nom -> type NumPy
+    COLUMNS = {
+        "x": "f8",       # Position horizontale
+        "y": "f8",       # Position verticale
+        "prev_x": "f8",  # Position horizontale au pas de simulation précédent (interpolation)
+        "vx": "f8",      # Vitesse horizontale propre
+        "state": "u1",   # État (propre à chaque type d'entité)
+        "frame": "u1",   # Image courante de l'animation
+        "timer": "f8",   # Minuterie de l'animation
+        "active": "?",   # False : l'entité sera supprimée au prochain balayage
+    }
+
+    def __init__(self, capacity):
+        """
+        Alloue toutes les colonnes une fois pour toutes.
+
+        :param capacity: le nombre maximal d'entités simultanées
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in self.COLUMNS.items()}
+        for name, column in self.columns.items():
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, vx=0.0, state=0):
+        """
+        Fait apparaître une entité dans le premier emplacement libre.
+
+        :param x: la position horizontale
+        :param y: la position verticale
+        :param vx: la vitesse horizontale propre
+        :param state: l'état initial
+        :return: l'index de l'entité, ou -1 si la réserve est pleine (l'apparition est abandonnée)
+        """
+        if self.count >= self.capacity:
+            self.dropped += 1
+            return -1
+
+        i = self.count
+        for column in self.columns.values():
+            column[i] = 0
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.state[i] = state
+        self.active[i] = True
+        self.count += 1
+        return i
+
+    def remove(self, i):
+        """
+        Supprime une entité en la remplaçant par la dernière (suppression en O(1), l'ordre n'est pas conservé).
+
+        :param i: l'index de l'entité
+        """
+        last = self.count - 1
+        if i != last:
+            for column in self.columns.values():
+                column[i] = column[last]
+        self.count = last
+
+    def sweep(self):
+        """
+        Supprime toutes les entités marquées inactives.
+        """
+        # Par index décroissant : la dernière entité, déplacée dans chaque trou, est toujours active
+        for i in np.flatnonzero(~self.active[:self.count])[::-1].tolist():
+            self.remove(i)
+
+    def clear(self):
+        """
+        Supprime toutes les entités.
+        """
+        self.count = 0
+
+    def centers(self, width, height, indices=None):
+        """
+        Renvoie les centres des entités (ou d'une sélection d'entités).
+
+        :param width: la largeur d'une entité
+        :param height: la hauteur d'une entité
+        :param indices: les index des entités (par défaut, toutes les entités vivantes)
+        :return: un tableau (n, 2) des centres
+        """
+        if indices is None:
+            indices = slice(0, self.count)
+        return np.column_stack((self.x[indices] + width / 2, self.y[indices] + height / 2))
+
+    def interpolated_x(self, alpha):
+        """
+        Renvoie les positions horizontales à afficher, interpolées entre les deux derniers pas de simulation.
+
+        :param alpha: la fraction du pas de simulation écoulée
+        :return: un tableau des positions horizontales
+        """
+        n = self.count
+        return self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
@@ -0,0 +1,102 @@
+from collections import deque
+
+from config import *
+from objects.platforms import PLATFORM_SPEED, Platform, load_tiles, platform_strips
+from objects.generator import WorldGenerator
+
+
+class World:
+    """
+    Fenêtre glissante sur le monde du jeu.
+    Les plateformes visibles sont des objets Platform dans une file (deque) ; les suivantes sont
+    tirées à l'avance du générateur, tronçon par tronçon, sous forme de simples enregistrements
+    Segment, et ne sont construites (avec leur éventuel ennemi) qu'à leur entrée à l'écran.
+
+    Les segments en attente sont placés dans le repère du monde : leur abscisse à l'écran
+    vaut x - scrolled, où scrolled est la distance parcourue par les plateformes.
+    """
+    def __init__(self, enemies, generator=None, lookahead=WORLD_LOOKAHEAD):
+        """
+        Initialise un monde vide.
+
+        :param enemies: la réserve d'ennemis dans laquelle placer les ennemis des plateformes
+        :param generator: le générateur de tronçons (par défaut, un WorldGenerator initialisé avec WORLD_SEED)
+        :param lookahead: la distance au-delà de l'écran sur laquelle les plateformes sont préparées à l'avance
+        """
+        self.enemies = enemies
+        self.generator = generator or WorldGenerator()
+        self.lookahead = lookahead
+
+        self.platforms = deque()  # Plateformes construites, de gauche à droite
+        self.pending = deque()  # Segments préparés à l'avance, pas encore à l'écran
+        self.last = None  # Dernier segment préparé (repère du monde)
+        self.scrolled = 0.0
+
+        # Partie en cours (chaque partie a son propre monde) et prochain tronçon à tirer du générateur
+        self.run = -1
+        self.next_chunk = 0
+        self.origin = 0.0
+        self.first_id = 0
+
+    def __iter__(self):
+        return iter(self.platforms)
+
+    def reset(self, first):
+        """
+        Repart d'une seule plateforme de départ et prépare la suite du monde (nouvelle partie).
+
+        :param first: la plateforme de départ (son bord droit est l'origine des tronçons générés)
+        """
+        self.platforms.clear()
+        self.pending.clear()
+        self.scrolled = 0.0
+        self.platforms.append(first)
+
+        self.run += 1
+        self.next_chunk = 0
+        self.origin = first.x + first.size
+        self.first_id = first.id
+        self.last = first
+        self.generator.prewarm(self.run)
+        self.refill()
+        self.materialize()
+
+    def update(self, speed):
+        """
+        Fait défiler le monde d'un pas : déplace les plateformes, retire celles sorties à gauche,
+        construit celles qui entrent à l'écran et complète la réserve de segments.
+
+        :param speed: la vitesse du jeu
+        """
+        for platform in self.platforms:
+            platform.update(speed)
+        self.scrolled += PLATFORM_SPEED * speed
+
+        while self.platforms and self.platforms[0].x + self.platforms[0].size < -WIDTH:
+            self.platforms.popleft()
+
+        self.materialize()
+        self.refill()
+
+    def materialize(self):
+        """
+        Construit les plateformes dont le segment entre à l'écran, avec leur ennemi éventuel.
+        """
+        while self.pending and self.pending[0].x - self.scrolled < WIDTH:
+            segment = self.pending.popleft()
+            platform = Platform(segment.x - self.scrolled, segment.y, segment.width, segment.id)
+            self.platforms.append(platform)
+            if segment.enemy and len(self.enemies) < MAX_ENEMIES and platform.width > 1:
+                self.enemies.spawn_on(platform, segment.enemy_x - self.scrolled)
+
+    def refill(self):
+        """
+        Tire des tronçons du générateur tant que la réserve ne couvre pas la distance d'anticipation.
+        """
+        while self.last.x + self.last.size - self.scrolled < WIDTH + self.lookahead:
+            for segment in self.generator.segments(self.run, self.next_chunk, self.origin, self.first_id):
+                self.pending.append(segment)
+                # La bande pré-composée est prête bien avant l'entrée à l'écran
+                platform_strips.get(segment.width, load_tiles())
+            self.last = self.pending[-1]
+            self.next_chunk += 1
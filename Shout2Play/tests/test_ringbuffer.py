@@ -0,0 +1,43 @@
+import os
+import sys
+
+os.environ.setdefault("SHOUT2PLAY_HEADLESS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from communicate.ringbuffer import TelemetryRing
+
+
+def push(ring, n):
+    """Ajoute n mesures numérotées par leur index global."""
+    for _ in range(n):
+        ring.push(ring.count, ring.count, 0, 0, 0)
+
+
+def indices(records):
+    return [int(t) for t in records["device_time"]]
+
+
+def test_read_before_wrap():
+    ring = TelemetryRing(8)
+    push(ring, 5)
+    assert indices(ring.read(0)) == [0, 1, 2, 3, 4]
+    assert indices(ring.read(1, 3)) == [1, 2]
+
+
+def test_read_past_capacity():
+    ring = TelemetryRing(8)
+    push(ring, 8)
+    # La case de la mesure 0 est la prochaine écrite : seules les mesures 1..7 sont lisibles
+    assert indices(ring.read(0)) == list(range(1, 8))
+    push(ring, 13)
+    assert indices(ring.read(0)) == list(range(14, 21))
+    assert indices(ring.window(3)) == [18, 19, 20]
+
+
+def test_read_during_push_never_returns_newer_record():
+    ring = TelemetryRing(8)
+    push(ring, 8)
+    # Écrivain au milieu d'un push : la case de la mesure 8 est écrite, count pas encore publié
+    ring.data[ring.count % ring.capacity] = (ring.count, ring.count, 0, 0, 0)
+    records = indices(ring.read(0, ring.count))
+    assert records == list(range(1, 8))
@@ -3,6 +3,8 @@ import random
 import pygame
 
 from config import *
+from core.assets import assets, convert
+from core.utils import lerp
 
 
 class Background:
@@ -22,20 +24,39 @@ class Background:
 
     def update(self, screen, speed):
         """
-        Met à jour les éléments de fond et les nuages en fonction de la vitesse fournie.
+        Met à jour les éléments de fond et les nuages en fonction de la vitesse fournie, puis les dessine.
         
         :param screen: l'écran sur lequel dessiner l'arrière-plan
+        :param speed: la vitesse de défilement des éléments
+        :return: la zone de l'écran modifiée (l'écran entier)
+        """
+        self.scroll(speed)
+        return self.draw(screen)
+
+    def scroll(self, speed):
+        """
+        Fait défiler les éléments de fond et les nuages sans les dessiner.
+
         :param speed: la vitesse de défilement des éléments
         """
-        # Mise à jour et dessin des éléments de fond
         for background in self.backgrounds:
             background.update(speed)
-            background.draw(screen)
-
-        # Mise à jour et dessin des nuages
         for cloud in self.clouds:
             cloud.update(speed)
-            cloud.draw(screen)
+
+    def draw(self, screen, alpha=1):
+        """
+        Dessine les éléments de fond puis les nuages (en un seul appel groupé).
+
+        :param screen: l'écran sur lequel dessiner l'arrière-plan
+        :param alpha: la fraction du pas de simulation écoulée (interpolation des positions)
+        :return: la zone de l'écran modifiée (l'écran entier)
+        """
+        for background in self.backgrounds:
+            background.draw(screen, alpha)
+        screen.blits([(cloud.picture, cloud.interpolated(alpha)) for cloud in self.clouds], doreturn=False)
+
+        return screen.get_rect()
 
 
 class elements:
@@ -50,12 +71,12 @@ class elements:
         :param y_scale: la plage verticale de l'élément
         :param speed: la vitesse à laquelle l'élément se déplace
         """
-        # Chargement et mise à l'échelle de l'image de l'élément
-        self.picture = pygame.image.load(f"assets/{image}.png")
-        self.picture = pygame.transform.scale(self.picture, (WIDTH // 6, HEIGHT // 6))
+        # Chargement et mise à l'échelle de l'image de l'élément (partagée via le cache d'assets)
+        self.picture = assets.sheet(f"assets/{image}.png", (WIDTH // 6, HEIGHT // 6))
         
         # Position de l'élément (horizontale et verticale)
         self.position = [random.randint(WIDTH, WIDTH * 2), random.randint(y_scale[0], y_scale[1])]
+        self.prev_x = self.position[0]
         
         # Échelle verticale de l'élément
         self.y_scale = y_scale
@@ -70,18 +91,30 @@ class elements:
         :param speed: la vitesse de défilement
         """
         if self.position[0] > -WIDTH:
+            self.prev_x = self.position[0]
             self.position[0] -= self.speed * speed
         else:
             # L'élément se réinitialise lorsque sa position dépasse l'écran
             self.position = self.respawn()
+            self.prev_x = self.position[0]
+
+    def interpolated(self, alpha):
+        """
+        Renvoie la position à afficher, interpolée entre les deux derniers pas de simulation.
 
-    def draw(self, screen):
+        :param alpha: la fraction du pas de simulation écoulée
+        :return: la position (x, y)
+        """
+        return lerp(self.prev_x, self.position[0], alpha), self.position[1]
+
+    def draw(self, screen, alpha=1):
         """
         Dessine l'élément sur l'écran à sa position actuelle.
         
         :param screen: l'écran sur lequel dessiner l'élément
+        :param alpha: la fraction du pas de simulation écoulée
         """
-        screen.blit(self.picture, tuple(self.position))
+        screen.blit(self.picture, self.interpolated(alpha))
 
     def respawn(self):
         """
@@ -95,6 +128,8 @@ class elements:
 class back_element:
     """
     Classe représentant un élément de fond (par exemple, une image d'arrière-plan qui défile).
+    L'image est dupliquée dans une bande de double largeur : le défilement se fait
+    en un seul blit en décalant le rectangle source.
     """
     def __init__(self, image, speed=0.5):
         """
@@ -103,42 +138,47 @@ class back_element:
         :param image: le nom de l'image de l'élément de fond
         :param speed: la vitesse de défilement de l'élément de fond
         """
-        # Chargement et mise à l'échelle de l'image de fond
-        self.picture = pygame.image.load(f"assets/{image}.png")
-        self.picture = pygame.transform.scale(self.picture, (WIDTH, HEIGHT))
+        # Chargement et mise à l'échelle de l'image de fond (convertie au format de l'écran)
+        self.picture = assets.sheet(f"assets/{image}.png", (WIDTH, HEIGHT))
         
-        # Position initiale de l'élément de fond
-        self.position = [0, 0]
+        # Décalage horizontal de la bande (entre 0 et WIDTH) et décalage parcouru au dernier pas
+        self.offset = 0
+        self.step = 0
         
         # Vitesse de défilement de l'élément de fond
         self.speed = speed
 
-    def update(self, speed):
+        self.strip = self.build_strip()
+
+    def build_strip(self):
         """
-        Met à jour la position de l'élément de fond en fonction de la vitesse donnée.
-        
-        :param speed: la vitesse de défilement
+        Construit la bande de double largeur contenant l'image deux fois côte à côte.
+        Une image opaque donne une bande opaque (blit sans mélange alpha).
+
+        :return: la bande convertie au format de l'écran
         """
-        amount = self.speed * speed
-        if self.position[0] > -WIDTH:
-            self.position[0] -= amount
-        else:
-            # L'élément de fond se réinitialise lorsqu'il dépasse l'écran
-            self.position = [self.position[0] + WIDTH - amount, 0]
+        flags = self.picture.get_flags() & pygame.SRCALPHA
+        strip = pygame.Surface((WIDTH * 2, HEIGHT), flags)
+        strip.blit(self.picture, (0, 0))
+        strip.blit(self.picture, (WIDTH, 0))
+        return convert(strip)
 
-    def respawn(self):
+    def update(self, speed):
         """
-        Réinitialise la position de l'élément de fond à la position initiale.
+        Met à jour la position de l'élément de fond en fonction de la vitesse donnée.
         
-        :return: la position réinitialisée de l'élément de fond
+        :param speed: la vitesse de défilement
         """
-        return [WIDTH, 0]
+        self.step = self.speed * speed
+        self.offset = (self.offset + self.step) % WIDTH
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1):
         """
-        Dessine l'élément de fond sur l'écran à sa position actuelle.
+        Dessine l'élément de fond sur l'écran, à un décalage interpolé entre les deux derniers pas de simulation.
         
         :param screen: l'écran sur lequel dessiner l'élément de fond
+        :param alpha: la fraction du pas de simulation écoulée
         """
-        screen.blit(self.picture, tuple(self.position))
-        screen.blit(self.picture, (self.position[0] + WIDTH, self.position[1]))
+        # Interpolation sur le décalage parcouru (le décalage lui-même reboucle à WIDTH)
+        offset = (self.offset - self.step * (1 - alpha)) % WIDTH
+        screen.blit(self.strip, (0, 0), (int(offset), 0, WIDTH, HEIGHT))
@@ -0,0 +1,256 @@
+import threading
+from collections import OrderedDict
+from math import floor, ceil
+
+import pygame
+
+from config import *
+
+
+def parse_window(window, default):
+    """
+    Lit la taille de fenêtre demandée ("1920x1080").
+
+    :param window: la taille demandée (vide ou "fullscreen" : taille par défaut)
+    :param default: la taille par défaut
+    :return: un tuple (largeur, hauteur)
+    """
+    try:
+        width, height = window.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        return default
+
+
+def fit(window_size, canvas_size, mode=SCALE_MODE):
+    """
+    Calcule la zone de la fenêtre où le canevas est présenté.
+
+    :param window_size: la taille de la fenêtre
+    :param canvas_size: la taille du canevas logique
+    :param mode: "fit" (proportions gardées, bandes sur les côtés), "integer" (facteur entier si possible)
+                 ou "stretch" (toute la fenêtre)
+    :return: le rectangle de présentation, centré dans la fenêtre
+    """
+    window_width, window_height = window_size
+    width, height = canvas_size
+    if mode == "stretch":
+        return pygame.Rect(0, 0, window_width, window_height)
+    scale = min(window_width / width, window_height / height)
+    if mode == "integer" and scale >= 1:
+        scale = floor(scale)
+    width, height = max(1, round(width * scale)), max(1, round(height * scale))
+    return pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+
+
+def build_letterbox(size, viewport, image):
+    """
+    Construit le fond des bandes autour du canevas : l'image couvrant la fenêtre, floutée et assombrie.
+    Appelée hors du thread principal (aucune conversion au format de l'écran).
+
+    :param size: la taille de la fenêtre
+    :param viewport: la zone occupée par le canevas
+    :param image: le chemin de l'image (vide : fond noir)
+    :return: la surface de la taille de la fenêtre
+    """
+    surface = pygame.Surface(size)
+    try:
+        picture = pygame.image.load(image) if image else None
+    except (pygame.error, FileNotFoundError):
+        picture = None
+    if picture:
+        scale = max(size[0] / picture.get_width(), size[1] / picture.get_height())
+        # Flou peu coûteux : réduction puis agrandissement lissés
+        small = pygame.transform.smoothscale(picture, (max(1, picture.get_width() // 16), max(1, picture.get_height() // 16)))
+        cover = pygame.transform.smoothscale(small, (ceil(picture.get_width() * scale), ceil(picture.get_height() * scale)))
+        surface.blit(cover, ((size[0] - cover.get_width()) // 2, (size[1] - cover.get_height()) // 2))
+        surface.fill((90, 90, 90), special_flags=pygame.BLEND_RGB_MULT)
+    surface.fill(BLACK, viewport)
+    return surface
+
+
+class Display:
+    """
+    Fenêtre du jeu et canevas logique.
+    Tout le jeu dessine sur un canevas de taille fixe (WIDTH x HEIGHT), présenté à chaque image
+    par une seule copie mise à l'échelle dans la fenêtre, quelle que soit sa taille.
+    Ce qui dépend de la résolution de la fenêtre (fond des bandes) est construit une fois, dans un thread,
+    et gardé pour chaque résolution déjà rencontrée.
+    """
+    def __init__(self, canvas_size=(WIDTH, HEIGHT), window=WINDOW, mode=SCALE_MODE, smooth=SCALE_FILTER == "smooth",
+                 letterbox=LETTERBOX_IMAGE, cache_size=DISPLAY_CACHE_SIZE):
+        """
+        Ouvre la fenêtre et crée le canevas.
+
+        :param canvas_size: la taille du canevas logique
+        :param window: la taille de la fenêtre ("1920x1080"), "fullscreen", ou vide pour la taille du canevas
+        :param mode: le mode de mise à l'échelle ("fit", "integer" ou "stretch")
+        :param smooth: mise à l'échelle lissée (sinon, au plus proche voisin)
+        :param letterbox: l'image du fond des bandes (vide : noir)
+        :param cache_size: le nombre de résolutions dont le fond des bandes est gardé
+        """
+        self.canvas_size = canvas_size
+        self.windowed_size = parse_window(window, canvas_size)
+        self.fullscreen = window == "fullscreen"
+        self.mode = mode
+        self.smooth = smooth
+        self.letterbox = letterbox
+        self.cache_size = cache_size
+
+        # Fonds des bandes par taille de fenêtre (None : en construction)
+        self.backdrops = OrderedDict()
+        self.lock = threading.Lock()
+        self.builds = 0
+
+        self.window = None
+        self.canvas = pygame.Surface(canvas_size)
+        self.open()
+        self.canvas = self.canvas.convert()
+
+    def open(self):
+        """
+        Ouvre (ou rouvre) la fenêtre, en plein écran ou redimensionnable.
+        """
+        if self.fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+        self.resize()
+
+    def toggle_fullscreen(self):
+        """
+        Bascule entre plein écran et fenêtre.
+        """
+        self.fullscreen = not self.fullscreen
+        self.open()
+
+    def resize(self, size=None):
+        """
+        Adapte la présentation à la nouvelle taille de la fenêtre (événement VIDEORESIZE).
+
+        :param size: la nouvelle taille (par défaut, celle de la surface d'affichage)
+        """
+        self.window = pygame.display.get_surface()
+        size = self.window.get_size() if size is None else tuple(size)
+        if size != self.window.get_size():
+            self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+        if not self.fullscreen:
+            self.windowed_size = size
+
+        self.viewport = fit(size, self.canvas_size, self.mode)
+        self.scaled = self.viewport.size != self.canvas_size
+        self.target = self.window.subsurface(self.viewport) if self.scaled else None
+        self.scale_x = self.viewport.width / self.canvas_size[0]
+        self.scale_y = self.viewport.height / self.canvas_size[1]
+        if self.scaled and self.smooth:
+            try:
+                pygame.transform.smoothscale(self.canvas, self.viewport.size, self.target)
+            except ValueError:
+                # Format d'écran non supporté par le lissage (moins de 24 bits)
+                self.smooth = False
+
+        # Bandes : fond noir en attendant celui construit pour cette résolution
+        self.backdrop_drawn = self.viewport.size == size
+        if not self.backdrop_drawn:
+            self.window.fill(BLACK)
+            self.request_backdrop(size)
+        self.full = True
+
+    def request_backdrop(self, size):
+        """
+        Lance la construction du fond des bandes pour une taille de fenêtre, sauf s'il existe déjà.
+        """
+        with self.lock:
+            if size in self.backdrops:
+                self.backdrops.move_to_end(size)
+                return
+            self.backdrops[size] = None
+        viewport = self.viewport.copy()
+
+        def build():
+            surface = build_letterbox(size, viewport, self.letterbox)
+            with self.lock:
+                self.backdrops[size] = surface
+                self.builds += 1
+                # Évince les résolutions les plus anciennes (sauf celles en construction)
+                for key in list(self.backdrops):
+                    if len(self.backdrops) <= self.cache_size:
+                        break
+                    if key != size and self.backdrops[key] is not None:
+                        del self.backdrops[key]
+
+        threading.Thread(target=build, name="letterbox", daemon=True).start()
+
+    def draw_backdrop(self):
+        """
+        Dessine le fond des bandes dès qu'il est prêt pour la taille actuelle.
+
+        :return: True si le fond vient d'être dessiné
+        """
+        size = self.window.get_size()
+        with self.lock:
+            backdrop = self.backdrops.get(size)
+        if backdrop is None or backdrop.get_size() != size:
+            return False
+        self.window.blit(backdrop, (0, 0))
+        self.backdrop_drawn = True
+        return True
+
+    def handle_event(self, event):
+        """
+        Traite les événements de fenêtre (redimensionnement).
+
+        :param event: l'événement pygame
+        """
+        if event.type == pygame.VIDEORESIZE and not self.fullscreen:
+            self.resize(event.size)
+
+    def window_rect(self, rect):
+        """
+        Convertit une zone du canevas en zone de la fenêtre (arrondie vers l'extérieur).
+
+        :param rect: la zone du canevas
+        :return: la zone correspondante de la fenêtre
+        """
+        left, top = floor(rect.left * self.scale_x), floor(rect.top * self.scale_y)
+        right, bottom = ceil(rect.right * self.scale_x), ceil(rect.bottom * self.scale_y)
+        return pygame.Rect(self.viewport.x + left, self.viewport.y + top, right - left, bottom - top).clip(self.viewport)
+
+    def present(self, rects=None):
+        """
+        Présente le canevas dans la fenêtre : une copie (mise à l'échelle si besoin), puis l'envoi à l'écran.
+
+        :param rects: les zones du canevas à envoyer à l'écran (par défaut, tout)
+        """
+        if not self.backdrop_drawn and self.draw_backdrop():
+            rects = None
+        if self.full:
+            rects = None
+            self.full = False
+
+        if not self.scaled:
+            if rects is None:
+                self.window.blit(self.canvas, self.viewport)
+            else:
+                for rect in rects:
+                    self.window.blit(self.canvas, rect.move(self.viewport.topleft), rect)
+        elif self.smooth:
+            pygame.transform.smoothscale(self.canvas, self.viewport.size, self.target)
+        else:
+            pygame.transform.scale(self.canvas, self.viewport.size, self.target)
+
+        if rects is None:
+            pygame.display.flip()
+        elif self.scaled:
+            pygame.display.update([self.window_rect(pygame.Rect(rect)) for rect in rects])
+        else:
+            pygame.display.update([pygame.Rect(rect).move(self.viewport.topleft) for rect in rects])
+
+    def to_canvas(self, position):
+        """
+        Convertit une position de la fenêtre (souris) en position sur le canevas.
+
+        :param position: la position dans la fenêtre
+        :return: la position sur le canevas
+        """
+        return ((position[0] - self.viewport.x) / self.scale_x, (position[1] - self.viewport.y) / self.scale_y)
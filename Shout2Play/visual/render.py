@@ -0,0 +1,90 @@
+import pygame
+
+from config import *
+
+
+class DirtyRenderer:
+    """
+    Classe gérant la présentation de l'image à l'écran.
+    En mode rectangles sales, seules les zones modifiées depuis l'image précédente sont envoyées
+    à l'écran ; sinon (ou si la majeure partie de l'écran a changé) l'image complète est présentée.
+    """
+    def __init__(self, display, enabled=DIRTY_RECTS, full_ratio=DIRTY_FULL_RATIO):
+        """
+        Initialise le gestionnaire de rendu.
+
+        :param display: l'affichage (Display) dont le canevas reçoit l'image
+        :param enabled: active le mode rectangles sales
+        :param full_ratio: part de l'écran au-delà de laquelle on repasse à un flip complet
+        """
+        self.display = display
+        self.screen = display.canvas
+        self.enabled = enabled
+        self.full_ratio = full_ratio
+
+        # Zones modifiées pendant l'image en cours et pendant l'image précédente
+        self.dirty = []
+        self.previous = []
+        self.full = False
+
+        # Image de fond figée (écrans statiques comme la pause)
+        self.backdrop = None
+
+        # Statistiques de présentation
+        self.full_presents = 0
+        self.partial_presents = 0
+
+    def mark(self, *rects):
+        """
+        Signale des zones de l'écran modifiées pendant l'image en cours.
+
+        :param rects: les rectangles modifiés (les valeurs None sont ignorées)
+        """
+        for rect in rects:
+            if rect:
+                self.dirty.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        """
+        Signale que tout l'écran a été redessiné.
+        """
+        self.full = True
+
+    def snapshot(self):
+        """
+        Fige le contenu actuel de l'écran comme image de fond pour les images suivantes.
+        """
+        self.backdrop = self.screen.copy()
+
+    def restore(self):
+        """
+        Efface les zones dessinées à l'image précédente en recopiant l'image de fond figée.
+        """
+        for rect in self.previous:
+            self.screen.blit(self.backdrop, rect, rect)
+
+    def invalidate(self):
+        """
+        Oublie l'image de fond figée (la scène a changé).
+        """
+        self.backdrop = None
+
+    def present(self):
+        """
+        Présente l'image en cours à l'écran, partiellement si possible.
+        """
+        rects = self.previous + self.dirty
+        screen_area = self.screen.get_width() * self.screen.get_height()
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+
+        if not self.enabled or self.full or dirty_area > screen_area * self.full_ratio:
+            self.display.present()
+            self.full_presents += 1
+        else:
+            if rects:
+                self.display.present(rects)
+            self.partial_presents += 1
+
+        self.previous = self.dirty
+        self.dirty = []
+        self.full = False
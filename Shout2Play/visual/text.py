@@ -0,0 +1,169 @@
+from collections import OrderedDict
+
+import pygame
+
+from config import TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """
+    Cache des textes rendus, indexé par (police, texte, couleur, anticrénelage).
+    Un texte qui ne change pas d'une image à l'autre n'est rendu qu'une seule fois.
+    """
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        """
+        Initialise un cache vide.
+
+        :param max_size: le nombre maximal d'entrées conservées (textes rendus et mesures)
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Renvoie la surface d'un texte, rendue une seule fois.
+
+        :param font: la police utilisée
+        :param text: le texte à rendre
+        :param color: la couleur du texte
+        :param antialias: si le texte doit être anticrénelé
+        :return: la surface du texte
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._get(key)
+        if surface is None:
+            surface = self._put(key, font.render(text, antialias, color))
+        return surface
+
+    def size(self, font, text):
+        """
+        Renvoie les dimensions d'un texte (équivalent mémoïsé de font.size).
+
+        :param font: la police utilisée
+        :param text: le texte à mesurer
+        :return: un tuple (largeur, hauteur)
+        """
+        key = (font, text)
+        size = self._get(key)
+        if size is None:
+            size = self._put(key, font.size(text))
+        return size
+
+    def hit_rate(self):
+        """
+        Renvoie le taux de succès du cache.
+
+        :return: la proportion de requêtes servies depuis le cache (entre 0 et 1)
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """
+        Renvoie les compteurs du cache.
+
+        :return: un dictionnaire avec la taille, les succès, les échecs et le taux de succès
+        """
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate()
+        }
+
+    def clear(self):
+        """
+        Vide le cache.
+        """
+        self.entries.clear()
+
+    def _get(self, key):
+        """
+        Cherche une entrée et la marque comme récemment utilisée.
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        """
+        Ajoute une entrée et évince les moins récemment utilisées au-delà de la taille maximale.
+        """
+        self.entries[key] = value
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return value
+
+
+class Counter:
+    """
+    Compteur numérique (score, munitions) affiché sous la forme "préfixe + chiffres".
+    Les chiffres proviennent d'un atlas pré-rendu : quand la valeur change,
+    seules les cases des chiffres modifiés sont redessinées.
+    """
+    def __init__(self, font, prefix, color, cache=None):
+        """
+        Initialise le compteur et construit l'atlas des chiffres.
+
+        :param font: la police utilisée
+        :param prefix: le texte fixe affiché avant la valeur
+        :param color: la couleur du texte
+        :param cache: le cache de textes à utiliser (par défaut, le cache partagé)
+        """
+        cache = cache or text_cache
+        self.prefix = cache.render(font, prefix, color)
+        glyphs = [cache.render(font, digit, color) for digit in "0123456789"]
+
+        # Chaque chiffre occupe une case de largeur fixe dans l'atlas
+        self.cell = max(glyph.get_width() for glyph in glyphs)
+        self.height = max([glyph.get_height() for glyph in glyphs] + [self.prefix.get_height()])
+        self.atlas = pygame.Surface((self.cell * 10, self.height), pygame.SRCALPHA)
+        for i, glyph in enumerate(glyphs):
+            # BLEND_RGBA_MAX sur une surface transparente copie les pixels sans les assombrir
+            self.atlas.blit(glyph, (i * self.cell + (self.cell - glyph.get_width()) // 2, 0),
+                            special_flags=pygame.BLEND_RGBA_MAX)
+
+        self.digits = ""
+        self.surface = None
+        self.glyph_updates = 0
+
+    def render(self, value):
+        """
+        Renvoie la surface du compteur pour la valeur donnée.
+
+        :param value: la valeur entière (positive) à afficher
+        :return: la surface du compteur
+        """
+        digits = str(value)
+        if digits == self.digits:
+            return self.surface
+
+        if len(digits) != len(self.digits):
+            # Le nombre de chiffres change : on reconstruit toute la surface
+            width = self.prefix.get_width() + self.cell * len(digits)
+            self.surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+            self.surface.blit(self.prefix, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            changed = range(len(digits))
+        else:
+            changed = [i for i, (old, new) in enumerate(zip(self.digits, digits)) if old != new]
+
+        for i in changed:
+            cell = pygame.Rect(self.prefix.get_width() + i * self.cell, 0, self.cell, self.height)
+            self.surface.fill((0, 0, 0, 0), cell)
+            self.surface.blit(self.atlas, cell, (int(digits[i]) * self.cell, 0, self.cell, self.height),
+                              special_flags=pygame.BLEND_RGBA_MAX)
+            self.glyph_updates += 1
+
+        self.digits = digits
+        return self.surface
+
+
+# Cache partagé par toute l'interface
+text_cache = TextCache()
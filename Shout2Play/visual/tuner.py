@@ -0,0 +1,186 @@
+import pygame
+
+from config import WHITE
+from core.notes import nearest, label
+from visual.text import Counter, text_cache
+
+
+CURSOR_COLOR = (255, 0, 0)
+CURSOR_WIDTH = 5  # Largeur (px) du curseur
+CURSOR_OVERHANG = 10  # Débord (px) du curseur au-dessus et au-dessous de la barre
+
+
+class Tuner:
+    """
+    "Coin-coin mètre" : fréquence chantée, note la plus proche et écart à cette note sur une barre.
+    Sur un écran fixe, le panneau (fond, titre et barre) est composé une fois dans une surface opaque ;
+    les lignes de texte n'y sont redessinées que quand la fréquence arrondie ou la note change, et d'une image
+    à l'autre seules les bandes de l'ancien et du nouveau curseur sont restaurées puis redessinées.
+    """
+    def __init__(self, title_font, font, center_x, top, bar_width, bar_height, color=WHITE, min_frequency=45):
+        """
+        Construit les parties fixes de l'accordeur.
+
+        :param title_font: la police du titre
+        :param font: la police de la fréquence et de la note
+        :param center_x: l'abscisse du centre du panneau
+        :param top: l'ordonnée du haut du panneau
+        :param bar_width: la largeur de la barre
+        :param bar_height: la hauteur de la barre
+        :param color: la couleur des textes
+        :param min_frequency: la fréquence (Hz) en dessous de laquelle la mesure est ignorée
+        """
+        self.font = font
+        self.color = color
+        self.min_frequency = min_frequency
+        self.last_frequency = 0
+
+        # Textes variables : compteur de fréquence et noms de notes (mis en cache au premier affichage)
+        self.frequency_counter = Counter(font, "Fréquence: ", color)
+        self.unit = text_cache.render(font, " Hz", color)
+        self.unknown = [text_cache.render(font, "Fréquence: // Hz", color), text_cache.render(font, "Note proche: //", color)]
+
+        # Parties fixes : titre et barre (grise, zone verte au centre), une surface opaque copiée sans mélange
+        self.title = text_cache.render(title_font, "Coin-coin mètre", color)
+        self.line_height = font.get_height()
+        self.lines_y = int(title_font.get_height() * 1.2)
+        bar_y = self.lines_y + 2 * self.line_height + bar_height // 2
+        self.bar_surface = pygame.Surface((bar_width, bar_height))
+        self.bar_surface.fill((186, 186, 186))
+        green_width = max(bar_width // 10, 2)
+        self.bar_surface.fill((127, 221, 76), ((bar_width - green_width) // 2, 0, green_width, bar_height))
+
+        # Zone occupée par l'accordeur (pour les rectangles sales) : textes variables et débord du curseur compris
+        widths = [text_cache.size(font, text)[0] for text in ("Fréquence: 0000 Hz", "Note proche: C#0", "Fréquence: // Hz")]
+        width = max([self.title.get_width(), bar_width + 2 * CURSOR_WIDTH] + widths)
+        self.rect = pygame.Rect(0, 0, width, bar_y + bar_height + CURSOR_OVERHANG)
+        self.rect.midtop = (center_x, top)
+        self.bar = pygame.Rect(center_x - bar_width // 2, self.rect.y + bar_y, bar_width, bar_height)
+        # Zone des lignes de texte, relative au panneau
+        self.lines_rect = pygame.Rect(0, self.lines_y, width, 2 * self.line_height)
+
+        # Textes affichés (fréquence arrondie, note) et surfaces correspondantes
+        self.shown = None
+        self.lines = []
+        # Panneau composé sur le fond de l'écran fixe (None : à recomposer) et dernier curseur dessiné
+        self.backdrop = None
+        self.panel = None
+        self.cursor = None
+
+    def reset(self):
+        """
+        Oublie le fond capturé : à appeler quand l'écran sous l'accordeur a changé.
+        """
+        self.backdrop = None
+        self.panel = None
+        self.cursor = None
+
+    def update_lines(self, frequency):
+        """
+        Prépare les lignes de texte si la fréquence arrondie ou la note ont changé.
+
+        :param frequency: la fréquence affichée (0 : aucune)
+        :return: l'écart à la note (entre -1 et 1, en demi-barres) et si les textes ont changé
+        """
+        if not frequency:
+            shown, offset = None, 0.0
+        else:
+            note = nearest(frequency)
+            shown = (int(round(frequency)), note.midi)
+            offset = max(-1.0, min(note.cents / 50, 1.0))  # Demi-barre : un demi-ton vers la note voisine
+        if shown == self.shown and self.lines:
+            return offset, False
+
+        self.shown = shown
+        if shown is None:
+            self.lines = [[text] for text in self.unknown]
+        else:
+            # Chaque ligne est une suite de surfaces déjà rendues, copiées côte à côte
+            self.lines = [[self.frequency_counter.render(shown[0]), self.unit],
+                          [text_cache.render(self.font, f"Note proche: {label(shown[1])}", self.color)]]
+        return offset, True
+
+    def compose(self, target, origin):
+        """
+        Dessine les parties fixes (titre et barre).
+
+        :param target: la surface de destination (écran ou panneau)
+        :param origin: la position du haut à gauche de l'accordeur sur cette surface
+        """
+        x, y = origin
+        target.blit(self.title, (x + (self.rect.width - self.title.get_width()) // 2, y))
+        target.blit(self.bar_surface, self.bar.move(x - self.rect.x, y - self.rect.y))
+
+    def compose_lines(self, target, origin):
+        """
+        Dessine les lignes de texte.
+
+        :param target: la surface de destination (écran ou panneau)
+        :param origin: la position du haut à gauche de l'accordeur sur cette surface
+        """
+        x, y = origin
+        for i, line in enumerate(self.lines):
+            left = x + (self.rect.width - sum(part.get_width() for part in line)) // 2
+            top = y + self.lines_y + i * self.line_height
+            for part in line:
+                target.blit(part, (left, top))
+                left += part.get_width()
+
+    def cursor_rect(self, offset):
+        """
+        Renvoie la bande occupée par le curseur pour un écart donné.
+        """
+        x = self.bar.centerx + offset * (self.bar.width // 2)
+        return pygame.Rect(round(x - CURSOR_WIDTH / 2), self.bar.y - CURSOR_OVERHANG, CURSOR_WIDTH, self.bar.height + 2 * CURSOR_OVERHANG)
+
+    def draw(self, screen, frequency, active=False, redraw=False):
+        """
+        Dessine l'accordeur. Hors de la voix active, la dernière fréquence valable reste affichée.
+
+        :param screen: l'écran sur lequel dessiner
+        :param frequency: la fréquence mesurée (Hz)
+        :param active: si la voix est active (sinon la mesure est ignorée)
+        :param redraw: si l'écran sous l'accordeur est redessiné à chaque image (partie en cours) ;
+                       sinon l'écran est supposé fixe et seul le curseur est mis à jour
+        :return: la liste des zones de l'écran modifiées
+        """
+        if active and frequency > self.min_frequency:
+            self.last_frequency = frequency
+        offset, changed = self.update_lines(self.last_frequency)
+        cursor = self.cursor_rect(offset)
+
+        if redraw or not screen.get_rect().contains(self.rect):
+            # Fond redessiné par l'appelant : parties fixes et textes déjà rendus, recopiés tels quels
+            self.compose(screen, self.rect.topleft)
+            self.compose_lines(screen, self.rect.topleft)
+            screen.fill(CURSOR_COLOR, cursor)
+            self.reset()
+            return [self.rect]
+
+        if self.backdrop is None:
+            # Premier affichage sur cet écran : capture du fond sous l'accordeur
+            self.backdrop = screen.subsurface(self.rect).copy()
+        if self.panel is None:
+            self.panel = self.backdrop.copy()
+            self.compose(self.panel, (0, 0))
+            self.compose_lines(self.panel, (0, 0))
+            screen.blit(self.panel, self.rect)
+            dirty = [self.rect]
+        else:
+            dirty = []
+            if changed:
+                # Nouveaux textes : seule la zone des lignes est recomposée puis recopiée
+                self.panel.blit(self.backdrop, self.lines_rect, self.lines_rect)
+                self.compose_lines(self.panel, (0, 0))
+                lines = self.lines_rect.move(self.rect.topleft)
+                screen.blit(self.panel, lines, self.lines_rect)
+                dirty.append(lines)
+            if cursor != self.cursor:
+                # Le curseur bouge : restaure son ancienne bande depuis le panneau
+                screen.blit(self.panel, self.cursor, self.cursor.move(-self.rect.x, -self.rect.y))
+                dirty += [self.cursor, cursor]
+            elif not dirty:
+                return []
+        screen.fill(CURSOR_COLOR, cursor)
+        self.cursor = cursor
+        return dirty
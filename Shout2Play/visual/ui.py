@@ -1,6 +1,8 @@
 import pygame
 
 from config import *
+from visual.text import Counter, text_cache
+from visual.tuner import Tuner
 
 
 class UI:
@@ -11,7 +13,7 @@ class UI:
 
     def __init__(self, font_path="assets/font.otf"):
         """
-        Initialise l'interface avec les paramètres de police et les notes musicales.
+        Initialise l'interface avec les paramètres de police.
         
         :param font_path: chemin vers le fichier de police, par défaut "assets/font.otf"
         """
@@ -19,21 +21,18 @@ class UI:
         self.font = pygame.font.Font(font_path, 40)
         self.font2 = pygame.font.Font(font_path, 25)
 
-        # Liste des noms de notes et des fréquences
-        self.note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        self.notes = []
-        self.note_labels = []
-        self.lastfreq = 0
-
-        # Calcul des fréquences pour chaque octave
-        for octave in range(9):  # De l'octave 0 à 8
-            for i, base_freq in enumerate([16.35, 17.32, 18.35, 19.45, 20.60, 21.83, 23.12, 24.50, 25.96, 27.50, 29.14, 30.87]):
-                freq_octave = base_freq * (2 ** octave)
-                if freq_octave > 7902.13:  # Limite supérieure (octave 8)
-                    break
-                self.notes.append(freq_octave)
-                self.note_labels.append(f"{self.note_names[i]}{octave}")
-        
+        # Compteurs numériques dessinés à partir d'un atlas de chiffres
+        self.score_counter = Counter(self.font2, "Score: ", WHITE)
+        self.ammo_counter = Counter(self.font2, "Munitions : ", (255, 255, 255))
+
+        # Incrustation du profileur (police par défaut de pygame, reconstruite à chaque nouveau rapport)
+        self.profile_font = pygame.font.Font(None, 20)
+        self.profile_report = None
+        self.profile_panel = None
+
+        # Coin-coin mètre : grand format (écran dédié) et format réduit affiché en jeu, construits au premier affichage
+        self.tuners = {}
+
     def draw_text(self, screen, text, color, y_offset=0):
         """
         Dessine un texte centré à l'écran avec un décalage vertical optionnel.
@@ -42,13 +41,16 @@ class UI:
         :param text: le texte à afficher
         :param color: la couleur du texte
         :param y_offset: décalage vertical du texte
+        :return: la zone de l'écran modifiée
         """
         lines = self.split_text(text, WIDTH - 40)  # Ajuste la largeur max
         y = HEIGHT * 0.4 + y_offset - (len(lines) * self.font.get_height()) // 2
+        rects = []
         for line in lines:
-            rendered_text = self.font.render(line, True, color)
-            screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y))
+            rendered_text = text_cache.render(self.font, line, color)
+            rects.append(screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y)))
             y += self.font.get_height()
+        return union(rects)
 
     def draw_start_text(self, screen, text, score, color, y_offset=0):
         """
@@ -59,79 +61,54 @@ class UI:
         :param score: le score à afficher
         :param color: la couleur du texte
         :param y_offset: décalage vertical du texte
+        :return: la zone de l'écran modifiée
         """
         lines = self.split_text(text, WIDTH - 40)  # Ajuste la largeur max
         lines2 = self.split_text(score, WIDTH - 40)  # Ajuste la largeur max
         y = HEIGHT * 0.4 + y_offset - (len(lines) * self.font.get_height()) // 2
+        rects = []
         for line in lines:
-            rendered_text = self.font.render(line, True, color)
-            screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y))
+            rendered_text = text_cache.render(self.font, line, color)
+            rects.append(screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y)))
             y += self.font.get_height()
         for line2 in lines2:
-            rendered_text = self.font2.render(line2, True, color)
-            screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y))
+            rendered_text = text_cache.render(self.font2, line2, color)
+            rects.append(screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y)))
             y += self.font2.get_height()
+        return union(rects)
 
     def freq_to_note(self, screen, freq, active=False, color=WHITE):
         """
-        Convertit une fréquence en note et dessine l'information à l'écran.
+        Convertit une fréquence en note et dessine le coin-coin mètre au centre de l'écran.
 
         :param screen: l'écran sur lequel dessiner les informations
         :param freq: la fréquence à convertir
         :param active: si la fréquence est active ou non
         :param color: la couleur du texte
+        :return: la liste des zones de l'écran modifiées (l'écran est supposé fixe sous le coin-coin mètre)
         """
-        if active and freq > 45:
-            self.lastfreq = freq
-        else:
-            freq = self.lastfreq
-        closest_index = min(range(len(self.notes)), key=lambda i: abs(self.notes[i] - freq))  # Trouver l'index de la note la plus proche
-        closest = self.notes[closest_index]
-        note = self.note_labels[closest_index]
-            
-        # Calculer l'écart relatif en fonction de la moitié de la distance avec la note précédente ou suivante
-        if closest_index == 0:
-            reference_gap = (self.notes[1] - self.notes[0]) / 2
-        elif closest_index == len(self.notes) - 1:
-            reference_gap = (self.notes[-1] - self.notes[-2]) / 2
-        else:
-            lower_gap = (closest - self.notes[closest_index - 1]) / 2
-            upper_gap = (self.notes[closest_index + 1] - closest) / 2
-            reference_gap = lower_gap if freq < closest else upper_gap
-            
-        relative_diff = (freq - closest) / reference_gap * 100  # Calcul de l'écart relatif
-        lines = ["Coin-coin mètre", f"Fréquence: {freq:.2f} Hz", f"Note proche: {note}"]
-        if not active and self.lastfreq == 0:
-            lines = ["Coin-coin mètre", f"Fréquence: // Hz", f"Note proche: //"]
-            relative_diff = 0
-        y = HEIGHT * 0.55 - (len(lines) * self.font2.get_height()) // 2
-        for line in lines:
-            if line == lines[0]:
-                rendered_text = self.font.render(line, True, color)
-                screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y))
-                y += self.font.get_height() * 1.2
-            else:
-                rendered_text = self.font2.render(line, True, color)
-                screen.blit(rendered_text, (WIDTH // 2 - rendered_text.get_width() // 2, y))
-                y += self.font2.get_height()  
-        
-        # Dessiner la barre grise
-        bar_width = WIDTH // 2
-        bar_height = HEIGHT / 20
-        bar_x = (WIDTH - bar_width) // 2
-        bar_y = y + bar_height / 2
-        pygame.draw.rect(screen, (186, 186, 186), (bar_x, bar_y, bar_width, bar_height))
-        
-        # Dessiner la barre verte
-        green_width = WIDTH // 20
-        green_x = (WIDTH - green_width) // 2
-        pygame.draw.rect(screen, (127, 221, 76), (green_x, bar_y, green_width, bar_height))
-        
-        # Dessiner le curseur rouge
-        cursor_width = 5
-        cursor_x = bar_x + (bar_width // 2) + (relative_diff / 100) * (bar_width // 2)
-        cursor_x = max(bar_x, min(cursor_x, bar_x + bar_width))  # Limite dans la barre
-        pygame.draw.rect(screen, (255, 0, 0), (cursor_x - cursor_width / 2, bar_y - 10, cursor_width, bar_height + 20))
+        tuner = self.tuners.get(("center", color))
+        if tuner is None:
+            top = HEIGHT * 0.55 - (3 * self.font2.get_height()) // 2
+            tuner = self.tuners[("center", color)] = Tuner(self.font, self.font2, WIDTH // 2, top, WIDTH // 2, HEIGHT // 20, color)
+        return tuner.draw(screen, freq, active)
+
+    def draw_tuner(self, screen, freq, active=False, color=WHITE):
+        """
+        Dessine un coin-coin mètre réduit en haut de l'écran, pendant la partie.
+
+        :param screen: l'écran sur lequel dessiner
+        :param freq: la fréquence mesurée
+        :param active: si la voix est active
+        :param color: la couleur du texte
+        :return: la liste des zones de l'écran modifiées
+        """
+        tuner = self.tuners.get(("live", color))
+        if tuner is None:
+            tuner = self.tuners[("live", color)] = Tuner(self.font2, self.profile_font, WIDTH // 2, HEIGHT * 0.01,
+                                                         WIDTH // 4, HEIGHT // 40, color)
+        # La scène est redessinée sous le coin-coin mètre à chaque image
+        return tuner.draw(screen, freq, active, redraw=True)
 
     def draw_score(self, screen, score, color=WHITE):
         """
@@ -140,14 +117,13 @@ class UI:
         :param screen: l'écran sur lequel dessiner le score
         :param score: le score à afficher
         :param color: la couleur du texte
+        :return: la zone de l'écran modifiée
         """
-        text = f"Score: {score}"
-        lines = self.split_text(text, WIDTH - 40)  # Ajuste la largeur max
-        y = HEIGHT * 0.02 - (len(lines) * self.font2.get_height()) // 2
-        for line in lines:
-            rendered_text = self.font2.render(line, True, color)
-            screen.blit(rendered_text, (WIDTH * 0.02, y))
-            y += self.font2.get_height()
+        y = HEIGHT * 0.02 - self.font2.get_height() // 2
+        if color == WHITE:
+            # Chemin rapide : seuls les chiffres modifiés sont redessinés
+            return screen.blit(self.score_counter.render(score), (WIDTH * 0.02, y))
+        return screen.blit(text_cache.render(self.font2, f"Score: {score}", color), (WIDTH * 0.02, y))
 
     def split_text(self, text, max_width):
         """
@@ -163,7 +139,7 @@ class UI:
         
         for word in words:
             test_line = f"{current_line} {word}".strip()
-            if self.font.size(test_line)[0] <= max_width:
+            if text_cache.size(self.font, test_line)[0] <= max_width:
                 current_line = test_line
             else:
                 lines.append(current_line)
@@ -181,16 +157,18 @@ class UI:
         :param screen: l'écran sur lequel dessiner le menu de démarrage
         :param best_score: le meilleur score
         :param best_user: le meilleur utilisateur
+        :return: la zone de l'écran modifiée
         """
-        self.draw_start_text(screen, "SHOUT 2 PLAY", f"Best Score : {best_score} - {best_user}", WHITE)
+        return self.draw_start_text(screen, "SHOUT 2 PLAY", f"Best Score : {best_score} - {best_user}", WHITE)
     
     def draw_pause_menu(self, screen):
         """
         Dessine l'écran de pause.
 
         :param screen: l'écran sur lequel dessiner l'écran de pause
+        :return: la zone de l'écran modifiée
         """
-        self.draw_text(screen, "PAUSE", WHITE)
+        return self.draw_text(screen, "PAUSE", WHITE)
     
     def draw_game_over(self, screen, score):
         """
@@ -198,8 +176,9 @@ class UI:
 
         :param screen: l'écran sur lequel dessiner l'écran de fin de jeu
         :param score: le score final
+        :return: la zone de l'écran modifiée
         """
-        self.draw_text(screen, f"GAME OVER - Score: {score}", RED)
+        return self.draw_text(screen, f"GAME OVER - Score: {score}", RED)
 
     def loading_bar(self, screen, loading):
         """
@@ -207,20 +186,58 @@ class UI:
 
         :param screen: l'écran sur lequel dessiner la barre
         :param loading: la valeur de progression (0-100)
+        :return: la zone de l'écran modifiée
         """
         bar_width = WIDTH / 10  # Largeur totale de la barre
         bar_height = HEIGHT / 20   # Hauteur de la barre
         x, y = WIDTH * 0.02, HEIGHT * 0.04   # Position de la barre
         
         # Dessiner le fond de la barre
-        pygame.draw.rect(screen, (200, 200, 200), (x, y, bar_width, bar_height))
+        background_rect = pygame.draw.rect(screen, (200, 200, 200), (x, y, bar_width, bar_height))
         
         # Dessiner la progression
         fill_width = (loading % 100) / 100 * bar_width
         pygame.draw.rect(screen, (0, 150, 255), (x, y, fill_width, bar_height))
 
-        text = self.font2.render(f"Munitions : {int(loading / 100)}", True, (255, 255, 255))
-        screen.blit(text, (x + bar_width + 10, y))
+        text = self.ammo_counter.render(int(loading / 100))
+        text_rect = screen.blit(text, (x + bar_width + 10, y))
+        return background_rect.union(text_rect)
+
+    def draw_profiler(self, screen, report):
+        """
+        Affiche les temps par sous-système mesurés par le profileur, en haut à droite de l'écran.
+        Le panneau n'est reconstruit que lorsque le profileur produit un nouveau rapport.
+
+        :param screen: l'écran sur lequel dessiner le panneau
+        :param report: le rapport du profileur (nom -> centiles en millisecondes)
+        :return: la zone de l'écran modifiée
+        """
+        if report is not self.profile_report or self.profile_panel is None:
+            lines = [f"{'zone':<18}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>7}"]
+            for name, values in report.items():
+                lines.append(f"{name:<18}" + "".join(f"{values[key]:7.2f}" for key in ("p50", "p95", "p99", "max")))
+            line_height = self.profile_font.get_linesize()
+            rendered = [self.profile_font.render(line, True, WHITE) for line in lines]
+            width = max(text.get_width() for text in rendered) + 16
+            self.profile_panel = pygame.Surface((width, line_height * len(lines) + 12), pygame.SRCALPHA)
+            self.profile_panel.fill((0, 0, 0, 170))
+            for i, text in enumerate(rendered):
+                self.profile_panel.blit(text, (8, 6 + i * line_height))
+            self.profile_report = report
+        return screen.blit(self.profile_panel, (WIDTH - self.profile_panel.get_width() - 10, 10))
+
+
+def union(rects):
+    """
+    Renvoie le plus petit rectangle englobant une liste de rectangles.
+
+    :param rects: la liste des rectangles
+    :return: le rectangle englobant, ou None si la liste est vide
+    """
+    if not rects:
+        return None
+    return rects[0].unionall(rects[1:])
+
 
 if __name__ == "__main__":
     pygame.init()
@@ -14,6 +14,10 @@
  * - La fonction playAudio() permet de jouer, arrêter ou mettre en pause des fichiers audio spécifiques.
  * - La boucle principale lit les commandes du moniteur série, détecte les fréquences dominantes avec la FFT,
  *   et envoie les données encodées en Base64 au moniteur série.
+ * - Si l'hôte envoie la commande "proto 1", les données sont envoyées sous forme de trames binaires
+ *   de taille fixe (voir Shout2Play/communicate/protocol.py) au lieu des lignes Base64/JSON.
+ * - Si l'hôte envoie ensuite "audio 1", l'audio du micro est aussi envoyé, décimé à 11025 Hz,
+ *   par trames de 256 échantillons : la hauteur et le niveau sont alors mesurés sur l'hôte.
  * 
  * @note
  * - Assurez-vous que la carte SD est correctement insérée et initialisée.
@@ -33,6 +37,21 @@
 #include "base64.hpp"
 #include <SD.h>
 
+// Protocole binaire v1 (doit rester identique à Shout2Play/communicate/protocol.py)
+#define FRAME_SYNC_1 0xA5
+#define FRAME_SYNC_2 0x5A
+#define FRAME_VERSION 1
+#define FRAME_KIND_TELEMETRY 1
+#define FRAME_KIND_AUDIO 2
+#define FRAME_NEGOTIATE "proto 1"
+#define FRAME_NEGOTIATE_AUDIO "audio 1"
+#define FRAME_BUTTON_SHOOT 0x01
+#define FRAME_BUTTON_PAUSE 0x02
+
+// Audio brut envoyé à l'hôte (44,1 kHz décimé par 4 : 11025 Hz)
+#define AUDIO_DECIMATION 4
+#define AUDIO_FRAME_SAMPLES 256
+
 // Définition des pins
 #define BUTTON_PIN_SHOOT 9
 #define BUTTON_PIN_PAUSE 5
@@ -56,11 +75,15 @@ AudioOutputI2S       i2s2;
 // Déclaration de l'analyseur FFT
 AudioAnalyzeFFT1024  fft;
 
+// File des blocs audio bruts du micro (mode audio)
+AudioRecordQueue     audio_queue;
+
 // Déclaration du shield audio
 AudioControlSGTL5000 audioShield;
 
 // Connexions audio
 AudioConnection      patchCord1(i2s1, 0, fft, 0);               // Connecter l'entrée audio à l'analyseur FFT
+AudioConnection      patchCord3(i2s1, 0, audio_queue, 0);       // Connecter l'entrée audio à la file d'audio brut
 
 AudioConnection      patchCord2(play_background, 0, mixer, 0);  // Connecter les pistes audio au mélangeur
 AudioConnection      patchCord4(play_shoot, 0, mixer, 1);       // Connecter les pistes audio au mélangeur
@@ -83,6 +106,44 @@ int potentiometer_divider = 0;
 bool was_playing = false;
 bool is_paused   = false;
 
+// Trame de télémétrie (little-endian, sans alignement)
+struct __attribute__((packed)) TelemetryFrame {
+    uint8_t  sync[2];     // Marqueur de début de trame
+    uint8_t  version;     // Version du protocole
+    uint8_t  kind;        // Type de trame
+    uint16_t seq;         // Numéro de séquence
+    uint16_t length;      // Longueur de la charge utile
+    uint32_t time_ms;     // Temps de la carte (ms)
+    float    gain;        // Niveau sonore (dB SPL)
+    float    frequency;   // Fréquence dominante (Hz)
+    uint16_t divider;     // Potentiomètre diviseur
+    uint16_t threshold;   // Potentiomètre de seuil
+    uint8_t  buttons;     // État des boutons (bit 0 : tir, bit 1 : pause)
+    uint16_t crc;         // CRC-16/CCITT de version à buttons
+};
+
+// En-tête d'une trame audio (suivi des échantillons int16 puis du CRC)
+struct __attribute__((packed)) AudioFrameHeader {
+    uint8_t  sync[2];     // Marqueur de début de trame
+    uint8_t  version;     // Version du protocole
+    uint8_t  kind;        // Type de trame
+    uint16_t seq;         // Numéro de séquence
+    uint16_t length;      // Longueur de la charge utile
+    uint32_t time_ms;     // Temps de la carte (ms) au premier échantillon
+    uint16_t sample_rate; // Fréquence d'échantillonnage (Hz)
+    uint16_t count;       // Nombre d'échantillons
+};
+
+// Variables pour le protocole binaire
+bool binary_mode = false;
+uint16_t frame_seq = 0;
+
+// Variables pour l'envoi de l'audio brut
+bool audio_mode = false;
+int16_t audio_frame[AUDIO_FRAME_SAMPLES];
+int audio_count = 0;
+uint32_t audio_frame_time = 0;
+
 // Variables pour test d'états 
 bool lastShootState = HIGH;
 bool lastPauseState = HIGH;
@@ -122,7 +183,7 @@ void setup() {
     pinMode(BUTTON_PIN_PAUSE, INPUT_PULLDOWN);
 
     // Initialisation de la mémoire audio
-    AudioMemory(40);
+    AudioMemory(60);  // Marge pour la file d'audio brut entre deux passages dans la boucle
 
     // Initialisation de la communication série
     Serial.begin(115200);
@@ -272,6 +333,111 @@ void playAudio(String filename_str) {
     }
 }
 
+/**
+ * @brief Poursuit le calcul d'un CRC-16/CCITT sur de nouveaux octets.
+ * 
+ * @param crc Le CRC des octets précédents.
+ * @param data Les octets suivants.
+ * @param length Le nombre d'octets.
+ * @return Le CRC sur 16 bits.
+ */
+uint16_t crc16_update(uint16_t crc, const uint8_t* data, size_t length) {
+    for (size_t i = 0; i < length; i++) {
+        crc ^= (uint16_t)data[i] << 8;
+        for (int bit = 0; bit < 8; bit++) {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+    return crc;
+}
+
+/**
+ * @brief Calcule le CRC-16/CCITT (polynôme 0x1021, valeur initiale 0xFFFF).
+ * 
+ * @param data Les octets à protéger.
+ * @param length Le nombre d'octets.
+ * @return Le CRC sur 16 bits.
+ */
+uint16_t crc16(const uint8_t* data, size_t length) {
+    return crc16_update(0xFFFF, data, length);
+}
+
+/**
+ * @brief Envoie une trame binaire de télémétrie.
+ * 
+ * @param dbSPL Le niveau sonore en dB SPL.
+ * @param dominantFreq La fréquence dominante en Hz.
+ * @param divider La valeur du potentiomètre diviseur.
+ * @param threshold La valeur du potentiomètre de seuil.
+ * @param buttons L'état des boutons (bit 0 : tir, bit 1 : pause).
+ */
+void sendTelemetryFrame(float dbSPL, float dominantFreq, int divider, int threshold, uint8_t buttons) {
+    TelemetryFrame frame;
+    frame.sync[0] = FRAME_SYNC_1;
+    frame.sync[1] = FRAME_SYNC_2;
+    frame.version = FRAME_VERSION;
+    frame.kind = FRAME_KIND_TELEMETRY;
+    frame.seq = frame_seq++;
+    frame.length = sizeof(TelemetryFrame) - 10;  // En-tête (8 octets) et CRC (2 octets) exclus
+    frame.time_ms = millis();
+    frame.gain = dbSPL;
+    frame.frequency = dominantFreq;
+    frame.divider = divider;
+    frame.threshold = threshold;
+    frame.buttons = buttons;
+    frame.crc = crc16((const uint8_t*)&frame + 2, sizeof(TelemetryFrame) - 4);
+
+    Serial.write((const uint8_t*)&frame, sizeof(TelemetryFrame));
+}
+
+/**
+ * @brief Envoie une trame binaire d'audio décimé (AUDIO_FRAME_SAMPLES échantillons de audio_frame).
+ */
+void sendAudioFrame() {
+    AudioFrameHeader header;
+    header.sync[0] = FRAME_SYNC_1;
+    header.sync[1] = FRAME_SYNC_2;
+    header.version = FRAME_VERSION;
+    header.kind = FRAME_KIND_AUDIO;
+    header.seq = frame_seq++;
+    header.length = sizeof(AudioFrameHeader) - 8 + sizeof(audio_frame);  // En-tête commun (8 octets) exclu
+    header.time_ms = audio_frame_time;
+    header.sample_rate = (uint16_t)(SAMPLE_RATE / AUDIO_DECIMATION);
+    header.count = AUDIO_FRAME_SAMPLES;
+
+    uint16_t crc = crc16_update(0xFFFF, (const uint8_t*)&header + 2, sizeof(AudioFrameHeader) - 2);
+    crc = crc16_update(crc, (const uint8_t*)audio_frame, sizeof(audio_frame));
+
+    Serial.write((const uint8_t*)&header, sizeof(AudioFrameHeader));
+    Serial.write((const uint8_t*)audio_frame, sizeof(audio_frame));
+    Serial.write((const uint8_t*)&crc, sizeof(crc));
+}
+
+/**
+ * @brief Vide la file d'audio brut : décime chaque bloc (moyenne de AUDIO_DECIMATION échantillons)
+ * et envoie une trame dès que AUDIO_FRAME_SAMPLES échantillons sont prêts.
+ */
+void sendAudio() {
+    while (audio_queue.available() > 0) {
+        int16_t* block = audio_queue.readBuffer();
+        for (int i = 0; i < AUDIO_BLOCK_SAMPLES; i += AUDIO_DECIMATION) {
+            int32_t sum = 0;
+            for (int j = 0; j < AUDIO_DECIMATION; j++) {
+                sum += block[i + j];
+            }
+            if (audio_count == 0) {
+                audio_frame_time = millis();
+            }
+            audio_frame[audio_count++] = sum / AUDIO_DECIMATION;
+            if (audio_count == AUDIO_FRAME_SAMPLES) {
+                sendAudioFrame();
+                audio_count = 0;
+            }
+        }
+        audio_queue.freeBuffer();
+    }
+}
+
 /**
  * Boucle principale du programme.
  * 
@@ -290,6 +456,10 @@ void playAudio(String filename_str) {
  *    - Lit les valeurs des potentiomètres pour le diviseur et le seuil.
  *    - Lit l'état des boutons de tir et de pause.
  * 
+ * 5. En mode binaire, envoie une trame de télémétrie et passe à l'itération suivante.
+ * 
+ * Sinon (format historique) :
+ * 
  * 5. Crée un message JSON avec les données collectées.
  *    - Formate les données en une chaîne JSON.
  * 
@@ -309,9 +479,26 @@ void loop() {
     // 1. Lire le moniteur série pour savoir quel son jouer
     if (Serial.available()) {
         String message = Serial.readStringUntil('\n');
+        message.trim();
         
-        // Jouer le son demandé
-        playAudio(message.c_str());
+        // Négociation du protocole binaire (la carte confirme avant de changer de format)
+        if (message == FRAME_NEGOTIATE) {
+            Serial.println(FRAME_NEGOTIATE);
+            binary_mode = true;
+        } else if (message == FRAME_NEGOTIATE_AUDIO && binary_mode) {
+            // Envoi de l'audio brut en plus de la télémétrie
+            Serial.println(FRAME_NEGOTIATE_AUDIO);
+            audio_queue.begin();
+            audio_mode = true;
+        } else {
+            // Jouer le son demandé
+            playAudio(message.c_str());
+        }
+    }
+
+    // Envoi de l'audio brut accumulé depuis le dernier passage
+    if (audio_mode) {
+        sendAudio();
     }
 
     // 2. Détecter la fréquence dominante avec FFT
@@ -349,6 +536,15 @@ void loop() {
         // 4. Lire les valeurs des potentiomètres et des boutons
         int divider = 800 + (400 * analogRead(POTENTIOMETER_DIVIDER) / 1023.0);
         int threshold = 30 + (60 * analogRead(POTENTIOMETER_THRESHOLD) / 1023.0);
+
+        // 5. Envoi d'une trame binaire si le format a été négocié
+        if (binary_mode) {
+            uint8_t buttons = (digitalRead(BUTTON_PIN_SHOOT) ? FRAME_BUTTON_SHOOT : 0)
+                            | (digitalRead(BUTTON_PIN_PAUSE) ? FRAME_BUTTON_PAUSE : 0);
+            sendTelemetryFrame(dbSPL, dominantFreq, divider, threshold, buttons);
+            delay(10);
+            return;
+        }
         
         // 5. Création du message JSON
         String message = "{";